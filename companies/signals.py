@@ -2,7 +2,8 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Company, CompanyUpdate
 from profiles.models import User, UserProfile
-from notifications.models import Notification, NotificationType
+from notifications.utils.type_registry import notification_types
+from notifications.services import NotificationService
 
 # Signal to create a company profile when a new user is created
 @receiver(post_save, sender=UserProfile)
@@ -16,8 +17,15 @@ def send_company_update_notification(sender, instance, created, **kwargs):
     if created:
         company_followers = instance.company.followers.all()
         notification_message = f"New update from {instance.company.name}: {instance.title}"
+        notification_type = notification_types.get('company_update')
         for follower in company_followers:
-            Notification.objects.create(user=follower, message=notification_message)
+            NotificationService.create_notification(
+                recipient=follower,
+                content=notification_message,
+                notification_type=notification_type,
+                content_object=instance,
+                url=f'/companies/{instance.company_id}/',
+            )
 
 # Signal to update follower count when a user follows or unfollows a company
 @receiver(post_save, sender=Company.followers.through)
@@ -40,11 +48,11 @@ def update_member_count(sender, instance, **kwargs):
 def notify_admins_on_company_creation(sender, instance, created, **kwargs):
     if created:
         notification_message = f"A new company '{instance.name}' has been created."
-        notification_type = NotificationType.objects.get_or_create(type_name='company_creation')[0]
+        notification_type = notification_types.get('company_creation')
         admin_profiles = UserProfile.objects.filter(user__is_staff=True)
 
         for admin_profile in admin_profiles:
-            Notification.objects.create(
+            NotificationService.create_notification(
                 recipient=admin_profile.user,
                 content_object=instance,
                 content=notification_message,
@@ -1,25 +1,36 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import ConnectionRequest, Connection, Recommendation
-from notifications.models import Notification
+from notifications.services import NotificationService
 
 # Signal to send notification when a connection request is sent
 @receiver(post_save, sender=ConnectionRequest)
 def send_connection_request_notification(sender, instance, created, **kwargs):
     if created:
         to_user = instance.to_user.user
-        from_user = instance.from_user.userprofile
+        from_user = instance.from_user
         notification_message = f"{from_user} wants to connect with you."
-        Notification.objects.create(user=to_user, message=notification_message)
+        NotificationService.create_notification(
+            recipient=to_user,
+            content=notification_message,
+            notification_type_name='connection',
+            content_object=instance,
+        )
 
 # Signal to send notification when a connection request is accepted
 @receiver(post_save, sender=ConnectionRequest)
 def send_connection_accept_notification(sender, instance, created, **kwargs):
     if not created and instance.status == 'accepted':
         to_user = instance.from_user.user
-        from_user = instance.to_user.userprofile
+        from_user = instance.to_user
         notification_message = f"{from_user} accepted your connection request."
-        Notification.objects.create(user=to_user, message=notification_message)
+        # Every later save of an accepted request lands here; repeats within the dedup window are dropped.
+        NotificationService.create_notification(
+            recipient=to_user,
+            content=notification_message,
+            notification_type_name='connection',
+            content_object=instance,
+        )
 
 # Signal to establish connection when a connection request is accepted
 @receiver(post_save, sender=ConnectionRequest)
@@ -32,9 +43,14 @@ def establish_connection(sender, instance, created, **kwargs):
 def send_recommendation_notification(sender, instance, created, **kwargs):
     if created:
         recommended_user = instance.recommended_user.user
-        recommended_by = instance.recommended_by.userprofile
+        recommended_by = instance.recommended_by
         notification_message = f"{recommended_by} recommended you."
-        Notification.objects.create(user=recommended_user, message=notification_message)
+        NotificationService.create_notification(
+            recipient=recommended_user,
+            content=notification_message,
+            notification_type_name='endorsement',
+            content_object=instance,
+        )
 
 # Signal to update connection count when a new connection is established
 @receiver(post_save, sender=Connection)
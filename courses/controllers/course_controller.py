@@ -26,6 +26,12 @@ class CourseController:
         return self.course_service.get_courses()
     
 
+    def get_course_catalog(self, cursor=None, limit=None, fields=None):
+        """
+        Get a page of the course catalog.
+        """
+        return self.course_service.get_course_catalog(cursor, limit, fields)
+
     def create_course(self, course_data):
         """
         Create a new course.
@@ -62,11 +68,23 @@ class CourseController:
         """
         return self.course_service.enroll_course(course_id, user_id)
     
+    def bulk_enroll_course(self, course_id, user_ids=None, group_id=None, company_id=None):
+        """
+        Enroll many users in a course.
+        """
+        return self.course_service.bulk_enroll_course(course_id, user_ids, group_id, company_id)
+
     def track_course_progress(self, course_id, user_id):
         """
         Track course progress.
         """
         return self.course_service.get_course_progress(user_id, course_id)
+
+    def get_progress_by_student(self, user_id):
+        """
+        Get a user's progress in all their courses.
+        """
+        return self.course_service.get_progress_by_student(user_id)
     
     def complete_course(self, course_id, user_id):
         """
@@ -74,11 +92,11 @@ class CourseController:
         """
         return self.course_service.complete_course(user_id, course_id)
     
-    def add_lesson_to_course(self, course_id, lesson_data):
+    def add_lesson_to_course(self, course_id, lesson_data, requested_by=None):
         """
         Add a lesson to a course.
         """
-        return self.course_service.add_lesson_to_course(course_id, lesson_data)
+        return self.course_service.add_lesson_to_course(course_id, lesson_data, requested_by)
     
     def get_lessons_by_course(self, course_id):
         """
@@ -92,11 +110,11 @@ class CourseController:
         """
         return self.course_query.get_course_lessons_by_order(course_id, lesson_order)
     
-    def update_lesson(self, course_id, lesson_id, lesson_data):
+    def update_lesson(self, course_id, lesson_id, lesson_data, requested_by=None):
         """
         Update a lesson.
         """
-        return self.course_service.update_lesson( course_id, lesson_id, lesson_data)
+        return self.course_service.update_lesson(course_id, lesson_id, lesson_data, requested_by)
     
     def get_course_lesson_by_id(self, course_id, lesson_id):
         """
@@ -156,7 +174,13 @@ class CourseController:
         """
         Submit a quiz.
         """
-        return self.course_service.submit_lesson_quiz(quiz_id, user_id, answers)
+        return self.course_service.submit_quiz(user_id, quiz_id, answers)
+
+    def grade_quiz_submissions(self, quiz_id, submissions, requested_by):
+        """
+        Grade a batch of quiz submissions.
+        """
+        return self.course_service.grade_quiz_submissions(quiz_id, submissions, requested_by)
     
     
 
@@ -0,0 +1,83 @@
+# courses/management/commands/benchmark_course_catalog.py
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from activity.models import Category
+from courses.models import Course, CourseEnrollment
+from courses.querying.course_query import CourseQuery, MAX_CATALOG_PAGE_SIZE
+from courses.serializers import CourseSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class QueryCounter:
+    # Counts executed queries; connection.queries is capped and needs DEBUG.
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = ("Measure queries and time per course catalog page for several page sizes, and fail if the "
+            "number of queries grows with the page size (N+1 regression).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[1, 10, 50, MAX_CATALOG_PAGE_SIZE],
+                            help='Page sizes to measure.')
+        parser.add_argument('--fields', default='',
+                            help='Comma-separated fields to request; all fields by default.')
+
+    def handle(self, *args, **options):
+        fields = [name for name in options['fields'].split(',') if name] or None
+        counts = {}
+        try:
+            with transaction.atomic():
+                self.build_catalog(max(options['page_sizes']))
+                self.stdout.write(f"{'page size':>10} {'queries':>8} {'legacy':>8} {'seconds':>8}")
+                for page_size in options['page_sizes']:
+                    queries = QueryCounter()
+                    with connection.execute_wrapper(queries):
+                        started = time.monotonic()
+                        CourseQuery.get_course_catalog_page(limit=page_size, fields=fields)
+                        elapsed = time.monotonic() - started
+                    legacy = QueryCounter()
+                    with connection.execute_wrapper(legacy):
+                        # One page the way list/ serializes it, walking each relation per course.
+                        CourseSerializer(Course.objects.order_by('id')[:page_size], many=True).data
+                    counts[page_size] = queries.count
+                    self.stdout.write(f"{page_size:>10} {queries.count:>8} {legacy.count:>8} {elapsed:>8.3f}")
+                raise Rollback
+        except Rollback:
+            pass
+
+        if len(set(counts.values())) > 1:
+            raise CommandError(f"Catalog queries depend on the page size: {counts}")
+        self.stdout.write(self.style.SUCCESS(f"Catalog pages take {counts.popitem()[1]} queries at every page size"))
+
+    def build_catalog(self, course_count):
+        # Courses are added to whatever the catalog already holds, so every page is full.
+        User = get_user_model()
+        User.objects.bulk_create([User(username=f'catalog_bench_{i}') for i in range(5)])
+        users = list(User.objects.filter(username__startswith='catalog_bench_'))
+        categories = Category.objects.bulk_create([Category(name=f'catalog_bench_{i}') for i in range(3)])
+        courses = Course.objects.bulk_create([
+            Course(title=f'Course {i}', description='Benchmark', instructor=users[0])
+            for i in range(course_count)
+        ])
+        Course.categories.through.objects.bulk_create([
+            Course.categories.through(course_id=course.id, category_id=category.id)
+            for course in courses for category in categories
+        ])
+        Course.prerequisites.through.objects.bulk_create([
+            Course.prerequisites.through(from_course_id=course.id, to_course_id=courses[0].id)
+            for course in courses[1:]
+        ])
+        CourseEnrollment.objects.bulk_create([
+            CourseEnrollment(course=course, student=user) for course in courses for user in users
+        ])
@@ -0,0 +1,99 @@
+# courses/management/commands/benchmark_quiz_grading.py
+import random
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from courses.models import Choice, Course, Lesson, Question, Quiz
+from courses.services.grading_services import QuizGradingService, answer_key_cache_key
+
+
+class Rollback(Exception):
+    pass
+
+
+class QueryCounter:
+    # Counts executed queries; connection.queries is capped and needs DEBUG.
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Benchmark quiz grading: per-answer lookups vs the cached answer key vs batch grading (submissions/sec)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=50, help='Questions in the quiz.')
+        parser.add_argument('--submissions', type=int, default=200, help='Submissions graded per run.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                quiz, submissions = self.build_quiz(options['questions'], options['submissions'])
+                cache.delete(answer_key_cache_key(quiz.id))
+                self.stdout.write(f"{'mode':>10} {'seconds':>10} {'subs/sec':>10} {'queries/sub':>12}")
+                for mode, run in (
+                    ('per_answer', self.run_per_answer),
+                    ('answer_key', self.run_answer_key),
+                    ('batch', self.run_batch),
+                ):
+                    queries = QueryCounter()
+                    with connection.execute_wrapper(queries):
+                        started = time.monotonic()
+                        run(quiz.id, submissions)
+                        elapsed = time.monotonic() - started
+                    rate = len(submissions) / elapsed if elapsed else 0
+                    self.stdout.write(
+                        f"{mode:>10} {elapsed:>10.2f} {rate:>10.0f} {queries.count / len(submissions):>12.2f}"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+        cache.delete(answer_key_cache_key(quiz.id))
+
+    def build_quiz(self, question_count, submission_count):
+        User = get_user_model()
+        User.objects.bulk_create([User(username=f'quiz_bench_{i}') for i in range(submission_count)])
+        users = list(User.objects.filter(username__startswith='quiz_bench_').values_list('id', flat=True))
+        course = Course.objects.create(title='Benchmark', description='Benchmark', instructor_id=users[0])
+        lesson = Lesson.objects.create(course=course, title='Benchmark')
+        quiz = Quiz.objects.create(lesson=lesson, title='Benchmark')
+
+        choices = Choice.objects.bulk_create([Choice(text=f'quiz_bench_choice_{i}') for i in range(4)])
+        questions = [Question.objects.create(text=f'Question {i}') for i in range(question_count)]
+        for question in questions:
+            question.choices.set(choices)
+            question.correct_choice = random.choice(choices)
+            question.save()
+        quiz.questions.add(*questions)
+
+        submissions = [
+            {
+                'user': user_id,
+                'answers': [
+                    {'question': question.id, 'choice': random.choice(choices).id} for question in questions
+                ],
+            }
+            for user_id in users
+        ]
+        return quiz, submissions
+
+    def run_per_answer(self, quiz_id, submissions):
+        # What submit_quiz did before: a question and a choice lookup per answer.
+        for submission in submissions:
+            sum(
+                1 for answer in submission['answers']
+                if Question.objects.get(quizzes=quiz_id, id=answer['question']).correct_choice
+                == Choice.objects.get(id=answer['choice'])
+            )
+
+    def run_answer_key(self, quiz_id, submissions):
+        for submission in submissions:
+            QuizGradingService.grade_submission(quiz_id, submission['answers'])
+
+    def run_batch(self, quiz_id, submissions):
+        QuizGradingService.grade_submissions(quiz_id, submissions)
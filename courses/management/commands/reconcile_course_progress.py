@@ -0,0 +1,18 @@
+# courses/management/commands/reconcile_course_progress.py
+from django.core.management.base import BaseCommand
+from courses.services.progress_services import CourseProgressService
+
+
+class Command(BaseCommand):
+    help = "Recount course lessons and completed lessons, and fix the stored enrollment progress."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='course_ids',
+                            help='Course to reconcile; may be repeated. Defaults to all courses.')
+
+    def handle(self, *args, **options):
+        result = CourseProgressService.reconcile(course_ids=options['course_ids'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result['courses']} courses: fixed {result['courses_fixed']} lesson counts "
+            f"and {result['enrollments_fixed']} enrollments"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0005_delete_attachment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="lesson_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="courseenrollment",
+            name="completed_lessons",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
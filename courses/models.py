@@ -26,6 +26,7 @@ class Course(models.Model):
         duration (DurationField): The duration of the course.
         language (CharField): The language in which the course is taught.
         level (CharField): The level of the course (Beginner, Intermediate, Advanced).
+        lesson_count (PositiveIntegerField): Number of lessons, maintained as lessons are added and removed.
     """
     title = models.CharField(max_length=255)
     description = models.TextField()
@@ -43,6 +44,7 @@ class Course(models.Model):
     duration = models.DurationField(default=timedelta(weeks=1))
     language = models.CharField(max_length=50, default='English')
     level = models.CharField(max_length=50, choices=[('Beginner', 'Beginner'), ('Intermediate', 'Intermediate'), ('Advanced', 'Advanced')], null=True, blank=True)
+    lesson_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.title
@@ -176,11 +178,13 @@ class CourseEnrollment(models.Model):
         course (ForeignKey): The course in which the student is enrolled.
         student (ForeignKey): The student enrolled in the course.
         enrolled_at (DateTimeField): The date and time when the student enrolled.
+        completed_lessons (PositiveIntegerField): Number of the course's lessons the student completed.
         progress (FloatField): The student's progress in the course as a percentage.
     """
     course = models.ForeignKey(Course, related_name='enrolled_courses', on_delete=models.CASCADE)
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     enrolled_at = models.DateTimeField(auto_now_add=True)
+    completed_lessons = models.PositiveIntegerField(default=0)
     progress = models.FloatField(default=0)  # Track progress as a percentage
 
     def __str__(self):
@@ -1,6 +1,32 @@
-from django.db.models import Count, Q
+import base64
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Prefetch, Q
 from courses.models import Course, CourseEnrollment, CourseCompletion, Lesson, LessonProgress, Quiz, QuizProgress, Question, Choice
-from courses.serializers import CourseSerializer, CourseEnrollmentSerializer, CourseCompletionSerializer, LessonSerializer, LessonProgressSerializer, QuizSerializer, QuizProgressSerializer, QuestionSerializer, ChoiceSerializer
+from companies.models import Company
+from groups.models import GroupMembership
+from courses.serializers import CourseSerializer, CourseCatalogSerializer, CourseEnrollmentSerializer, CourseCompletionSerializer, LessonSerializer, LessonProgressSerializer, QuizSerializer, QuizProgressSerializer, QuestionSerializer, ChoiceSerializer
+
+DEFAULT_CATALOG_PAGE_SIZE = 20
+MAX_CATALOG_PAGE_SIZE = 100
+
+
+def encode_course_cursor(course):
+    """
+    Encode the position of the last course of a catalog page as an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(str(course.id).encode()).decode()
+
+def decode_course_cursor(cursor):
+    """
+    Decode a cursor produced by encode_course_cursor into a course ID.
+
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor.") from e
 
 
 class CourseQuery:
@@ -15,6 +41,50 @@ class CourseQuery:
         return serializer.data
     
 
+    @staticmethod
+    def get_course_catalog_page(cursor=None, limit=DEFAULT_CATALOG_PAGE_SIZE, fields=None):
+        """
+        Get one page of the course catalog, ordered by ID, with keyset pagination.
+
+        Only the requested fields are loaded: concrete columns with only(), and
+        each requested many-to-many relation with one prefetch query of IDs.
+        A page therefore costs the same number of queries whatever its size.
+
+        Args:
+        - cursor (str, optional): Cursor returned with the previous page.
+        - limit (int): Page size, capped at MAX_CATALOG_PAGE_SIZE.
+        - fields (list, optional): CourseSerializer fields to return; all of them by default.
+
+        Returns:
+        - tuple: (serialized courses, next cursor or None when this is the last page).
+
+        Raises:
+        - ValueError: If the cursor or limit is malformed or a field is unknown.
+        """
+        try:
+            limit = max(1, min(int(limit), MAX_CATALOG_PAGE_SIZE))
+        except (TypeError, ValueError):
+            raise ValueError("Limit must be an integer.")
+        available = list(CourseSerializer().fields)
+        fields = list(fields) if fields else available
+        unknown = set(fields) - set(available)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+
+        model_fields = [Course._meta.get_field(name) for name in fields if name != 'id']
+        query = Course.objects.order_by('id').only(
+            'id', *(field.name for field in model_fields if not field.many_to_many)
+        ).prefetch_related(*(
+            Prefetch(field.name, queryset=field.related_model.objects.only('id'))
+            for field in model_fields if field.many_to_many
+        ))
+        if cursor:
+            query = query.filter(id__gt=decode_course_cursor(cursor))
+        courses = list(query[:limit + 1])
+        next_cursor = encode_course_cursor(courses[limit - 1]) if len(courses) > limit else None
+        serializer = CourseCatalogSerializer(courses[:limit], many=True, fields=fields)
+        return serializer.data, next_cursor
+
     @staticmethod
     def get_course_by_id(course_id):
         """
@@ -30,6 +100,20 @@ class CourseQuery:
         Get a course by its ID without using a serializer.
         """
         return Course.objects.get(id=course_id)
+
+    @staticmethod
+    def get_course_for_update(course_id):
+        """
+        Get a course and lock its row until the end of the transaction, so enrollments in it run one at a time.
+        """
+        return Course.objects.select_for_update().get(id=course_id)
+
+    @staticmethod
+    def get_course_enrollment(student, course):
+        """
+        Get a student's enrollment in a course, or None.
+        """
+        return CourseEnrollment.objects.filter(student=student, course=course).first()
     
     @staticmethod
     def delete_course(course_id):
@@ -115,19 +199,26 @@ class CourseQuery:
         """
         return Quiz.objects.get(id=quiz_id)
     
+    @staticmethod
+    def get_quiz_with_course(quiz_id):
+        """
+        Get a quiz by its ID together with its lesson and course.
+        """
+        return Quiz.objects.select_related('lesson__course').get(id=quiz_id)
+
     @staticmethod
     def get_quiz_question_by_id_without_serializer(quiz_id, question_id):
         """
         Get a question in a specific quiz by its ID without using a serializer.
         """
-        return Question.objects.get(quiz=quiz_id, id=question_id)
+        return Question.objects.get(quizzes=quiz_id, id=question_id)
     
     @staticmethod
     def get_quiz_question_by_id(quiz_id, question_id):
         """
         Get a question in a specific quiz by its ID.
         """
-        question = Question.objects.get(quiz=quiz_id, id=question_id)
+        question = Question.objects.get(quizzes=quiz_id, id=question_id)
         serializer = QuestionSerializer(question)
         return serializer.data
     
@@ -136,11 +227,25 @@ class CourseQuery:
         """
         Get all questions in a specific quiz.
         """
-        questions = Question.objects.filter(quiz=quiz_id)
+        questions = Question.objects.filter(quizzes=quiz_id)
         serializer = QuestionSerializer(questions, many=True)
         return serializer.data
     
 
+    @staticmethod
+    def get_quiz_answer_key(quiz_id):
+        """
+        Get the correct choice ID of every question in a specific quiz, in one query.
+        """
+        return dict(Question.objects.filter(quizzes=quiz_id).values_list('id', 'correct_choice_id'))
+
+    @staticmethod
+    def get_quiz_ids_by_question(question_id):
+        """
+        Get the IDs of the quizzes a specific question belongs to.
+        """
+        return list(Quiz.objects.filter(questions=question_id).values_list('id', flat=True))
+
     @staticmethod
     def get_choice_by_id_without_serializer(choice_id):
         """
@@ -167,6 +272,37 @@ class CourseQuery:
         """
         return Course.objects.filter(courseenrollment__student=student)
 
+    @staticmethod
+    def get_unenrolled_user_ids(course_id, user_ids=None, group_id=None, company_id=None):
+        """
+        Get the IDs of existing users from a list, a group and/or a company who are not enrolled in a course yet, in one query.
+        """
+        candidates = Q(pk__in=[])
+        if user_ids:
+            candidates |= Q(id__in=user_ids)
+        if group_id is not None:
+            candidates |= Q(id__in=GroupMembership.objects.filter(group_id=group_id).values('user_id'))
+        if company_id is not None:
+            candidates |= Q(id__in=Company.members.through.objects.filter(company_id=company_id).values('user_id'))
+        return list(
+            get_user_model().objects
+            .filter(candidates)
+            .exclude(id__in=CourseEnrollment.objects.filter(course_id=course_id).values('student_id'))
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+
+    @staticmethod
+    def get_completed_lesson_counts(course_id, user_ids):
+        """
+        Get the number of a course's lessons each of the given users completed.
+        """
+        return dict(
+            LessonProgress.objects.filter(lesson__course_id=course_id, user_id__in=user_ids)
+            .values('user_id').annotate(completed=Count('id'))
+            .values_list('user_id', 'completed')
+        )
+
     @staticmethod
     def get_course_enrollments_by_student(student):
         """
@@ -1,5 +1,6 @@
 # Create serializers for the Course model
 
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import Course, CourseEnrollment, CourseCompletion, Lesson, Quiz, Choice, LessonProgress, QuizProgress, Question
 
@@ -8,6 +9,17 @@ class CourseSerializer(serializers.ModelSerializer):
         model = Course
         fields = '__all__'
 
+class CourseCatalogSerializer(CourseSerializer):
+    """
+    CourseSerializer limited to the fields given with ``fields`` (sparse fieldsets).
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 class CourseCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
@@ -57,4 +69,28 @@ class QuestionSerializer(serializers.ModelSerializer):
     correct_choice = ChoiceSerializer(read_only=True)
     class Meta:
         model = Question
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class QuizAnswerSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    choice = serializers.IntegerField()
+
+class QuizSubmissionSerializer(serializers.Serializer):
+    user = serializers.IntegerField()
+    answers = QuizAnswerSerializer(many=True)
+
+class QuizGradingSerializer(serializers.Serializer):
+    """
+    Validates a batch of quiz submissions: one per user, for users that exist.
+    """
+    submissions = QuizSubmissionSerializer(many=True, allow_empty=False)
+
+    def validate_submissions(self, submissions):
+        user_ids = [submission['user'] for submission in submissions]
+        if len(set(user_ids)) != len(user_ids):
+            raise serializers.ValidationError("Each user can only have one submission.")
+        found = set(get_user_model().objects.filter(id__in=user_ids).values_list('id', flat=True))
+        missing = sorted(set(user_ids) - found)
+        if missing:
+            raise serializers.ValidationError(f"Unknown users: {missing}")
+        return submissions
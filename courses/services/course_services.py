@@ -1,14 +1,19 @@
-from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, PermissionDenied, ValidationError
+from django.db import transaction
 from courses.models import Course, CourseEnrollment, CourseCompletion, Lesson, LessonProgress, Quiz, QuizProgress, Question, Choice
 from courses.serializers import CourseSerializer, CourseEnrollmentSerializer, CourseCompletionSerializer, LessonSerializer, LessonProgressSerializer, QuizSerializer, QuizProgressSerializer, QuestionSerializer, ChoiceSerializer
-from courses.utils import DateTimeUtils, UserUtils
-from notifications.utils import NotificationUtils
+from courses.utils import DateTimeUtils, UserUtils, NotificationUtils
 from courses.helpers.course_helpers import CourseHelpers
-from courses.querying.course_query import CourseQuery
+from courses.querying.course_query import CourseQuery, DEFAULT_CATALOG_PAGE_SIZE
+from courses.services.grading_services import QuizGradingService
+from courses.services.progress_services import CourseProgressService, compute_progress
 import logging
 
 logger = logging.getLogger(__name__)
 
+ENROLLMENT_BATCH_SIZE = getattr(settings, 'COURSE_ENROLLMENT_BATCH_SIZE', 1000)
+
 class CourseService:
     """
     Service class for managing courses, lessons, quizzes, and user progress.
@@ -24,6 +29,16 @@ class CourseService:
         """
         return CourseQuery.get_all_courses()
 
+    @staticmethod
+    def get_course_catalog(cursor=None, limit=None, fields=None):
+        """
+        Retrieve one page of the course catalog, optionally limited to some fields.
+        """
+        courses, next_cursor = CourseQuery.get_course_catalog_page(
+            cursor, limit or DEFAULT_CATALOG_PAGE_SIZE, fields
+        )
+        return {'results': courses, 'next_cursor': next_cursor}
+
     @staticmethod
     def create_course(course_data):
         """
@@ -77,14 +92,15 @@ class CourseService:
         """
         Enroll a user in a course and send a notification.
         """
-        course = CourseQuery.get_course_by_id_without_serializer(course_id)
-        user = UserUtils.get_user_by_id(user_id)
+        user = UserUtils.get_current_user(user_id)
+        with transaction.atomic():
+            # The course row lock keeps concurrent enrollments from creating duplicates.
+            course = CourseQuery.get_course_for_update(course_id)
+            if CourseQuery.get_course_enrollment(user, course):
+                raise ValidationError('User is already enrolled in this course.')
 
-        if CourseQuery.get_course_enrollment(user, course):
-            raise ValidationError('User is already enrolled in this course.')
-
-        course_enrollment = CourseEnrollment(user=user, course=course)
-        course_enrollment.save()
+            course_enrollment = CourseEnrollment(student=user, course=course)
+            course_enrollment.save()
 
         # Handle notification
         self.notification.handle_course_enrollment(user_id=user_id, course_id=course_id)
@@ -92,24 +108,86 @@ class CourseService:
         serializer = CourseEnrollmentSerializer(course_enrollment)
         return serializer.data
 
+    def bulk_enroll_course(self, course_id, user_ids=None, group_id=None, company_id=None):
+        """
+        Enroll many users in a course at once and notify them with one background fan-out.
+
+        Users can be given by ID, by group and/or by company. Users who do not
+        exist or are already enrolled are skipped.
+
+        Raises:
+        - ValueError: If no users are given or an ID is not an integer.
+        - Course.DoesNotExist: If the course does not exist.
+        """
+        if user_ids is not None and not isinstance(user_ids, (list, tuple)):
+            raise ValueError('user_ids must be a list of user IDs.')
+        try:
+            user_ids = [int(user_id) for user_id in user_ids or []]
+            group_id = int(group_id) if group_id is not None else None
+            company_id = int(company_id) if company_id is not None else None
+        except (TypeError, ValueError):
+            raise ValueError('user_ids, group_id and company_id must be integer IDs.')
+        if not user_ids and group_id is None and company_id is None:
+            raise ValueError('Provide user_ids, group_id or company_id.')
+
+        with transaction.atomic():
+            # The course row lock serializes enrollments in this course, so the
+            # unenrolled users resolved below cannot be enrolled concurrently.
+            course = CourseQuery.get_course_for_update(course_id)
+            new_user_ids = CourseQuery.get_unenrolled_user_ids(course.id, user_ids, group_id, company_id)
+
+            if new_user_ids:
+                # Lessons completed before enrolling count towards the new enrollments' progress.
+                completed = CourseQuery.get_completed_lesson_counts(course.id, new_user_ids)
+                enrollments = [
+                    CourseEnrollment(
+                        course=course,
+                        student_id=user_id,
+                        completed_lessons=completed.get(user_id, 0),
+                        progress=compute_progress(completed.get(user_id, 0), course.lesson_count),
+                    )
+                    for user_id in new_user_ids
+                ]
+                CourseEnrollment.objects.bulk_create(enrollments, batch_size=ENROLLMENT_BATCH_SIZE)
+                # robust: a failure to queue the notifications must not fail the committed enrollments
+                transaction.on_commit(
+                    lambda: self.notification.handle_bulk_course_enrollment(new_user_ids, course),
+                    robust=True,
+                )
+
+        return {'course': course.id, 'enrolled': len(new_user_ids)}
+
     def get_course_progress(self, user_id, course_id):
         """
-        Calculate the progress of a user in a specific course.
+        Get the progress of a user in a specific course.
+
+        Enrolled users' progress is stored on their enrollment; it is only
+        counted from the lessons for users who are not enrolled.
         """
+        progress = CourseProgressService.get_progress(course_id, user_id)
+        if progress is not None:
+            return progress
         course = CourseQuery.get_course_by_id_without_serializer(course_id)
-        user = UserUtils.get_user_by_id(user_id)
+        user = UserUtils.get_current_user(user_id)
         lessons = Lesson.objects.filter(course=course)
         total_lessons = lessons.count()
         completed_lessons = LessonProgress.objects.filter(user=user, lesson__in=lessons).count()
         progress = (completed_lessons / total_lessons) * 100 if total_lessons > 0 else 0
         return progress
 
+    @staticmethod
+    def get_progress_by_student(user_id):
+        """
+        Get a user's progress in all the courses they are enrolled in.
+        """
+        return CourseProgressService.get_progress_by_student(user_id)
+
     def complete_course(self, course_id, user_id):
         """
         Mark a course as completed for a user and send a notification.
         """
         course = CourseQuery.get_course_by_id_without_serializer(course_id)
-        user = UserUtils.get_user_by_id(user_id)
+        user = UserUtils.get_current_user(user_id)
 
         if CourseQuery.get_course_completion(user, course):
             raise ValidationError('Course already completed by the user.')
@@ -123,9 +201,13 @@ class CourseService:
         serializer = CourseCompletionSerializer(course_completion)
         return serializer.data
 
-    def add_lesson_to_course(self, course_id, lesson_data):
+    def add_lesson_to_course(self, course_id, lesson_data, requested_by=None):
         """
-        Add a new lesson to a specific course and send notifications.
+        Add a new lesson to a specific course and notify its students in the background.
+
+        The response carries the notification fan-out's task ID; its progress is
+        served to the requesting user (requested_by) by the notifications app's
+        fan-out status endpoint.
         """
         course = CourseQuery.get_course_by_id_without_serializer(course_id)
         lesson, tags = CourseHelpers.process_lesson_data(course_id, lesson_data)
@@ -134,22 +216,21 @@ class CourseService:
         if tags:
             lesson.tags.add(*tags)
 
-        # Notify all users enrolled in the course
-        enrollments = CourseEnrollment.objects.filter(course=course)
-        for enrollment in enrollments:
-            self.notification.send_notification(
-                user=enrollment.user,
-                notification_type_name='New Lesson Added',
-                content=f'A new lesson has been added to the course: {course.title}.',
-                url=f'/courses/{course_id}/lessons/{lesson.id}/'
-            )
+        # Notify all users enrolled in the course in the background
+        task_id = self.notification.notify_course_students(
+            course,
+            notification_type_name='New Lesson Added',
+            content=f'A new lesson has been added to the course: {course.title}.',
+            url=f'/courses/{course_id}/lessons/{lesson.id}/',
+            requested_by=requested_by,
+        )
 
         serializer = LessonSerializer(lesson)
-        return serializer.data
+        return {**serializer.data, 'notification_task_id': task_id}
 
-    def update_lesson(self, course_id, lesson_id, lesson_data):
+    def update_lesson(self, course_id, lesson_id, lesson_data, requested_by=None):
         """
-        Update an existing lesson in a specific course and notify users.
+        Update an existing lesson in a specific course and notify its students in the background.
         """
         lesson = CourseQuery.get_course_lesson_by_id_without_serializer(course_id, lesson_id)
         lesson, new_tags = CourseHelpers.process_lesson_update_data(lesson, lesson_data)
@@ -158,19 +239,18 @@ class CourseService:
         if new_tags:
             lesson.tags.add(*new_tags)
 
-        # Notify users about the lesson update
+        # Notify users about the lesson update in the background
         course = CourseQuery.get_course_by_id_without_serializer(course_id)
-        enrollments = CourseEnrollment.objects.filter(course=course)
-        for enrollment in enrollments:
-            self.notification.send_notification(
-                user=enrollment.user,
-                notification_type_name='Lesson Updated',
-                content=f'The lesson in course: {course.title} has been updated.',
-                url=f'/courses/{course_id}/lessons/{lesson_id}/'
-            )
+        task_id = self.notification.notify_course_students(
+            course,
+            notification_type_name='Lesson Updated',
+            content=f'The lesson in course: {course.title} has been updated.',
+            url=f'/courses/{course_id}/lessons/{lesson_id}/',
+            requested_by=requested_by,
+        )
 
         serializer = LessonSerializer(lesson)
-        return serializer.data
+        return {**serializer.data, 'notification_task_id': task_id}
 
     def get_lessons_by_course(self, course_id):
         """
@@ -207,9 +287,12 @@ class CourseService:
         Register progress for a lesson completed by a user and send a notification.
         """
         lesson = CourseQuery.get_course_lesson_by_id_without_serializer(course_id, lesson_id)
-        user = UserUtils.get_user_by_id(user_id)
+        user = UserUtils.get_current_user(user_id)
         
-        lesson_progress, created = LessonProgress.objects.get_or_create(lesson=lesson, user=user)
+        # A new progress row counts towards the enrollment's progress; see courses/signals.py
+        lesson_progress, created = LessonProgress.objects.get_or_create(
+            lesson=lesson, user=user, defaults={'completed_at': DateTimeUtils.now()}
+        )
         if not created:
             lesson_progress.completed_at = DateTimeUtils.now()
             lesson_progress.save()
@@ -268,61 +351,81 @@ class CourseService:
         serializer = QuestionSerializer(question)
         return serializer.data
 
-def update_quiz_question(self, quiz_id, question_id, question_data):
-    """
-    Update a specific question in a quiz and notify admins.
-    """
-    quiz = CourseQuery.get_quiz_by_id_without_serializer(quiz_id)
-    question = CourseQuery.get_quiz_question_by_id_without_serializer(quiz_id, question_id)
-    question, choices, correct_choice = CourseHelpers.process_question_update_data(question, question_data)
+    def update_quiz_question(self, quiz_id, question_id, question_data):
+        """
+        Update a specific question in a quiz and notify admins.
+        """
+        quiz = CourseQuery.get_quiz_by_id_without_serializer(quiz_id)
+        question = CourseQuery.get_quiz_question_by_id_without_serializer(quiz_id, question_id)
+        question, choices, correct_choice = CourseHelpers.process_question_update_data(question, question_data)
     
-    question.save()
-    question.choices.set(choices)
-    question.correct_choice = correct_choice
-    question.save()
-
-    # Notify admins about the question update
-    self.notification.notify_admins(
-        notification_type_name='Question Added/Updated',
-        content=f'A question has been added or updated in quiz: {quiz.title}.',
-        url=f'/quizzes/{quiz_id}/questions/{question.id}/'
-    )
-
-    serializer = QuestionSerializer(question)
-    return serializer.data
-
-def get_quiz_question(self, quiz_id, question_id):
-    """
-    Retrieve a specific question in a quiz.
-    """
-    return CourseQuery.get_quiz_question_by_id(quiz_id, question_id)
+        question.save()
+        question.choices.set(choices)
+        question.correct_choice = correct_choice
+        question.save()
 
-def get_all_quiz_questions(self, quiz_id):
-    """
-    Retrieve all questions in a specific quiz.
-    """
-    return CourseQuery.get_all_quiz_questions(quiz_id)
+        # Notify admins about the question update
+        self.notification.notify_admins(
+            notification_type_name='Question Added/Updated',
+            content=f'A question has been added or updated in quiz: {quiz.title}.',
+            url=f'/quizzes/{quiz_id}/questions/{question.id}/'
+        )
 
-def submit_quiz(self, user_id, quiz_id, answers):
-    """
-    Submit quiz answers for a user and return the quiz progress.
-    """
-    quiz = CourseQuery.get_quiz_by_id_without_serializer(quiz_id)
-    user = UserUtils.get_user_by_id(user_id)
-    score = sum(
-        1 for answer in answers
-        if CourseQuery.get_quiz_question_by_id_without_serializer(quiz_id, answer['question']).correct_choice == 
-           CourseQuery.get_choice_by_id_without_serializer(answer['choice'])
-    )
-
-    quiz_progress = QuizProgress(user=user, quiz=quiz, score=score)
-    quiz_progress.save()
-
-    # Handle notification
-    self.notification.handle_quiz_submission(user_id=user_id, quiz_id=quiz_id, answers=answers)
-
-    serializer = QuizProgressSerializer(quiz_progress)
-    return serializer.data
+        serializer = QuestionSerializer(question)
+        return serializer.data
+
+    def get_quiz_question(self, quiz_id, question_id):
+        """
+        Retrieve a specific question in a quiz.
+        """
+        return CourseQuery.get_quiz_question_by_id(quiz_id, question_id)
+
+    def get_all_quiz_questions(self, quiz_id):
+        """
+        Retrieve all questions in a specific quiz.
+        """
+        return CourseQuery.get_all_quiz_questions(quiz_id)
+
+    def submit_quiz(self, user_id, quiz_id, answers):
+        """
+        Submit quiz answers for a user and return the quiz progress.
+
+        The answers are graded in memory against the quiz's cached answer key.
+        """
+        quiz = CourseQuery.get_quiz_by_id_without_serializer(quiz_id)
+        user = UserUtils.get_current_user(user_id)
+        score = QuizGradingService.grade_submission(quiz_id, answers)
+
+        quiz_progress = QuizProgress(user=user, quiz=quiz, score=score)
+        quiz_progress.save()
+
+        # Handle notification
+        self.notification.handle_quiz_submission(user_id=user_id, quiz_id=quiz_id, answers=answers)
+
+        serializer = QuizProgressSerializer(quiz_progress)
+        return serializer.data
+
+    @staticmethod
+    def grade_quiz_submissions(quiz_id, submissions, requested_by):
+        """
+        Grade and store many submissions of a quiz at once, without notifications.
+
+        Args:
+        - quiz_id (int): ID of the quiz.
+        - submissions (list): Dicts with the 'user' ID and its 'answers'.
+        - requested_by (User): The user grading; must be the course's instructor or staff.
+
+        Returns:
+        - dict: Score per user ID.
+
+        Raises:
+        - Quiz.DoesNotExist: If there is no such quiz.
+        - PermissionDenied: If the user may not grade the quiz.
+        """
+        quiz = CourseQuery.get_quiz_with_course(quiz_id)
+        if not (requested_by.is_staff or quiz.lesson.course.instructor_id == requested_by.id):
+            raise PermissionDenied("Only the course instructor can grade this quiz.")
+        return QuizGradingService.grade_submissions(quiz_id, submissions)
     
     
     
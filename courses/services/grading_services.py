@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from courses.models import QuizProgress
+from courses.querying.course_query import CourseQuery
+
+ANSWER_KEY_CACHE_TIMEOUT = getattr(settings, 'QUIZ_ANSWER_KEY_CACHE_TIMEOUT', 60 * 60)
+GRADING_BATCH_SIZE = getattr(settings, 'QUIZ_GRADING_BATCH_SIZE', 1000)
+
+
+def answer_key_cache_key(quiz_id):
+    return f"quiz_answer_key_{quiz_id}"
+
+
+class QuizGradingService:
+    """
+    Grades quiz submissions against a cached answer key.
+
+    The answer key of a quiz (question ID to correct choice ID) is loaded with
+    one query and kept in the shared cache until one of the quiz's questions
+    changes; see the receivers in courses/signals.py. Grading itself is done
+    in memory, so a submission costs no queries per answer.
+    """
+
+    @staticmethod
+    def get_answer_key(quiz_id):
+        """
+        Get the answer key of a quiz.
+
+        Args:
+        - quiz_id (int): ID of the quiz.
+
+        Returns:
+        - dict: Correct choice ID per question ID.
+        """
+        key = answer_key_cache_key(quiz_id)
+        answer_key = cache.get(key)
+        if answer_key is None:
+            answer_key = CourseQuery.get_quiz_answer_key(quiz_id)
+            cache.set(key, answer_key, timeout=ANSWER_KEY_CACHE_TIMEOUT)
+        return answer_key
+
+    @staticmethod
+    def invalidate(quiz_ids):
+        """
+        Drop the cached answer keys of quizzes whose questions changed.
+
+        Args:
+        - quiz_ids (iterable): IDs of the quizzes.
+        """
+        cache.delete_many([answer_key_cache_key(quiz_id) for quiz_id in quiz_ids])
+
+    @staticmethod
+    def grade(answer_key, answers):
+        """
+        Score answers against an answer key.
+
+        Each question counts once, with the last answer given to it; answers to
+        questions that are not part of the quiz score nothing.
+
+        Args:
+        - answer_key (dict): Correct choice ID per question ID.
+        - answers (list): Dicts with the 'question' and 'choice' IDs.
+
+        Returns:
+        - int: Number of correctly answered questions.
+        """
+        chosen = {int(answer['question']): int(answer['choice']) for answer in answers}
+        return sum(
+            1 for question_id, choice_id in chosen.items()
+            if answer_key.get(question_id) == choice_id
+        )
+
+    @staticmethod
+    def grade_submission(quiz_id, answers):
+        """
+        Score a single submission of a quiz.
+
+        Args:
+        - quiz_id (int): ID of the quiz.
+        - answers (list): Dicts with the 'question' and 'choice' IDs.
+
+        Returns:
+        - int: The score.
+        """
+        return QuizGradingService.grade(QuizGradingService.get_answer_key(quiz_id), answers)
+
+    @staticmethod
+    def grade_submissions(quiz_id, submissions, batch_size=None):
+        """
+        Score many submissions of a quiz and store them, e.g. for offline or imported attempts.
+
+        The answer key is loaded once for all submissions. Scores are written
+        with one upsert per batch, replacing earlier scores of the same users.
+
+        Args:
+        - quiz_id (int): ID of the quiz.
+        - submissions (list): Dicts with the 'user' ID and its 'answers'.
+        - batch_size (int, optional): Quiz progress rows per upsert.
+
+        Returns:
+        - dict: Score per user ID.
+
+        Raises:
+        - ValueError: If a submission is malformed or a user has more than one.
+        """
+        batch_size = batch_size or GRADING_BATCH_SIZE
+        answer_key = QuizGradingService.get_answer_key(quiz_id)
+        try:
+            scores = {
+                int(submission['user']): QuizGradingService.grade(answer_key, submission['answers'])
+                for submission in submissions
+            }
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Each submission needs a user ID and a list of question and choice IDs.")
+        if len(scores) != len(submissions):
+            raise ValueError("Each user can only have one submission.")
+        completed_at = timezone.now()
+        rows = [
+            QuizProgress(user_id=user_id, quiz_id=quiz_id, score=score, completed_at=completed_at)
+            for user_id, score in scores.items()
+        ]
+        with transaction.atomic():
+            QuizProgress.objects.bulk_create(
+                rows,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['user', 'quiz'],
+                update_fields=['score', 'completed_at'],
+            )
+        return scores
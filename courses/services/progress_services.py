@@ -0,0 +1,199 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+from courses.models import Course, CourseEnrollment, LessonProgress
+
+PROGRESS_RECONCILE_BATCH_SIZE = getattr(settings, 'COURSE_PROGRESS_RECONCILE_BATCH_SIZE', 1000)
+
+
+def course_lesson_count():
+    """
+    Lesson count of an enrollment's course, read in the same statement as the update using it.
+    """
+    return Subquery(Course.objects.filter(id=OuterRef('course_id')).values('lesson_count')[:1])
+
+
+def progress_expression(completed_lessons, lesson_count):
+    """
+    Percentage of completed lessons as a database expression, for use in update(); 0 without lessons.
+    """
+    return Coalesce(
+        ExpressionWrapper(completed_lessons * 100.0 / NullIf(lesson_count, 0), output_field=FloatField()),
+        Value(0.0),
+    )
+
+
+def compute_progress(completed_lessons, lesson_count):
+    return min(completed_lessons * 100.0 / lesson_count, 100.0) if lesson_count else 0.0
+
+
+class CourseProgressService:
+    """
+    Maintains the materialized progress of course enrollments.
+
+    Each course counts its lessons and each enrollment counts the lessons its
+    student completed; progress is derived from the two and stored on the
+    enrollment. The counters are adjusted with single UPDATE statements as
+    lessons are completed, uncompleted, added and removed (see the receivers in
+    courses/signals.py), so reading progress is a column read. Paths that
+    bypass the signals, such as bulk deletes, are fixed up by reconcile().
+    """
+
+    @staticmethod
+    def record_lesson_completion(course_id, student_id):
+        """
+        Count a newly completed lesson towards a student's enrollment.
+
+        Args:
+        - course_id (int): ID of the lesson's course.
+        - student_id (int): ID of the student.
+        """
+        CourseEnrollment.objects.filter(course_id=course_id, student_id=student_id).update(
+            completed_lessons=F('completed_lessons') + 1,
+            progress=progress_expression(F('completed_lessons') + 1, course_lesson_count()),
+        )
+
+    @staticmethod
+    def record_lesson_uncompletion(course_id, student_id):
+        """
+        Uncount a completed lesson whose progress row was deleted, never going below zero.
+
+        Args:
+        - course_id (int): ID of the lesson's course.
+        - student_id (int): ID of the student.
+        """
+        CourseEnrollment.objects.filter(course_id=course_id, student_id=student_id, completed_lessons__gt=0).update(
+            completed_lessons=F('completed_lessons') - 1,
+            progress=progress_expression(F('completed_lessons') - 1, course_lesson_count()),
+        )
+
+    @staticmethod
+    def record_lesson_added(course_id):
+        """
+        Count a new lesson of a course and lower its enrollments' progress accordingly.
+
+        Args:
+        - course_id (int): ID of the course.
+        """
+        with transaction.atomic():
+            Course.objects.filter(id=course_id).update(lesson_count=F('lesson_count') + 1)
+            CourseProgressService.refresh_enrollments(course_id)
+
+    @staticmethod
+    def record_lesson_removed(lesson):
+        """
+        Uncount a lesson that is about to be deleted, for its course and the students who completed it.
+
+        Args:
+        - lesson (Lesson): The lesson, before its progress rows are deleted.
+        """
+        with transaction.atomic():
+            Course.objects.filter(id=lesson.course_id, lesson_count__gt=0).update(
+                lesson_count=F('lesson_count') - 1
+            )
+            CourseEnrollment.objects.filter(
+                course_id=lesson.course_id,
+                completed_lessons__gt=0,
+                student_id__in=LessonProgress.objects.filter(lesson=lesson).values('user_id'),
+            ).update(completed_lessons=F('completed_lessons') - 1)
+            CourseProgressService.refresh_enrollments(lesson.course_id)
+
+    @staticmethod
+    def refresh_enrollments(course_id):
+        """
+        Recompute the progress of all enrollments of a course from their counters, in one statement.
+
+        Args:
+        - course_id (int): ID of the course.
+        """
+        CourseEnrollment.objects.filter(course_id=course_id).update(
+            progress=progress_expression(F('completed_lessons'), course_lesson_count()),
+        )
+
+    @staticmethod
+    def get_progress(course_id, student_id):
+        """
+        Get a student's stored progress in a course.
+
+        Args:
+        - course_id (int): ID of the course.
+        - student_id (int): ID of the student.
+
+        Returns:
+        - float: Progress as a percentage, or None if the student is not enrolled.
+        """
+        return (
+            CourseEnrollment.objects
+            .filter(course_id=course_id, student_id=student_id)
+            .values_list('progress', flat=True)
+            .first()
+        )
+
+    @staticmethod
+    def get_progress_by_student(student_id):
+        """
+        Get a student's progress in every course they are enrolled in, with one query.
+
+        Args:
+        - student_id (int): ID of the student.
+
+        Returns:
+        - list: Dicts with the course ID and title, completed lessons, lesson count and progress.
+        """
+        return list(
+            CourseEnrollment.objects
+            .filter(student_id=student_id)
+            .order_by('course_id')
+            .values(
+                'course_id', 'completed_lessons', 'progress',
+                course_title=F('course__title'), lesson_count=F('course__lesson_count'),
+            )
+        )
+
+    @staticmethod
+    def reconcile(course_ids=None, batch_size=None):
+        """
+        Recount lessons and completions from scratch and fix drifted counters.
+
+        Args:
+        - course_ids (list, optional): Courses to reconcile; all courses when omitted.
+        - batch_size (int, optional): Enrollments written per bulk update.
+
+        Returns:
+        - dict: Number of courses checked, and of courses and enrollments fixed.
+        """
+        batch_size = batch_size or PROGRESS_RECONCILE_BATCH_SIZE
+        courses = Course.objects.annotate(actual_lesson_count=Count('lessons')).order_by('id')
+        if course_ids is not None:
+            courses = courses.filter(id__in=course_ids)
+        result = {'courses': 0, 'courses_fixed': 0, 'enrollments_fixed': 0}
+
+        for course in courses.only('id', 'lesson_count').iterator(chunk_size=batch_size):
+            result['courses'] += 1
+            lesson_count = course.actual_lesson_count
+            completed = dict(
+                LessonProgress.objects.filter(lesson__course_id=course.id)
+                .values('user_id').annotate(completed=Count('id'))
+                .values_list('user_id', 'completed')
+            )
+            stale = []
+            for enrollment in CourseEnrollment.objects.filter(course_id=course.id).only(
+                'id', 'student_id', 'completed_lessons', 'progress'
+            ):
+                completed_lessons = completed.get(enrollment.student_id, 0)
+                progress = compute_progress(completed_lessons, lesson_count)
+                if (enrollment.completed_lessons, enrollment.progress) != (completed_lessons, progress):
+                    enrollment.completed_lessons = completed_lessons
+                    enrollment.progress = progress
+                    stale.append(enrollment)
+
+            with transaction.atomic():
+                if course.lesson_count != lesson_count:
+                    Course.objects.filter(id=course.id).update(lesson_count=lesson_count)
+                    result['courses_fixed'] += 1
+                CourseEnrollment.objects.bulk_update(
+                    stale, ['completed_lessons', 'progress'], batch_size=batch_size
+                )
+            result['enrollments_fixed'] += len(stale)
+        return result
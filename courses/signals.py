@@ -1,6 +1,10 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Course, CourseEnrollment, CourseCompletion
+from .models import Course, CourseEnrollment, CourseCompletion, Lesson, LessonProgress, Quiz, Question
+from .querying.course_query import CourseQuery
+from .services.grading_services import QuizGradingService
+from .services.progress_services import CourseProgressService
 from notifications.models import Notification
 
 # Signal to send notification when a user enrolls in a course
@@ -60,3 +64,40 @@ def delete_associated_course_completions(sender, instance, **kwargs):
 @receiver(post_delete, sender=Course)
 def delete_associated_course_enrollments(sender, instance, **kwargs):
     CourseEnrollment.objects.filter(course=instance).delete()
+
+# Signals to drop cached quiz answer keys when a quiz's questions change
+@receiver(post_save, sender=Question)
+@receiver(pre_delete, sender=Question)
+def invalidate_question_answer_keys(sender, instance, **kwargs):
+    QuizGradingService.invalidate(CourseQuery.get_quiz_ids_by_question(instance.id))
+
+@receiver(m2m_changed, sender=Quiz.questions.through)
+def invalidate_quiz_answer_key(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        if reverse:
+            # instance is a Question; pk_set holds quiz IDs, except on clear
+            quiz_ids = pk_set if pk_set else CourseQuery.get_quiz_ids_by_question(instance.id)
+        else:
+            quiz_ids = [instance.id]
+        QuizGradingService.invalidate(quiz_ids)
+
+# Signals to keep lesson counts and enrollment progress up to date
+@receiver(post_save, sender=LessonProgress)
+def count_lesson_completion(sender, instance, created, **kwargs):
+    if created:
+        CourseProgressService.record_lesson_completion(instance.lesson.course_id, instance.user_id)
+
+@receiver(post_delete, sender=LessonProgress)
+def uncount_lesson_completion(sender, instance, origin=None, **kwargs):
+    # Only direct deletes: rows removed with their lesson or course are uncounted by uncount_removed_lesson.
+    if isinstance(origin, LessonProgress) or (isinstance(origin, QuerySet) and origin.model is LessonProgress):
+        CourseProgressService.record_lesson_uncompletion(instance.lesson.course_id, instance.user_id)
+
+@receiver(post_save, sender=Lesson)
+def count_added_lesson(sender, instance, created, **kwargs):
+    if created:
+        CourseProgressService.record_lesson_added(instance.course_id)
+
+@receiver(pre_delete, sender=Lesson)
+def uncount_removed_lesson(sender, instance, **kwargs):
+    CourseProgressService.record_lesson_removed(instance)
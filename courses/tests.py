@@ -1,3 +1,69 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from activity.models import Category
+from courses.models import Course, CourseEnrollment
+from courses.querying.course_query import MAX_CATALOG_PAGE_SIZE
 
-# Create your tests here.
+
+class CourseCatalogQueryCountTests(TestCase):
+    """
+    A catalog page must take the same number of queries whatever its size (no N+1).
+    """
+    # The courses, plus one query per many-to-many field of CourseSerializer.
+    FULL_PAGE_QUERIES = 7
+    # The courses, plus one query for categories.
+    SPARSE_PAGE_QUERIES = 2
+    SPARSE_FIELDS = 'id,title,categories'
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        User.objects.bulk_create([User(username=f'catalog_test_{i}') for i in range(3)])
+        users = list(User.objects.filter(username__startswith='catalog_test_'))
+        cls.user = users[0]
+        categories = Category.objects.bulk_create([Category(name=f'catalog_test_{i}') for i in range(3)])
+        # One course more than the largest page, so every page is full and has a next cursor.
+        courses = Course.objects.bulk_create([
+            Course(title=f'Course {i}', description='Catalog', instructor=cls.user)
+            for i in range(MAX_CATALOG_PAGE_SIZE + 1)
+        ])
+        Course.categories.through.objects.bulk_create([
+            Course.categories.through(course_id=course.id, category_id=category.id)
+            for course in courses for category in categories
+        ])
+        Course.prerequisites.through.objects.bulk_create([
+            Course.prerequisites.through(from_course_id=course.id, to_course_id=courses[0].id)
+            for course in courses[1:]
+        ])
+        CourseEnrollment.objects.bulk_create([
+            CourseEnrollment(course=course, student=user) for course in courses for user in users
+        ])
+        for course in courses[:5]:
+            course.tags.add('python', 'django')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get_catalog(self, **params):
+        response = self.client.get(reverse('get_course_catalog'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_page_queries_do_not_depend_on_page_size(self):
+        for page_size in (1, 20, 100):
+            with self.subTest(page_size=page_size):
+                with self.assertNumQueries(self.FULL_PAGE_QUERIES):
+                    catalog = self.get_catalog(limit=page_size)
+                self.assertEqual(len(catalog['results']), page_size)
+                self.assertIsNotNone(catalog['next_cursor'])
+
+    def test_sparse_page_queries_do_not_depend_on_page_size(self):
+        for page_size in (1, 20, 100):
+            with self.subTest(page_size=page_size):
+                with self.assertNumQueries(self.SPARSE_PAGE_QUERIES):
+                    catalog = self.get_catalog(limit=page_size, fields=self.SPARSE_FIELDS)
+                self.assertEqual(len(catalog['results']), page_size)
+                self.assertEqual(set(catalog['results'][0]), set(self.SPARSE_FIELDS.split(',')))
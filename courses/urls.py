@@ -4,12 +4,15 @@ from courses import views
 urlpatterns = [
     path('create/', views.create_course, name='create_course'),
     path('list/', views.get_courses, name='get_courses'),
+    path('catalog/', views.get_course_catalog, name='get_course_catalog'),
     path('get/<int:course_id>/', views.get_specific_course, name='get_course'),
     path('update/<int:course_id>/', views.update_course, name='update_course'),
     path('delete/<int:course_id>/', views.delete_specific_course, name='delete_course'),
     path('delete/', views.delete_all_courses, name='delete_all_courses'),
     path('enroll/<int:course_id>/<int:user_id>/', views.enroll_course, name='enroll_course'),
+    path('bulk_enroll/<int:course_id>/', views.bulk_enroll_course, name='bulk_enroll_course'),
     path('progress/<int:course_id>/<int:user_id>/', views.update_course_progress, name='track_course_progress'),
+    path('progress/<int:user_id>/', views.get_progress_by_student, name='get_progress_by_student'),
     path('complete/<int:course_id>/<int:user_id>/', views.complete_course, name='complete_course'),
     path('add_lesson/<int:course_id>/', views.add_lesson_to_course, name='add_lesson_to_course'),
     path('list_lessons/<int:course_id>/', views.get_lessons_by_course, name='get_lessons_by_course'),
@@ -23,6 +26,7 @@ urlpatterns = [
     path('update_question/<int:quiz_id>/<int:question_id>/', views.update_question, name='update_question'),
     path('list_quiz_questions/<int:quiz_id>/', views.get_all_questions_for_quiz, name='get_quiz_questions'),
     path('submit_lessson_quiz/<user_id>/<quiz_id>/', views.submit_lesson_quiz, name='submit_lesson_quiz'),
+    path('grade_quiz_submissions/<int:quiz_id>/', views.grade_quiz_submissions, name='grade_quiz_submissions'),
 ]
 
 
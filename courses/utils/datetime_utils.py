@@ -1,4 +1,5 @@
 from datetime import datetime
+from django.utils import timezone
 
 class DateTimeUtils:
 
@@ -26,4 +27,14 @@ class DateTimeUtils:
         Returns:
             str: The formatted datetime string.
         """
-        return datetime_obj.strftime('%Y-%m-%d %H:%M:%S')
\ No newline at end of file
+        return datetime_obj.strftime('%Y-%m-%d %H:%M:%S')
+
+    @staticmethod
+    def now():
+        """
+        Get the current time.
+
+        Returns:
+            datetime: The current, timezone-aware datetime.
+        """
+        return timezone.now()
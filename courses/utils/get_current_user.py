@@ -11,4 +11,4 @@ class UserUtils:
         """
         Get the current user.
         """
-        return User.objects.get(id=user_id)
\ No newline at end of file
+        return User.objects.get(id=user_id)
@@ -1,10 +1,12 @@
 # utils/notification_utils.py 
 
 from notifications.services.notification_service import NotificationService
-from notifications.models import NotificationType
-from django.contrib.auth.models import User
+from notifications.utils.type_registry import notification_types
+from django.contrib.auth import get_user_model
 from courses.models import Course, Quiz, Lesson, Question
 
+User = get_user_model()
+
 class NotificationUtils:
     def __init__(self):
         self.notification_service = NotificationService()
@@ -14,8 +16,7 @@ class NotificationUtils:
         Get or create a notification type.
         """
         try:
-            notification_type, created = NotificationType.objects.get_or_create(type_name=type_name)
-            return notification_type
+            return notification_types.get(type_name)
         except Exception as e:
             raise ValueError(f"Failed to get or create notification type: {str(e)}")
 
@@ -102,6 +103,43 @@ class NotificationUtils:
             url=f'/courses/{course_id}/'
         )
 
+    def notify_course_students(self, course, notification_type_name, content, url='', requested_by=None):
+        """
+        Notify the students enrolled in a course with one background fan-out.
+
+        Returns the fan-out's task ID, which the requesting user (requested_by)
+        can look its status up with.
+        """
+        try:
+            result = self.notification_service.notify_course_students(
+                course.id,
+                self.get_or_create_notification_type(notification_type_name),
+                content_object=course,
+                content=content,
+                url=url,
+                run_async=True,
+                requested_by=requested_by,
+            )
+            return result['task_id']
+        except Exception as e:
+            raise ValueError(f"Failed to notify students of course {course.id}: {str(e)}")
+
+    def handle_bulk_course_enrollment(self, user_ids, course):
+        """
+        Handle notification for many users enrolled in a course at once, with one background fan-out.
+        """
+        try:
+            self.notification_service.notify_users(
+                user_ids,
+                self.get_or_create_notification_type('Course Enrollment'),
+                content_object=course,
+                content=f'You have been enrolled in the course: {course.title}.',
+                url=f'/courses/{course.id}/',
+                run_async=True,
+            )
+        except Exception as e:
+            raise ValueError(f"Failed to notify enrolled users: {str(e)}")
+
     def handle_course_completion(self, user_id, course_id):
         """
         Handle notification for a user completing a course.
@@ -145,9 +183,6 @@ class NotificationUtils:
         """
         user = User.objects.get(id=user_id)
         quiz = Quiz.objects.get(id=quiz_id)
-        score = self.calculate_score(quiz, answers)
-        # Save quiz progress logic here
-        
         self.send_notification(
             user=user,
             notification_type_name='Quiz Submitted',
@@ -159,5 +194,5 @@ class NotificationUtils:
         """
         Calculate the score for a quiz based on the answers.
         """
-        # Implement scoring logic
-        return random.randint(0, 100)  # Placeholder for actual scoring logic
+        from courses.services.grading_services import QuizGradingService
+        return QuizGradingService.grade_submission(quiz.id, answers)
@@ -1,4 +1,5 @@
 # create api views for courses
+from django.core.exceptions import PermissionDenied
 from django.shortcuts import render
 from rest_framework import generics
 from django.views.decorators.csrf import csrf_exempt
@@ -7,7 +8,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework.views import APIView
 from courses.models import Course, CourseEnrollment, CourseCompletion, Lesson, LessonProgress, Quiz, QuizProgress, Question, Choice
-from courses.serializers import CourseSerializer, CourseEnrollmentSerializer, CourseCompletionSerializer, LessonSerializer, LessonProgressSerializer, QuizSerializer, QuizProgressSerializer, QuestionSerializer, ChoiceSerializer, CourseCreateSerializer
+from courses.serializers import CourseSerializer, CourseEnrollmentSerializer, CourseCompletionSerializer, LessonSerializer, LessonProgressSerializer, QuizSerializer, QuizProgressSerializer, QuestionSerializer, ChoiceSerializer, CourseCreateSerializer, QuizGradingSerializer
 from courses.controllers.course_controller import CourseController
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiResponse
 from drf_spectacular.types import OpenApiTypes
@@ -45,6 +46,43 @@ def get_courses(request):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='cursor', type=str, location=OpenApiParameter.QUERY, required=False),
+        OpenApiParameter(name='limit', type=int, location=OpenApiParameter.QUERY, required=False),
+        OpenApiParameter(name='fields', type=str, location=OpenApiParameter.QUERY, required=False,
+                         description='Comma-separated course fields to return, e.g. id,title,level'),
+    ],
+    examples=[
+        OpenApiExample(
+            'Example 1',
+            summary='Browse the course catalog',
+            description='Get a page of courses; pass next_cursor back as cursor for the next page',
+            value={}
+        )
+    ],
+    responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='A page of courses and the next cursor')}
+)
+@api_view(['GET'])
+def get_course_catalog(request):
+    """
+    API endpoint that pages through the course catalog.
+    """
+    if request.method == 'GET':
+        fields = [name for name in request.query_params.get('fields', '').split(',') if name]
+        try:
+            catalog = course_controller.get_course_catalog(
+                request.query_params.get('cursor'),
+                request.query_params.get('limit'),
+                fields or None,
+            )
+            return Response(catalog, status=status.HTTP_200_OK)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
 
 @extend_schema(
     parameters=[
@@ -300,6 +338,46 @@ def enroll_course(request, course_id, user_id):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
     
 
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='course_id', type=int, location=OpenApiParameter.PATH, required=True),
+    ],
+    examples=[
+        OpenApiExample(
+            'Example 1',
+            summary='Enroll many users in a course',
+            description='Enroll users by ID, by group and/or by company; already enrolled users are skipped',
+            value={
+                "user_ids": [1, 2, 3],
+                "group_id": 4,
+                "company_id": 5
+            }
+        )
+    ],
+    responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='Number of new enrollments')}
+)
+@api_view(['POST'])
+def bulk_enroll_course(request, course_id):
+    """
+    API endpoint that allows many users to be enrolled in a course at once.
+    """
+    if request.method == 'POST':
+        try:
+            result = course_controller.bulk_enroll_course(
+                course_id,
+                user_ids=request.data.get('user_ids'),
+                group_id=request.data.get('group_id'),
+                company_id=request.data.get('company_id'),
+            )
+            return Response(result, status=status.HTTP_200_OK)
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
 @extend_schema(
     parameters = [
          OpenApiParameter(name='course_id', type=int, location=OpenApiParameter.PATH, required=True),
@@ -325,6 +403,32 @@ def update_course_progress(request, course_id, user_id):
         return Response(course, status=status.HTTP_200_OK)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='user_id', type=int, location=OpenApiParameter.PATH, required=True),
+    ],
+    examples=[
+        OpenApiExample(
+            'Example 1',
+            summary='Get progress in all enrolled courses',
+            description='Get progress in all enrolled courses',
+            value={}
+        )
+    ],
+    responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='Progress per course')}
+)
+@api_view(['GET'])
+def get_progress_by_student(request, user_id):
+    """
+    API endpoint that lists a user's progress in every course they are enrolled in.
+    """
+    if request.method == 'GET':
+        progress = course_controller.get_progress_by_student(user_id)
+        return Response(progress, status=status.HTTP_200_OK)
+    else:
+        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
     
 
 @extend_schema(
@@ -391,7 +495,7 @@ def add_lesson_to_course(request, course_id):
     """
     if request.method == 'POST':
         lesson_data = request.data
-        lesson = course_controller.add_lesson_to_course(course_id, lesson_data)
+        lesson = course_controller.add_lesson_to_course(course_id, lesson_data, requested_by=request.user.id)
         return Response(lesson, status=status.HTTP_200_OK)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -472,7 +576,7 @@ def update_lesson(request, course_id, lesson_id):
     """
     if request.method == 'PUT':
         lesson_data = request.data
-        lesson = course_controller.update_lesson(course_id, lesson_id, lesson_data)
+        lesson = course_controller.update_lesson(course_id, lesson_id, lesson_data, requested_by=request.user.id)
         return Response(lesson, status=status.HTTP_200_OK)
     elif request.method == 'GET':
         lesson = course_controller.get_course_lesson_by_id(course_id, lesson_id)
@@ -705,4 +809,46 @@ def submit_lesson_quiz(request, quiz_id, user_id):
         quiz = course_controller.submit_lession_quiz(quiz_id, user_id, answers)
         return Response(quiz, status=status.HTTP_200_OK)
     else:
-        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
\ No newline at end of file
+        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='quiz_id', type=int, location=OpenApiParameter.PATH, required=True),
+    ],
+    examples=[
+        OpenApiExample(
+            'Example 1',
+            summary='Grade a batch of quiz submissions',
+            description='Grade and store many submissions of a quiz at once, e.g. offline attempts',
+            value={
+                "submissions": [
+                    {"user": 1, "answers": [{"question": 1, "choice": 2}, {"question": 2, "choice": 5}]},
+                    {"user": 2, "answers": [{"question": 1, "choice": 3}]}
+                ]
+            }
+        )
+    ],
+    responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='Score per user')}
+)
+@api_view(['POST'])
+def grade_quiz_submissions(request, quiz_id):
+    """
+    API endpoint that allows a batch of quiz submissions to be graded.
+    """
+    if request.method == 'POST':
+        serializer = QuizGradingSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            scores = course_controller.grade_quiz_submissions(
+                quiz_id, serializer.validated_data['submissions'], request.user
+            )
+            return Response({'scores': scores}, status=status.HTTP_200_OK)
+        except Quiz.DoesNotExist:
+            return Response({"error": "Quiz not found"}, status=status.HTTP_404_NOT_FOUND)
+        except PermissionDenied as e:
+            return Response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
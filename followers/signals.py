@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Follower, FollowRequest, FollowNotification
-from notifications.models import Notification
+from notifications.services import NotificationService
 
 # Signal to send notification when a user gains a new follower
 @receiver(post_save, sender=Follower)
@@ -9,8 +9,13 @@ def send_follow_notification(sender, instance, created, **kwargs):
     if created:
         user = instance.user
         follower = instance.follower
-        notification_message = f"{follower.user.username} started following you."
-        Notification.objects.create(user=user, message=notification_message)
+        notification_message = f"{follower.username} started following you."
+        NotificationService.create_notification(
+            recipient=user,
+            content=notification_message,
+            notification_type_name='follow',
+            content_object=instance,
+        )
 
 # Signal to send notification when a follow request is accepted
 @receiver(post_save, sender=FollowRequest)
@@ -18,8 +23,14 @@ def send_follow_request_notification(sender, instance, created, **kwargs):
     if not created and instance.status == 'accepted':
         from_user = instance.from_user
         to_user = instance.to_user
-        notification_message = f"{from_user.user.username} has accepted your follow request."
-        Notification.objects.create(user=to_user, message=notification_message)
+        notification_message = f"{from_user.username} has accepted your follow request."
+        # Every later save of an accepted request lands here; repeats within the dedup window are dropped.
+        NotificationService.create_notification(
+            recipient=to_user,
+            content=notification_message,
+            notification_type_name='follow',
+            content_object=instance,
+        )
 
 # Signal to send notification when a follow request is received
 @receiver(post_save, sender=FollowRequest)
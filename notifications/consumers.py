@@ -1,35 +1,161 @@
+import asyncio
 import json
-import redis
-from channels.generic.websocket import WebsocketConsumer
-from asgiref.sync import async_to_sync
-
-class NotificationConsumer(WebsocketConsumer):
-    def connect(self):
-        self.group_name = f"notifications_{self.scope['user'].username}"
-        async_to_sync(self.channel_layer.group_add)(self.group_name, self.channel_name)
-        self.accept()
-
-    def disconnect(self, close_code):
-        async_to_sync(self.channel_layer.group_discard)(self.group_name, self.channel_name)
-
-    def send_notification(self, event):
-        notification = event['notification']
-        self.send(text_data=json.dumps({
-            'type': notification['type'],
-            'content': notification['content'],
-            'url': notification['url'],
-            'timestamp': notification['timestamp'],
+import logging
+import time
+from channels.generic.websocket import AsyncWebsocketConsumer
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from notifications.metrics import observe_pubsub_consume_batch
+from notifications.services.engagement_service import EngagementBuffer
+from notifications.services.pubsub_service import get_redis_client, PUBSUB_BATCH_SIZE, PUBSUB_FLUSH_INTERVAL
+from notifications.services.realtime_service import group_name, mark_online, mark_offline
+
+logger = logging.getLogger(__name__)
+
+WEBSOCKET_COALESCE_WINDOW = getattr(settings, 'NOTIFICATION_WEBSOCKET_COALESCE_WINDOW', 0.1)
+WEBSOCKET_MAX_FRAME_SIZE = getattr(settings, 'NOTIFICATION_WEBSOCKET_MAX_FRAME_SIZE', 100)
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Delivers a user's notifications over a websocket.
+
+    Notifications arriving within WEBSOCKET_COALESCE_WINDOW seconds of each
+    other are sent to the client as one frame, so a burst (a fan-out, a busy
+    thread) does not turn into a frame per notification.
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if self.user.is_anonymous:
+            await self.close()
+            return
+        self.group_name = group_name(self.user.username)
+        self.pending = []
+        self.flush_task = None
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await sync_to_async(mark_online)(self.user.id)
+
+    async def disconnect(self, close_code):
+        if self.user.is_anonymous:
+            return
+        if self.flush_task:
+            self.flush_task.cancel()
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await sync_to_async(mark_offline)(self.user.id)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Clients report impressions as {"type": "engagement", "events": [{"notification_id", "action"}]}.
+        try:
+            data = json.loads(text_data or '')
+        except ValueError:
+            return
+        if not isinstance(data, dict) or data.get('type') != 'engagement':
+            return
+        try:
+            events = [(event['notification_id'], event['action']) for event in data.get('events', [])]
+            result = await sync_to_async(EngagementBuffer.add)(self.user.id, events)
+        except (KeyError, TypeError, ValueError) as e:
+            await self.send(text_data=json.dumps({'type': 'engagement_error', 'error': str(e)}))
+            return
+        if result['dropped']:
+            await self.send(text_data=json.dumps({'type': 'engagement_dropped', 'dropped': result['dropped']}))
+
+    async def send_notification(self, event):
+        await self.queue_notifications([event['notification']])
+
+    async def notifications_batch(self, event):
+        await self.queue_notifications(event['notifications'])
+
+    async def queue_notifications(self, notifications):
+        self.pending.extend(notifications)
+        if len(self.pending) >= WEBSOCKET_MAX_FRAME_SIZE:
+            if self.flush_task:
+                self.flush_task.cancel()
+                self.flush_task = None
+            await self.flush_notifications()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush_after_window())
+
+    async def flush_after_window(self):
+        await asyncio.sleep(WEBSOCKET_COALESCE_WINDOW)
+        self.flush_task = None
+        await self.flush_notifications()
+
+    async def flush_notifications(self):
+        notifications, self.pending = self.pending, []
+        if len(notifications) == 1:
+            notification = notifications[0]
+            await self.send(text_data=json.dumps({
+                'type': notification['type'],
+                'content': notification['content'],
+                'url': notification['url'],
+                'timestamp': notification['timestamp'],
+            }))
+        elif notifications:
+            await self.send(text_data=json.dumps({'type': 'notifications', 'notifications': notifications}))
+
+    async def notifications_bulk_update(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'bulk_update',
+            'action': event['action'],
+            'count': event.get('updated', event.get('deleted', 0)),
+            'unread_count': event['unread_count'],
         }))
-        
+
 
 class NotificationSubscriber:
-    def __init__(self):
-        self.r = redis.Redis()
-        self.pubsub = self.r.pubsub()
-        self.pubsub.subscribe('notifications')
-
-    def listen(self):
-        for message in self.pubsub.listen():
-            if message['type'] == 'message':
-                # Process message
-                pass
\ No newline at end of file
+    """
+    Consumes the notifications channel in batches.
+
+    Messages are collected until ``batch_size`` have arrived or ``batch_timeout``
+    seconds have passed since the first one, then handed to ``process_batch``
+    together, mirroring the buffered publisher on the sending side.
+    """
+
+    def __init__(self, channel='notifications', batch_size=PUBSUB_BATCH_SIZE, batch_timeout=PUBSUB_FLUSH_INTERVAL):
+        self.r = get_redis_client()
+        self.pubsub = self.r.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+
+    def listen(self, handler=None, poll_timeout=1.0):
+        """
+        Block and dispatch batches of messages until the subscription is closed.
+
+        Args:
+        - handler (callable, optional): Called with each list of message payloads.
+          Defaults to ``process_batch``.
+        - poll_timeout (float): Seconds to wait for a message while idle.
+        """
+        handler = handler or self.process_batch
+        batch = []
+        deadline = None
+        while self.pubsub.subscribed:
+            timeout = poll_timeout if deadline is None else max(deadline - time.monotonic(), 0)
+            message = self.pubsub.get_message(timeout=timeout)
+            if message and message['type'] == 'message':
+                batch.append(message['data'])
+                if deadline is None:
+                    deadline = time.monotonic() + self.batch_timeout
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                observe_pubsub_consume_batch(len(batch))
+                handler(batch)
+                batch = []
+                deadline = None
+        if batch:
+            observe_pubsub_consume_batch(len(batch))
+            handler(batch)
+
+    def process_batch(self, messages):
+        """
+        Handle a batch of published notification payloads.
+
+        Args:
+        - messages (list): Raw message payloads, oldest first.
+        """
+        logger.debug(f"Received {len(messages)} notification messages")
+
+    def close(self):
+        self.pubsub.close()
@@ -1,4 +1,6 @@
+from django.core.exceptions import PermissionDenied
 from notifications.services.notification_service import NotificationService
+from notifications.querying.notification_query import DEFAULT_PAGE_SIZE
 
 class NotificationController:
     
@@ -60,17 +62,91 @@ class NotificationController:
         """
         self.notification_service.mark_notification_as_read(notification_id)
 
-    def get_user_notifications(self, user_id):
+    def bulk_mark_notifications_as_read(self, user, notification_ids=None, notification_type=None, before=None):
         """
-        Retrieve all notifications for a specific user.
+        Mark a selection of a user's notifications as read.
+
+        Args:
+        - user (User): The recipient of the notifications.
+        - notification_ids (list, optional): Explicit notification IDs.
+        - notification_type (str, optional): Only notifications of this type.
+        - before (str, optional): Cursor; the notification at the cursor and all older ones.
+
+        Returns:
+        - dict: Number of notifications marked as read and the new unread count.
+        """
+        return self.notification_service.bulk_mark_notifications_as_read(user, notification_ids, notification_type, before)
+
+    def bulk_delete_notifications(self, user, notification_ids=None, notification_type=None, before=None):
+        """
+        Delete a selection of a user's notifications.
+
+        Args:
+        - user (User): The recipient of the notifications.
+        - notification_ids (list, optional): Explicit notification IDs.
+        - notification_type (str, optional): Only notifications of this type.
+        - before (str, optional): Cursor; the notification at the cursor and all older ones.
+
+        Returns:
+        - dict: Number of notifications deleted and the new unread count.
+        """
+        return self.notification_service.bulk_delete_notifications(user, notification_ids, notification_type, before)
+
+    def get_user_notifications(self, user_id, cursor=None, limit=DEFAULT_PAGE_SIZE, read_status=None, include_content=True):
+        """
+        Retrieve one page of notifications for a specific user.
 
         Args:
         - user_id (int): ID of the user to retrieve notifications for.
+        - cursor (str, optional): Cursor returned with the previous page.
+        - limit (int, optional): Number of notifications per page.
+        - read_status (bool, optional): Filter by read/unread status.
+        - include_content (bool, optional): Decrypt and include the content.
+
+        Returns:
+        - dict: The notifications of the page and the cursor of the next page.
+        """
+        return self.notification_service.get_user_notifications(user_id, cursor, limit, read_status, include_content)
+
+    def get_notification_contents(self, user_id, notification_ids):
+        """
+        Decrypt the content of selected notifications of a user.
+
+        Args:
+        - user_id (int): ID of the user.
+        - notification_ids (list): IDs of the notifications to decrypt.
+
+        Returns:
+        - dict: Content per notification ID.
+        """
+        return self.notification_service.get_notification_contents(user_id, notification_ids)
+
+    def search_notifications(self, user_id, query, include_content=True):
+        """
+        Search a user's notifications by the words in their content.
+
+        Args:
+        - user_id (int): ID of the user.
+        - query (str): Words to search for; all must match.
+        - include_content (bool, optional): Decrypt and include the content of matches.
 
         Returns:
-        - QuerySet: A queryset of notifications for the user.
+        - list: Serialized matching notifications.
         """
-        return self.notification_service.get_user_notifications(user_id)
+        return self.notification_service.search_notifications(user_id, query, include_content)
+
+    def record_engagements(self, user_id, events):
+        """
+        Record a batch of view/click events of one user.
+
+        Args:
+        - user_id (int): ID of the user.
+        - events (list): Dicts with 'notification_id' and 'action'.
+
+        Returns:
+        - dict: Number of events accepted, collapsed as duplicates and dropped.
+        """
+        return self.notification_service.record_engagements(user_id, events)
 
     def generate_user_report(self, user_id):
         """
@@ -126,7 +202,7 @@ class NotificationController:
         - user (User): The user to retrieve the unread notifications count for.
 
         Returns:
-        - int: The count of unread notifications.
+        - dict: The count of unread notifications.
         """
         return self.notification_service.get_unread_notifications_count(user)
 
@@ -184,27 +260,83 @@ class NotificationController:
         """
         self.notification_service.unsubscribe_from_notifications(user, notification_types)
 
-    def notify_followers(self, user_profile, notification_type, content_object=None, content='', url=''):
+    def notify_followers(self, requester, notification_type_id, user_id=None, content_type=None, object_id=None,
+                         content='', url='', run_async=False):
         """
-        Notify followers of a user profile about an action.
+        Notify the requester's followers about an action.
 
         Args:
-        - user_profile (UserProfile): The user profile whose followers will be notified.
-        - notification_type (NotificationType): The type of notification.
-        - content_object (Model, optional): The object related to the notification.
+        - requester (User): The user making the request; only their own followers can be notified.
+        - notification_type_id (int): ID of the notification type.
+        - user_id (int, optional): ID of the user whose followers will be notified. Defaults to the requester.
+        - content_type (str, optional): Model of the related object, as 'app_label.model'.
+        - object_id (int, optional): ID of the related object.
         - content (str, optional): The content of the notification.
         - url (str, optional): The URL related to the notification.
-        """
-        self.notification_service.notify_followers(user_profile, notification_type, content_object, content, url)
+        - run_async (bool, optional): Run the fan-out as a background task.
 
-    def notify_all_users(self, notification_type, content_object=None, content='', url=''):
+        Returns:
+        - dict: The fan-out result, or the task ID when run in the background.
+
+        Raises:
+        - ValueError: If the user, the type or the related object is invalid.
+        - PermissionDenied: If the user is not the requester.
+        """
+        if user_id in (None, ''):
+            user_id = requester.id
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            raise ValueError("A valid user_profile ID is required.")
+        if user_id != requester.id:
+            raise PermissionDenied("You can only notify your own followers.")
+        notification_type, content_object = self.notification_service.resolve_fan_out_target(
+            notification_type_id, content_type, object_id
+        )
+        return self.notification_service.notify_followers(
+            user_id, notification_type, content_object, content, url, run_async, requested_by=requester.id
+        )
+
+    def notify_all_users(self, requester, notification_type_id, content_type=None, object_id=None, content='', url='',
+                         run_async=False):
         """
         Notify all users about an action.
 
         Args:
-        - notification_type (NotificationType): The type of notification.
-        - content_object (Model, optional): The object related to the notification.
+        - requester (User): The user making the request; must be staff or allowed to manage notifications.
+        - notification_type_id (int): ID of the notification type.
+        - content_type (str, optional): Model of the related object, as 'app_label.model'.
+        - object_id (int, optional): ID of the related object.
         - content (str, optional): The content of the notification.
         - url (str, optional): The URL related to the notification.
+        - run_async (bool, optional): Run the fan-out as a background task.
+
+        Returns:
+        - dict: The fan-out result, or the task ID when run in the background.
+
+        Raises:
+        - ValueError: If the type or the related object is invalid.
+        - PermissionDenied: If the requester may not notify all users.
+        """
+        if not (requester.is_staff or self.notification_service.user_can_manage_notifications(requester)):
+            raise PermissionDenied("You do not have permission to notify all users.")
+        notification_type, content_object = self.notification_service.resolve_fan_out_target(
+            notification_type_id, content_type, object_id
+        )
+        return self.notification_service.notify_all_users(
+            notification_type, content_object, content, url, run_async, requested_by=requester.id
+        )
+
+    def get_fan_out_status(self, task_id, user):
+        """
+        Get the progress of a background fan-out requested by a user.
+
+        Args:
+        - task_id (str): The task ID returned when the fan-out was queued.
+        - user (User): The user asking.
+
+        Returns:
+        - dict: The task state and the notifications created so far, or None
+          if the task is unknown or not the user's.
         """
-        self.notification_service.notify_all_users(notification_type, content_object, content, url)
\ No newline at end of file
+        return self.notification_service.get_fan_out_status(task_id, user.id)
@@ -0,0 +1,13 @@
+# notifications/management/commands/backfill_notification_rollups.py
+from django.core.management.base import BaseCommand
+from notifications.reports.rollups import backfill_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pre-aggregated notification report rollups from the notification table."
+
+    def handle(self, *args, **options):
+        result = backfill_rollups(progress=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups for {result['days']} days and {result['users']} users"
+        ))
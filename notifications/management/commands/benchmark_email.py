@@ -0,0 +1,67 @@
+# notifications/management/commands/benchmark_email.py
+import tempfile
+import time
+from django.contrib.auth import get_user_model
+from django.core.mail import get_connection, send_mail
+from django.core.management.base import BaseCommand
+from notifications.models import Notification
+from notifications.services.email_service import NotificationEmailSender, EMAIL_BATCH_SIZE, EMAIL_FROM, EMAIL_SUBJECT
+
+BACKENDS = {
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+    'file': 'django.core.mail.backends.filebased.EmailBackend',
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-message send_mail against batched notification emails (messages/sec)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Emails per run.')
+        parser.add_argument('--batch-size', type=int, default=EMAIL_BATCH_SIZE,
+                            help='Messages per send_messages call.')
+        parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=sorted(BACKENDS),
+                            help='Email backends to benchmark.')
+
+    def handle(self, *args, **options):
+        notifications = self.build_notifications(options['count'])
+        self.stdout.write(f"{'backend':>8} {'mode':>10} {'seconds':>10} {'msgs/sec':>12}")
+        for name in options['backends']:
+            with tempfile.TemporaryDirectory() as file_path:
+                backend = {'backend': BACKENDS[name], 'file_path': file_path}
+                for mode, run in (('send_mail', self.run_per_message), ('batched', self.run_batched)):
+                    started = time.monotonic()
+                    sent = run(notifications, backend, options['batch_size'])
+                    elapsed = time.monotonic() - started
+                    rate = sent / elapsed if elapsed else 0
+                    self.stdout.write(f"{name:>8} {mode:>10} {elapsed:>10.2f} {rate:>12.0f}")
+
+    def build_notifications(self, count):
+        # Unsaved instances: nothing is written to the database.
+        User = get_user_model()
+        return [
+            Notification(
+                recipient=User(username=f'email_bench_{i}', email=f'email_bench_{i}@example.com'),
+                content=f'Benchmark notification {i}',
+                html_content=f'<p>Benchmark notification {i}</p>',
+            )
+            for i in range(count)
+        ]
+
+    def run_per_message(self, notifications, backend, batch_size):
+        # What send_email_notification did before: one send_mail (and connection) per notification.
+        for notification in notifications:
+            send_mail(
+                EMAIL_SUBJECT,
+                notification.content,
+                EMAIL_FROM,
+                [notification.recipient.email],
+                html_message=notification.html_content,
+                connection=get_connection(**backend),
+            )
+        return len(notifications)
+
+    def run_batched(self, notifications, backend, batch_size):
+        return NotificationEmailSender.send_notifications(
+            notifications, batch_size, connection=get_connection(**backend)
+        )
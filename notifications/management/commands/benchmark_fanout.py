@@ -0,0 +1,49 @@
+# notifications/management/commands/benchmark_fanout.py
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from notifications.models import NotificationType
+from notifications.services.fanout_service import NotificationFanoutService, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Benchmark bulk notification fan-out (rows/sec). All benchmark data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+                            help='Recipient counts to benchmark.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write(f"{'recipients':>12} {'seconds':>10} {'rows/sec':>12}")
+        for size in options['sizes']:
+            elapsed, created = self.run_once(size, batch_size)
+            rate = created / elapsed if elapsed else 0
+            self.stdout.write(f"{size:>12} {elapsed:>10.2f} {rate:>12.0f}")
+
+    def run_once(self, size, batch_size):
+        User = get_user_model()
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=f'fanout_bench_{size}_{i}', password='!') for i in range(size)],
+                batch_size=batch_size,
+            )
+            recipient_ids = list(
+                User.objects.filter(username__startswith=f'fanout_bench_{size}_').values_list('id', flat=True)
+            )
+            notification_type, _ = NotificationType.objects.get_or_create(type_name='benchmark')
+
+            started = time.monotonic()
+            result = NotificationFanoutService.fan_out(
+                recipient_ids,
+                notification_type,
+                content='Benchmark announcement',
+                url='https://example.com/benchmark/',
+                batch_size=batch_size,
+            )
+            elapsed = time.monotonic() - started
+            transaction.set_rollback(True)
+        return elapsed, result['created']
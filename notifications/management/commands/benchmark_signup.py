@@ -0,0 +1,70 @@
+# notifications/management/commands/benchmark_signup.py
+import time
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from notifications.models import Notification, NotificationType
+from notifications.services.defaults_service import NotificationDefaultsService
+
+
+class Rollback(Exception):
+    pass
+
+
+class QueryCounter:
+    # Counts executed queries; connection.queries is capped and needs DEBUG.
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Benchmark creating default notification rows on signup: per-type get_or_create vs one bulk insert."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Signups per run.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'mode':>10} {'seconds':>10} {'signups/sec':>12} {'queries/signup':>15}")
+        for mode, run in (('per_type', self.run_per_type), ('bulk', self.run_bulk)):
+            try:
+                with transaction.atomic():
+                    # bulk_create skips the signup signals, so only the defaults are measured.
+                    User = get_user_model()
+                    User.objects.bulk_create(
+                        [User(username=f'signup_bench_{mode}_{i}') for i in range(options['count'])]
+                    )
+                    users = list(User.objects.filter(username__startswith=f'signup_bench_{mode}_'))
+                    NotificationDefaultsService.get_predefined_type_ids()
+                    queries = QueryCounter()
+                    with connection.execute_wrapper(queries):
+                        started = time.monotonic()
+                        for user in users:
+                            run(user)
+                        elapsed = time.monotonic() - started
+                    raise Rollback
+            except Rollback:
+                pass
+            rate = len(users) / elapsed if elapsed else 0
+            self.stdout.write(
+                f"{mode:>10} {elapsed:>10.2f} {rate:>12.0f} {queries.count / len(users):>15.1f}"
+            )
+
+    def run_per_type(self, user):
+        # What the profile signal did before: a lookup and get_or_create per predefined type.
+        for type_name, _ in NotificationType.PREDEFINED_TYPES:
+            notification_type, _ = NotificationType.objects.get_or_create(type_name=type_name)
+            content_type = ContentType.objects.get_for_model(get_user_model())
+            Notification.objects.get_or_create(
+                recipient=user,
+                notification_type=notification_type,
+                content_type=content_type,
+                object_id=user.id,
+            )
+
+    def run_bulk(self, user):
+        NotificationDefaultsService.create_defaults([user.id])
@@ -0,0 +1,39 @@
+# notifications/management/commands/build_notification_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from notifications.models import Notification, NotificationSearchToken
+from notifications.utils.search_index import blind_tokens, SEARCH_INDEX_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Build the blind search index of existing notifications, decrypting each one once."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Notifications per transaction.')
+        parser.add_argument('--start-id', type=int, default=0, help='Resume after this notification ID.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = options['start_id']
+        indexed = 0
+        while True:
+            batch = list(
+                Notification.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'recipient_id', 'content')[:batch_size]
+            )
+            if not batch:
+                break
+            notification_ids = [notification_id for notification_id, _, _ in batch]
+            tokens = [
+                NotificationSearchToken(notification_id=notification_id, recipient_id=recipient_id, token=token)
+                for notification_id, recipient_id, content in batch
+                for token in blind_tokens(content)
+            ]
+            with transaction.atomic():
+                NotificationSearchToken.objects.filter(notification_id__in=notification_ids).delete()
+                NotificationSearchToken.objects.bulk_create(tokens, batch_size=SEARCH_INDEX_BATCH_SIZE)
+            indexed += len(batch)
+            last_id = notification_ids[-1]
+            self.stdout.write(f"Indexed {indexed} notifications (last id {last_id})")
+        self.stdout.write(self.style.SUCCESS(f"Search index built for {indexed} notifications"))
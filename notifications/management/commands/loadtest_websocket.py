@@ -0,0 +1,102 @@
+# notifications/management/commands/loadtest_websocket.py
+import asyncio
+import json
+import time
+from channels.layers import channel_layers, get_channel_layer, InMemoryChannelLayer
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from notifications.consumers import NotificationConsumer
+from notifications.services.realtime_service import group_name, group_send_many
+
+
+class StaticUserMiddleware:
+    # Authenticates each connection as the user given in its query string, without the database.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        user_id = int(scope['query_string'].decode().split('=')[1])
+        scope = dict(scope, user=get_user_model()(id=user_id, username=f'ws_load_{user_id}'))
+        return await self.app(scope, receive, send)
+
+
+class WebsocketClient(ApplicationCommunicator):
+    # Minimal websocket driver; channels.testing needs daphne, which production does not install.
+    def __init__(self, application, path):
+        path, _, query_string = path.partition('?')
+        super().__init__(application, {
+            'type': 'websocket', 'path': path, 'query_string': query_string.encode(), 'headers': [],
+        })
+
+    async def connect(self):
+        await self.send_input({'type': 'websocket.connect'})
+        return (await self.receive_output(5))['type'] == 'websocket.accept'
+
+    async def receive_from(self, timeout=5):
+        return (await self.receive_output(timeout))['text']
+
+    async def disconnect(self):
+        await self.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await self.wait(5)
+
+
+class Command(BaseCommand):
+    help = "Load test the notification websocket consumer in this process (connections/sec and messages/sec)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500, help='Concurrent websocket connections.')
+        parser.add_argument('--messages', type=int, default=20, help='Notifications pushed per connection.')
+        parser.add_argument('--burst', type=int, default=1,
+                            help='Notifications per group_send; bursts are coalesced into fewer frames.')
+        parser.add_argument('--in-memory', action='store_true',
+                            help='Use an in-memory channel layer instead of the configured one (e.g. no Redis).')
+
+    def handle(self, *args, **options):
+        if options['in_memory']:
+            channel_layers.set('default', InMemoryChannelLayer(capacity=100000))
+        asyncio.run(self.run(options['connections'], options['messages'], options['burst']))
+
+    async def run(self, connections, messages, burst):
+        application = StaticUserMiddleware(NotificationConsumer.as_asgi())
+        communicators = [
+            WebsocketClient(application, f'/ws/notifications/?user={user_id}')
+            for user_id in range(1, connections + 1)
+        ]
+
+        started = time.monotonic()
+        await asyncio.gather(*(communicator.connect() for communicator in communicators))
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"Connected {connections} websockets in {elapsed:.2f}s "
+                          f"({connections / elapsed if elapsed else 0:.0f} connections/sec)")
+
+        channel_layer = get_channel_layer()
+        payload = {'id': 0, 'type': 'load_test', 'content': 'Load test', 'url': '', 'timestamp': ''}
+        started = time.monotonic()
+        sent = 0
+        while sent < messages:
+            size = min(burst, messages - sent)
+            await group_send_many(channel_layer, {
+                group_name(f'ws_load_{user_id}'): [payload] * size
+                for user_id in range(1, connections + 1)
+            })
+            sent += size
+        counts = await asyncio.gather(*(self.receive_all(communicator, messages) for communicator in communicators))
+        elapsed = time.monotonic() - started
+        received = sum(notifications for notifications, _ in counts)
+        frames = sum(frames for _, frames in counts)
+        self.stdout.write(f"Delivered {received}/{connections * messages} notifications in {frames} frames "
+                          f"in {elapsed:.2f}s ({received / elapsed if elapsed else 0:.0f} messages/sec)")
+
+        await asyncio.gather(*(communicator.disconnect() for communicator in communicators))
+
+    async def receive_all(self, communicator, expected):
+        received = frames = 0
+        while received < expected:
+            try:
+                frame = json.loads(await communicator.receive_from(timeout=5))
+            except asyncio.TimeoutError:
+                break
+            frames += 1
+            received += len(frame['notifications']) if frame['type'] == 'notifications' else 1
+        return received, frames
@@ -0,0 +1,31 @@
+# notifications/management/commands/purge_notifications.py
+from django.core.management.base import BaseCommand
+from notifications.services.retention_service import (
+    NotificationRetentionService, RETENTION_DAYS, RETENTION_BATCH_SIZE, RETENTION_BATCH_SLEEP,
+)
+
+
+class Command(BaseCommand):
+    help = "Delete notifications past the retention period in throttled batches, optionally archiving them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=RETENTION_DAYS, help='Retention period in days.')
+        parser.add_argument('--batch-size', type=int, default=RETENTION_BATCH_SIZE, help='Notifications per batch.')
+        parser.add_argument('--sleep', type=float, default=RETENTION_BATCH_SLEEP,
+                            help='Seconds to pause between batches.')
+        parser.add_argument('--archive-dir', help='Write deleted rows to a gzipped JSONL file in this directory.')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches.')
+
+    def handle(self, *args, **options):
+        result = NotificationRetentionService.purge(
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+            archive_dir=options['archive_dir'],
+            max_batches=options['max_batches'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['deleted']} notifications in {result['batches']} batches"
+        ))
+        if result['archive']:
+            self.stdout.write(f"Archive: {result['archive']}")
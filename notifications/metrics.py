@@ -1,11 +1,53 @@
 # notifications/metrics.py
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 notifications_sent = Counter('notifications_sent', 'Total number of notifications sent')
 notifications_failed = Counter('notifications_failed', 'Total number of notifications failed')
+bulk_notification_chunks = Counter('bulk_notification_chunks', 'Total number of bulk notification chunks processed')
+bulk_notification_throughput = Gauge('bulk_notification_throughput', 'Notifications per second of the last bulk notification run')
+notification_deliveries = Counter('notification_deliveries', 'Notification deliveries by channel and outcome', ['channel', 'status'])
+pubsub_publish_latency = Histogram('pubsub_publish_latency_seconds', 'Time spent publishing a single message or pipelined batch to Redis')
+pubsub_publish_batch_size = Histogram('pubsub_publish_batch_size', 'Messages per pipelined Redis publish', buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000))
+pubsub_consume_batch_size = Histogram('pubsub_consume_batch_size', 'Messages per batch handled by the notification subscriber', buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000))
+engagement_events = Counter('notification_engagement_events', 'Engagement events received by action and outcome', ['action', 'status'])
+engagement_events_lost = Counter('notification_engagement_events_lost', 'Engagement events dropped before reaching the database', ['reason'])
+engagement_flush_size = Histogram('notification_engagement_flush_size', 'Deduplicated engagements written per buffer flush', buckets=(1, 10, 100, 1000, 10000, 100000))
+websocket_pushes = Counter('notification_websocket_pushes', 'Notifications pushed to websocket groups or left stored-only', ['status'])
 
-def increment_notifications_sent():
-    notifications_sent.inc()
+def increment_notifications_sent(amount=1):
+    notifications_sent.inc(amount)
 
-def increment_notifications_failed():
-    notifications_failed.inc()
+def increment_notifications_failed(amount=1):
+    notifications_failed.inc(amount)
+
+def increment_notification_deliveries(channel, status):
+    notification_deliveries.labels(channel=channel, status=status).inc()
+
+def increment_bulk_notification_chunks():
+    bulk_notification_chunks.inc()
+
+def record_bulk_notification_run(sent, elapsed):
+    bulk_notification_throughput.set(sent / elapsed if elapsed > 0 else 0)
+
+def observe_pubsub_publish(elapsed):
+    pubsub_publish_latency.observe(elapsed)
+
+def observe_pubsub_publish_batch(size, elapsed):
+    pubsub_publish_batch_size.observe(size)
+    pubsub_publish_latency.observe(elapsed)
+
+def observe_pubsub_consume_batch(size):
+    pubsub_consume_batch_size.observe(size)
+
+def increment_engagement_events(action, status):
+    engagement_events.labels(action=action, status=status).inc()
+
+def increment_engagement_events_lost(reason, amount=1):
+    engagement_events_lost.labels(reason=reason).inc(amount)
+
+def observe_engagement_flush(size):
+    engagement_flush_size.observe(size)
+
+def increment_websocket_pushes(status, amount=1):
+    if amount:
+        websocket_pushes.labels(status=status).inc(amount)
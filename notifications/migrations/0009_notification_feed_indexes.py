@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-17 00:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity", "0003_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("notifications", "0008_alter_notification_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "is_read", "timestamp"],
+                name="notif_recipient_read_ts_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-timestamp", "-id"],
+                name="notif_recipient_feed_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-17 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0009_notification_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationtemplate",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
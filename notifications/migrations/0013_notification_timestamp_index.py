@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity", "0003_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("notifications", "0012_notification_search_tokens"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["timestamp", "id"], name="notif_timestamp_idx"),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity", "0003_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("notifications", "0013_notification_timestamp_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("read", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="NotificationUserRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("read", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["updated_at"], name="notif_updated_at_idx"),
+        ),
+        migrations.AddField(
+            model_name="notificationdailyrollup",
+            name="notification_type",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                to="notifications.notificationtype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationuserrollup",
+            name="notification_type",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                to="notifications.notificationtype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationuserrollup",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="notificationdailyrollup",
+            unique_together={("day", "notification_type")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="notificationuserrollup",
+            unique_together={("user", "notification_type")},
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0014_notification_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="ab_test",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="notifications",
+                to="notifications.notificationabtest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationabtest",
+            name="clicked_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="notificationabtest",
+            name="sent_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="notificationabtest",
+            name="viewed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
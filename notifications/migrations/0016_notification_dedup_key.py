@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0015_notification_ab_test_outcomes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="dedup_key",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="notification",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("dedup_key__isnull", False)),
+                fields=("dedup_key",),
+                name="notif_dedup_key_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:50
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_digests_sent(apps, schema_editor):
+    # Digests stored before sent_at existed were emailed in the same run.
+    NotificationDigest = apps.get_model('notifications', 'NotificationDigest')
+    NotificationDigest.objects.filter(sent_at__isnull=True).update(sent_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0016_notification_dedup_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationdigest',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_digests_sent, migrations.RunPython.noop),
+    ]
@@ -65,23 +65,87 @@ class Notification(models.Model):
     priority = models.IntegerField(choices=NOTIFICATION_PRIORITY, default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    pending_digest = models.BooleanField(default=False)  # Held back for the recipient's daily/weekly digest
+    ab_test = models.ForeignKey(  # The A/B test variant this notification was sent as, for outcome counting
+        'NotificationABTest', on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications'
+    )
+    dedup_key = models.CharField(max_length=64, null=True, blank=True)  # Idempotency key; see notifications/utils/dedup.py
     
     class Meta:
         permissions = [
             ("can_manage_notifications", "Can manage notifications"),
             ("can_view_notifications", "Can view notifications"),
         ]
+        indexes = [
+            # Keyset pagination of a user's feed, optionally filtered by read status.
+            models.Index(fields=['recipient', 'is_read', 'timestamp'], name='notif_recipient_read_ts_idx'),
+            models.Index(fields=['recipient', '-timestamp', '-id'], name='notif_recipient_feed_idx'),
+            # Retention walks expired rows oldest first.
+            models.Index(fields=['timestamp', 'id'], name='notif_timestamp_idx'),
+            # Rollup refreshes find rows changed since their last run.
+            models.Index(fields=['updated_at'], name='notif_updated_at_idx'),
+            # Only the few rows still waiting for a digest are indexed.
+            models.Index(fields=['recipient', 'id'], name='notif_pending_digest_idx',
+                         condition=models.Q(pending_digest=True)),
+        ]
+        constraints = [
+            # A repeated event (retry, signal storm) cannot create a second row.
+            models.UniqueConstraint(fields=['dedup_key'], name='notif_dedup_key_uniq',
+                                    condition=models.Q(dedup_key__isnull=False)),
+        ]
 
     def __str__(self):
         return f"{self.notification_type.type_name} Notification for {self.recipient.username}"
         
-    def delete_old_notifications():
-        threshold_date = timezone.now() - timedelta(days=365)  # Example: 1 year retention
-        Notification.objects.filter(sent_at__lt=threshold_date).delete()
+    @staticmethod
+    def delete_old_notifications(days=365):
+        # Batched and throttled; see NotificationRetentionService.
+        from notifications.services.retention_service import NotificationRetentionService
+        return NotificationRetentionService.purge(older_than_days=days)
+
+class NotificationSearchToken(models.Model):
+    # Blind index of Notification.content: keyed hashes of its words, so searches
+    # can filter in the database without decrypting anything.
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='search_tokens')
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    token = models.CharField(max_length=32)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'token'], name='notif_search_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"Search token for notification {self.notification_id}"
+
+class NotificationDailyRollup(models.Model):
+    day = models.DateField()
+    notification_type = models.ForeignKey(NotificationType, on_delete=models.CASCADE)
+    total = models.PositiveIntegerField(default=0)
+    read = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'notification_type')
+
+    def __str__(self):
+        return f"{self.day} {self.notification_type.type_name}: {self.total}"
+
+class NotificationUserRollup(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    notification_type = models.ForeignKey(NotificationType, on_delete=models.CASCADE)
+    total = models.PositiveIntegerField(default=0)
+    read = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'notification_type')
+
+    def __str__(self):
+        return f"{self.user.username} {self.notification_type.type_name}: {self.total}"
 
 class NotificationTemplate(models.Model):
     notification_type = models.ForeignKey(NotificationType, on_delete=models.CASCADE)
     template = models.TextField()
+    version = models.PositiveIntegerField(default=1)  # Bumped on every change; keys the compiled template cache
 
     def __str__(self):
         return self.notification_type.type_name
@@ -126,6 +190,19 @@ class UserNotificationPreference(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Notification Preferences"
     
+class NotificationDigest(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    frequency = models.CharField(max_length=20, choices=[('daily', 'Daily'), ('weekly', 'Weekly')])
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    notification_count = models.PositiveIntegerField()
+    summary = models.JSONField(default=dict)  # Notification counts per notification type
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)  # Null until the digest email went out
+
+    def __str__(self):
+        return f"{self.frequency.capitalize()} digest of {self.notification_count} notifications for {self.user.username}"
+    
 class NotificationSnooze(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     start_time = models.DateTimeField()
@@ -149,7 +226,11 @@ class NotificationABTest(models.Model):
     notification_template = models.ForeignKey(NotificationTemplate, on_delete=models.CASCADE)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
-    
+    # Outcome counters, incremented in bulk as notifications are sent, viewed and clicked.
+    sent_count = models.PositiveIntegerField(default=0)
+    viewed_count = models.PositiveIntegerField(default=0)
+    clicked_count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return f"A/B Test {self.test_name} - Variant {self.variant}"
 
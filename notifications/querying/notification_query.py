@@ -1,7 +1,49 @@
 # notifications/querying/notification_query.py
 
-from django.db.models import Q
-from notifications.models import Notification
+import base64
+from datetime import datetime
+from django.db.models import Count, Q
+from notifications.models import Notification, NotificationSearchToken
+from notifications.utils.search_index import blind_tokens
+from notifications.utils.unread_counter import get_unread_count
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Fields decrypted on load; deferred when only metadata is needed.
+ENCRYPTED_FIELDS = ('content',)
+
+def encode_cursor(notification):
+    """
+    Encode the (timestamp, id) position of a notification as an opaque cursor.
+
+    Args:
+    - notification (Notification): The last notification of a page.
+
+    Returns:
+    - str: URL-safe cursor string.
+    """
+    position = f"{notification.timestamp.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+    - cursor (str): The cursor string.
+
+    Returns:
+    - tuple: (timestamp, id) of the last notification of the previous page.
+
+    Raises:
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        timestamp, notification_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(notification_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor.") from e
 
 def get_notifications_by_user(user_id, read_status=None):
     """
@@ -12,17 +54,51 @@ def get_notifications_by_user(user_id, read_status=None):
     - read_status (bool, optional): Filter by read/unread status. None means no filter.
 
     Returns:
-    - QuerySet: A QuerySet of notifications for the user.
+    - QuerySet: A QuerySet of notifications for the user, newest first.
     """
     query = Notification.objects.filter(recipient_id=user_id)
     if read_status is not None:
-        query = query.filter(read=read_status)
-    return query.order_by('-timestamp')
+        query = query.filter(is_read=read_status)
+    return query.order_by('-timestamp', '-id')
+
+def get_notifications_page(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE, read_status=None, include_content=True):
+    """
+    Fetch one page of a user's notifications using keyset pagination.
+
+    Pages are ordered by (timestamp, id) descending and continue strictly after
+    the cursor position, so every page is an index range scan no matter how
+    deep into the feed it is.
+
+    Args:
+    - user_id (int): ID of the user.
+    - cursor (str, optional): Cursor returned with the previous page.
+    - limit (int): Page size, capped at MAX_PAGE_SIZE.
+    - read_status (bool, optional): Filter by read/unread status. None means no filter.
+    - include_content (bool): Load the encrypted content. When False only
+      metadata is fetched and nothing is decrypted.
+
+    Returns:
+    - tuple: (list of notifications, next cursor or None when this is the last page).
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    query = get_notifications_by_user(user_id, read_status)
+    if not include_content:
+        query = query.defer(*ENCRYPTED_FIELDS)
+    if cursor:
+        timestamp, notification_id = decode_cursor(cursor)
+        query = query.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=notification_id))
+    notifications = list(query[:limit + 1])
+    next_cursor = encode_cursor(notifications[limit - 1]) if len(notifications) > limit else None
+    return notifications[:limit], next_cursor
 
 def search_notifications(user_id, query):
     """
     Search notifications for a user based on a query string.
 
+    Content is encrypted, so the search runs against the blind index in
+    NotificationSearchToken: every word of the query must appear as a whole
+    word in the notification. Nothing is decrypted to find the matches.
+
     Args:
     - user_id (int): ID of the user.
     - query (str): Search query string.
@@ -30,12 +106,21 @@ def search_notifications(user_id, query):
     Returns:
     - QuerySet: A QuerySet of notifications matching the search query.
     """
-    search_query = Q(message__icontains=query) | Q(additional_data__icontains=query)
-    return Notification.objects.filter(recipient_id=user_id).filter(search_query).order_by('-timestamp')
+    tokens = blind_tokens(query)
+    if not tokens:
+        return Notification.objects.none()
+    matching_ids = (
+        NotificationSearchToken.objects.filter(recipient_id=user_id, token__in=tokens)
+        .values('notification_id')
+        .annotate(matched=Count('token', distinct=True))
+        .filter(matched=len(tokens))
+        .values('notification_id')
+    )
+    return Notification.objects.filter(recipient_id=user_id, id__in=matching_ids).order_by('-timestamp', '-id')
 
 def get_unread_notifications_count(user_id):
     """
-    Get the count of unread notifications for a user.
+    Get the count of unread notifications for a user from the cached counter.
 
     Args:
     - user_id (int): ID of the user.
@@ -43,7 +128,7 @@ def get_unread_notifications_count(user_id):
     Returns:
     - int: Number of unread notifications.
     """
-    return Notification.objects.filter(recipient_id=user_id, read=False).count()
+    return get_unread_count(user_id)
 
 def get_notifications_by_type(user_id, notification_type):
     """
@@ -57,3 +142,33 @@ def get_notifications_by_type(user_id, notification_type):
     - QuerySet: A QuerySet of notifications of the specified type for the user.
     """
     return Notification.objects.filter(recipient_id=user_id, notification_type=notification_type).order_by('-timestamp')
+
+def get_notifications_for_bulk_action(user_id, notification_ids=None, notification_type=None, before=None):
+    """
+    Build the selection of a user's notifications targeted by a bulk action.
+
+    The selectors are combined with AND; when none is given every notification
+    of the user is selected.
+
+    Args:
+    - user_id (int): ID of the user.
+    - notification_ids (list, optional): Explicit notification IDs.
+    - notification_type (str, optional): Name of the notification type.
+    - before (str, optional): Cursor of a notification; it and every older
+      notification are selected.
+
+    Returns:
+    - QuerySet: An unordered QuerySet of the selected notifications.
+
+    Raises:
+    - ValueError: If the cursor is invalid.
+    """
+    query = Notification.objects.filter(recipient_id=user_id)
+    if notification_ids is not None:
+        query = query.filter(id__in=notification_ids)
+    if notification_type:
+        query = query.filter(notification_type__type_name=notification_type)
+    if before:
+        timestamp, notification_id = decode_cursor(before)
+        query = query.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lte=notification_id))
+    return query
@@ -1,7 +1,19 @@
 # notifications/reports/notification_report.py
 
-from django.db.models import Count
-from notifications.models import Notification
+from django.db.models import F, Sum
+from notifications.models import NotificationDailyRollup, NotificationUserRollup
+
+# Reports read the pre-aggregated rollups in notifications/reports/rollups.py
+# instead of scanning the notification table; they lag behind it by at most
+# one refresh interval.
+
+
+def _totals(rollups):
+    totals = rollups.aggregate(total=Sum('total'), read=Sum('read'))
+    total = totals['total'] or 0
+    read = totals['read'] or 0
+    return total, read
+
 
 def generate_user_notification_report(user_id):
     """
@@ -13,17 +25,17 @@ def generate_user_notification_report(user_id):
     Returns:
     - dict: A dictionary containing the notification report for the user.
     """
-    notifications = Notification.objects.filter(recipient_id=user_id).order_by('-timestamp')
-    unread_count = notifications.filter(read=False).count()
-    read_count = notifications.filter(read=True).count()
-    total_count = notifications.count()
-    
+    rollups = NotificationUserRollup.objects.filter(user_id=user_id)
+    total_count, read_count = _totals(rollups)
+
     report = {
         'user_id': user_id,
         'total_notifications': total_count,
-        'unread_notifications': unread_count,
+        'unread_notifications': total_count - read_count,
         'read_notifications': read_count,
-        'notifications': list(notifications.values('id', 'message', 'read', 'timestamp'))
+        'notifications_by_type': list(
+            rollups.values('notification_type', count=F('total')).order_by('-count')
+        ),
     }
     return report
 
@@ -34,15 +46,18 @@ def generate_notification_summary():
     Returns:
     - dict: A dictionary containing the summary of notifications.
     """
-    total_notifications = Notification.objects.count()
-    unread_notifications = Notification.objects.filter(read=False).count()
-    read_notifications = Notification.objects.filter(read=True).count()
-    
-    notifications_by_type = Notification.objects.values('notification_type').annotate(count=Count('id')).order_by('-count')
-    
+    rollups = NotificationDailyRollup.objects.all()
+    total_notifications, read_notifications = _totals(rollups)
+
+    notifications_by_type = (
+        rollups.values('notification_type')
+        .annotate(count=Sum('total'))
+        .order_by('-count')
+    )
+
     summary = {
         'total_notifications': total_notifications,
-        'unread_notifications': unread_notifications,
+        'unread_notifications': total_notifications - read_notifications,
         'read_notifications': read_notifications,
         'notifications_by_type': list(notifications_by_type)
     }
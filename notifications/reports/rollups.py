@@ -0,0 +1,178 @@
+# notifications/reports/rollups.py
+
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from notifications.models import Notification, NotificationDailyRollup, NotificationUserRollup
+
+ROLLUP_BATCH_SIZE = getattr(settings, 'NOTIFICATION_ROLLUP_BATCH_SIZE', 1000)
+ROLLUP_WATERMARK_KEY = 'notification_rollups_watermark'
+ROLLUP_DEFAULT_WINDOW = timedelta(hours=1)
+
+
+def _day_bounds(day):
+    # Half-open [start, end) bounds, so the per-day query can use the timestamp index.
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def _counts():
+    return {'total': Count('id'), 'read': Count('id', filter=Q(is_read=True))}
+
+
+def refresh_daily_rollups(days):
+    """
+    Recompute the per-day, per-type rollups of the given days.
+
+    Args:
+    - days (iterable): Dates (or ISO date strings) to recompute.
+
+    Returns:
+    - int: Number of rollup rows written.
+    """
+    days = sorted({datetime.fromisoformat(day).date() if isinstance(day, str) else day for day in days})
+    written = 0
+    for day in days:
+        start, end = _day_bounds(day)
+        rows = (
+            Notification.objects.filter(timestamp__gte=start, timestamp__lt=end)
+            .values('notification_type_id')
+            .annotate(**_counts())
+        )
+        rollups = [
+            NotificationDailyRollup(day=day, notification_type_id=row['notification_type_id'],
+                                    total=row['total'], read=row['read'])
+            for row in rows
+        ]
+        with transaction.atomic():
+            NotificationDailyRollup.objects.filter(day=day).delete()
+            NotificationDailyRollup.objects.bulk_create(rollups)
+        written += len(rollups)
+    return written
+
+
+def refresh_user_rollups(user_ids):
+    """
+    Recompute the per-user, per-type rollups of the given users.
+
+    Args:
+    - user_ids (iterable): IDs of the users to recompute.
+
+    Returns:
+    - int: Number of rollup rows written.
+    """
+    user_ids = sorted(set(user_ids))
+    written = 0
+    for start in range(0, len(user_ids), ROLLUP_BATCH_SIZE):
+        chunk = user_ids[start:start + ROLLUP_BATCH_SIZE]
+        rows = (
+            Notification.objects.filter(recipient_id__in=chunk)
+            .values('recipient_id', 'notification_type_id')
+            .annotate(**_counts())
+        )
+        rollups = [
+            NotificationUserRollup(user_id=row['recipient_id'], notification_type_id=row['notification_type_id'],
+                                   total=row['total'], read=row['read'])
+            for row in rows
+        ]
+        with transaction.atomic():
+            NotificationUserRollup.objects.filter(user_id__in=chunk).delete()
+            NotificationUserRollup.objects.bulk_create(rollups)
+        written += len(rollups)
+    return written
+
+
+def schedule_rollup_refresh(user_ids=(), days=()):
+    """
+    Queue a rollup refresh for rows that were deleted, once the current transaction commits.
+
+    Deletions leave nothing behind for the updated_at watermark to find, so
+    every delete path reports the users and days it removed notifications from.
+
+    Args:
+    - user_ids (iterable): IDs of the affected recipients.
+    - days (iterable): Local dates of the deleted notifications.
+    """
+    from notifications.tasks import refresh_notification_rollups
+
+    user_ids = sorted(set(user_ids))
+    days = sorted({day.isoformat() for day in days})
+    if user_ids or days:
+        transaction.on_commit(lambda: refresh_notification_rollups.delay(user_ids=user_ids, days=days))
+
+
+def refresh_recent_rollups():
+    """
+    Recompute the rollups touched by notifications created or updated since the last run.
+
+    The days and users to refresh come from the updated_at index; the
+    watermark is kept in the cache and only advanced after a successful run.
+
+    Returns:
+    - dict: Number of days and users refreshed.
+    """
+    now = timezone.now()
+    since = cache.get(ROLLUP_WATERMARK_KEY) or now - ROLLUP_DEFAULT_WINDOW
+    changed = Notification.objects.filter(updated_at__gte=since)
+    days = set(changed.annotate(day=TruncDate('timestamp')).values_list('day', flat=True).distinct())
+    user_ids = set(changed.values_list('recipient_id', flat=True).distinct())
+    refresh_daily_rollups(days)
+    refresh_user_rollups(user_ids)
+    cache.set(ROLLUP_WATERMARK_KEY, now, timeout=None)
+    return {'days': len(days), 'users': len(user_ids)}
+
+
+def backfill_rollups(progress=None):
+    """
+    Rebuild every rollup from the notification table.
+
+    Args:
+    - progress (callable, optional): Called with a status message after each step.
+
+    Returns:
+    - dict: Number of days and users rebuilt.
+    """
+    started = timezone.now()
+    bounds = Notification.objects.aggregate(first=Min('timestamp'), last=Max('timestamp'))
+    days = []
+    if bounds['first']:
+        day = timezone.localtime(bounds['first']).date()
+        last = timezone.localtime(bounds['last']).date()
+        while day <= last:
+            days.append(day)
+            day += timedelta(days=1)
+    NotificationDailyRollup.objects.exclude(day__in=days).delete()
+    for start in range(0, len(days), 30):
+        refresh_daily_rollups(days[start:start + 30])
+        if progress:
+            progress(f"Daily rollups rebuilt up to {days[min(start + 30, len(days)) - 1]}")
+
+    user_ids = (
+        Notification.objects.order_by('recipient_id')
+        .values_list('recipient_id', flat=True)
+        .distinct()
+        .iterator(chunk_size=ROLLUP_BATCH_SIZE)
+    )
+    users = 0
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(user_id)
+        if len(chunk) == ROLLUP_BATCH_SIZE:
+            refresh_user_rollups(chunk)
+            users += len(chunk)
+            chunk = []
+            if progress:
+                progress(f"User rollups rebuilt for {users} users")
+    refresh_user_rollups(chunk)
+    users += len(chunk)
+    NotificationUserRollup.objects.exclude(
+        user_id__in=Notification.objects.values('recipient_id')
+    ).delete()
+    # Changes made while the backfill ran are picked up by the next refresh.
+    cache.set(ROLLUP_WATERMARK_KEY, started, timeout=None)
+    return {'days': len(days), 'users': users}
@@ -25,7 +25,16 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'recipient', 'content_type', 'object_id', 'content_object', 'content', 
             'html_content', 'url', 'timestamp', 'is_read', 'notification_type', 'delivery_method', 
-            'shares', 'priority', 'created_at', 'updated_at'
+            'shares', 'priority', 'ab_test', 'created_at', 'updated_at'
+        )
+
+class NotificationMetadataSerializer(serializers.ModelSerializer):
+    # Everything but the encrypted content, for listings that must not decrypt rows.
+    class Meta:
+        model = Notification
+        fields = (
+            'id', 'recipient', 'content_type', 'object_id', 'url', 'timestamp', 'is_read',
+            'notification_type', 'delivery_method', 'priority', 'created_at', 'updated_at'
         )
 
 class NotificationTemplateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,140 @@
+# notifications/services/ab_test_service.py
+import hashlib
+from collections import Counter
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from notifications.models import NotificationABTest
+from notifications.utils.versioned_cache import VersionedLocalCache
+
+AB_TEST_REFRESH_INTERVAL = getattr(settings, 'NOTIFICATION_AB_TEST_REFRESH_INTERVAL', 30)
+AB_TEST_VERSION_KEY = 'notification_ab_tests_version'
+
+OUTCOME_FIELDS = {
+    'sent': 'sent_count',
+    'viewed': 'viewed_count',
+    'clicked': 'clicked_count',
+}
+
+
+def assignment_bucket(user_id, test_name, buckets):
+    """
+    Deterministically map a user to one of ``buckets`` for a test.
+
+    The hash is salted with the test name so that a user's variants in
+    different tests are independent of each other.
+    """
+    digest = hashlib.sha256(f"{test_name}:{user_id}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big') % buckets
+
+
+def load_active_tests():
+    """
+    Load the A/B tests that have not ended yet.
+
+    Each NotificationABTest row is one variant; the variants of a test share a
+    test_name and are kept sorted by variant name, so a bucket always maps to
+    the same variant.
+
+    Returns:
+    - dict: Variant dicts by test name.
+    """
+    tests = {}
+    variants = (
+        NotificationABTest.objects.filter(end_date__gte=timezone.now())
+        .order_by('test_name', 'variant', 'id')
+        .values('id', 'test_name', 'variant', 'notification_template_id', 'start_date', 'end_date')
+    )
+    for variant in variants:
+        tests.setdefault(variant['test_name'], []).append(variant)
+    return tests
+
+
+# Reloaded in every process when the signal receivers in notifications/signals.py
+# bump AB_TEST_VERSION_KEY; the key is read at most every AB_TEST_REFRESH_INTERVAL seconds.
+active_tests = VersionedLocalCache(AB_TEST_VERSION_KEY, load_active_tests, AB_TEST_REFRESH_INTERVAL)
+
+
+class NotificationABTestService:
+    """
+    Assigns users to A/B test variants and counts outcomes per variant.
+
+    Assignment is a hash of (test, user), so it needs no per-user storage and
+    is stable for as long as the set of variants does not change. Outcomes are
+    added to counters on the variant rows, one UPDATE per variant per batch, so
+    results never require scanning notifications or engagements.
+    """
+
+    @staticmethod
+    def assign_variant(user_id, test_name, at=None):
+        """
+        Pick the variant of a running test for a user.
+
+        Args:
+        - user_id (int): ID of the user.
+        - test_name (str): Name of the test.
+        - at (datetime, optional): Point in time to check the test window against.
+
+        Returns:
+        - dict: The variant's id, test_name, variant, notification_template_id and
+          window, or None if the test is not running.
+        """
+        at = at or timezone.now()
+        variants = [
+            variant for variant in active_tests.get().get(test_name, [])
+            if variant['start_date'] <= at <= variant['end_date']
+        ]
+        if not variants:
+            return None
+        return variants[assignment_bucket(user_id, test_name, len(variants))]
+
+    @staticmethod
+    def record_outcomes(outcome, ab_test_ids):
+        """
+        Add outcomes to the counters of the variants they belong to.
+
+        Args:
+        - outcome (str): 'sent', 'viewed' or 'clicked'.
+        - ab_test_ids (iterable): Variant ID per outcome; None entries are ignored.
+        """
+        field = OUTCOME_FIELDS[outcome]
+        counts = Counter(ab_test_id for ab_test_id in ab_test_ids if ab_test_id is not None)
+        for ab_test_id, count in counts.items():
+            NotificationABTest.objects.filter(id=ab_test_id).update(**{field: F(field) + count})
+
+    @staticmethod
+    def get_results(test_name):
+        """
+        Summarize a test from its outcome counters.
+
+        Args:
+        - test_name (str): Name of the test.
+
+        Returns:
+        - list: Per variant, the sent/viewed/clicked counts and view and click rates.
+        """
+        results = []
+        variants = (
+            NotificationABTest.objects.filter(test_name=test_name)
+            .order_by('variant')
+            .values('id', 'variant', 'sent_count', 'viewed_count', 'clicked_count')
+        )
+        for variant in variants:
+            sent = variant['sent_count']
+            results.append({
+                'id': variant['id'],
+                'variant': variant['variant'],
+                'sent': sent,
+                'viewed': variant['viewed_count'],
+                'clicked': variant['clicked_count'],
+                'view_rate': variant['viewed_count'] / sent if sent else 0.0,
+                'click_rate': variant['clicked_count'] / sent if sent else 0.0,
+            })
+        return results
+
+    @staticmethod
+    def invalidate():
+        """
+        Make every process reload its active tests on the next refresh check.
+        """
+        active_tests.invalidate()
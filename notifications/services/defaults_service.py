@@ -0,0 +1,65 @@
+# notifications/services/defaults_service.py
+import hashlib
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from notifications.models import Notification, NotificationType
+from notifications.utils.type_registry import notification_types
+from notifications.utils.unread_counter import invalidate_unread_counts
+
+def default_dedup_key(user_id, notification_type_id):
+    # Not time-windowed: a user gets each default row once, ever.
+    return hashlib.sha256(f"default:{user_id}:{notification_type_id}".encode()).hexdigest()
+
+
+class NotificationDefaultsService:
+    """
+    Creates the default per-type notification rows of new users.
+
+    The predefined type IDs come from the in-process type registry, so
+    bootstrapping a user costs a single bulk insert. The rows carry a fixed dedup key, which
+    makes running the bootstrap twice for the same user harmless.
+    """
+
+    @staticmethod
+    def get_predefined_type_ids():
+        """
+        Map the names of NotificationType.PREDEFINED_TYPES to their IDs, creating missing types.
+
+        Returns:
+        - dict: Type ID per type name.
+        """
+        return {
+            type_name: notification_types.get(type_name).id
+            for type_name, _ in NotificationType.PREDEFINED_TYPES
+        }
+
+    @staticmethod
+    def create_defaults(user_ids):
+        """
+        Create the default notification rows of one or many users with one bulk insert.
+
+        Args:
+        - user_ids (iterable): IDs of the users.
+
+        Returns:
+        - int: Number of default rows written or already present.
+        """
+        user_ids = list(user_ids)
+        type_ids = NotificationDefaultsService.get_predefined_type_ids().values()
+        content_type_id = ContentType.objects.get_for_model(get_user_model()).id
+        rows = [
+            Notification(
+                recipient_id=user_id,
+                notification_type_id=type_id,
+                content_type_id=content_type_id,
+                object_id=user_id,
+                content='',
+                dedup_key=default_dedup_key(user_id, type_id),
+            )
+            for user_id in user_ids
+            for type_id in type_ids
+        ]
+        Notification.objects.bulk_create(rows, ignore_conflicts=True)
+        # bulk_create skips post_save, so drop the cached unread counts instead.
+        invalidate_unread_counts(user_ids)
+        return len(rows)
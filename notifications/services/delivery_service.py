@@ -0,0 +1,312 @@
+# notifications/services/delivery_service.py
+import logging
+import time
+import uuid
+from datetime import timedelta
+import django_rq
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rq import Retry, get_current_job
+from notifications.models import Notification
+from notifications.metrics import increment_notification_deliveries
+from .crm_integration import send_crm_alert
+from .alert_system_integration import send_external_alert
+from .policy_service import RecipientPolicyResolver
+from .email_service import NotificationEmailSender, PendingEmailQueue
+from .pubsub_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_EMAIL = 'email'
+CHANNEL_SMS = 'sms'
+CHANNEL_PUSH = 'push'
+CHANNEL_CRM = 'crm'
+CHANNEL_ALERT = 'alert'
+
+# Latency-sensitive channels go to the high queue, third-party integrations to low.
+CHANNEL_QUEUES = getattr(settings, 'NOTIFICATION_CHANNEL_QUEUES', {
+    CHANNEL_PUSH: 'high',
+    CHANNEL_SMS: 'high',
+    CHANNEL_EMAIL: 'default',
+    CHANNEL_CRM: 'low',
+    CHANNEL_ALERT: 'low',
+})
+CHANNEL_CONCURRENCY = getattr(settings, 'NOTIFICATION_CHANNEL_CONCURRENCY', {
+    CHANNEL_PUSH: 50,
+    CHANNEL_SMS: 10,
+    CHANNEL_EMAIL: 10,
+    CHANNEL_CRM: 5,
+    CHANNEL_ALERT: 5,
+})
+DELIVERY_MAX_RETRIES = getattr(settings, 'NOTIFICATION_DELIVERY_MAX_RETRIES', 5)
+DELIVERY_RETRY_INTERVALS = getattr(settings, 'NOTIFICATION_DELIVERY_RETRY_INTERVALS', [10, 30, 60, 120, 300])
+CHANNEL_BUSY_DELAY = getattr(settings, 'NOTIFICATION_CHANNEL_BUSY_DELAY', 5)
+DELIVERY_TRANSPORT = getattr(settings, 'NOTIFICATION_DELIVERY_TRANSPORT', 'notifications.services.delivery_service.DefaultTransport')
+DELIVERY_EAGER = getattr(settings, 'NOTIFICATION_DELIVERY_EAGER', False)
+EMAIL_BATCHING = getattr(settings, 'NOTIFICATION_EMAIL_BATCHING', True)
+
+# Held slots are tokens in a sorted set scored by their expiry time, so the
+# slot of a worker that died is reclaimed SLOT_TIMEOUT seconds after it was taken.
+SLOT_TIMEOUT = 60 * 5
+
+# Drop expired slots, then take one if the channel is below its limit.
+# KEYS[1]: slot set. ARGV: now, expiry, limit, token, key TTL.
+ACQUIRE_SLOT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+
+class ChannelBusy(Exception):
+    """Raised when a channel has no free delivery slot; the job is run again later."""
+
+
+class DefaultTransport:
+    """
+    Delivers notifications through the real email, SMS, push, CRM and alert integrations.
+    """
+
+    def send(self, channel, payload):
+        getattr(self, f'send_{channel}')(payload)
+
+    def send_email(self, payload):
+        notification_ids = payload.get('notification_ids') or [payload['notification_id']]
+        NotificationEmailSender.send(notification_ids)
+
+    def send_sms(self, payload):
+        # Implement SMS sending logic here, e.g.
+        # sms_client.send_message(notification.recipient.phone_number, notification.content)
+        pass
+
+    def send_push(self, payload):
+        # Implement push notification sending logic here, e.g.
+        # push_service.send_message(notification.recipient, notification.content)
+        pass
+
+    def send_crm(self, payload):
+        send_crm_alert(payload['user_id'], payload['event_type'], payload['event_data'])
+
+    def send_alert(self, payload):
+        send_external_alert(payload['user_id'], payload['alert_type'], payload['message'])
+
+
+class FakeTransport:
+    """
+    Records deliveries in memory instead of sending them.
+
+    Point NOTIFICATION_DELIVERY_TRANSPORT at this class (and set
+    NOTIFICATION_DELIVERY_EAGER) in tests, then inspect ``FakeTransport.outbox``.
+    """
+    outbox = []
+
+    def send(self, channel, payload):
+        FakeTransport.outbox.append((channel, payload))
+
+
+def get_transport():
+    return import_string(DELIVERY_TRANSPORT)()
+
+
+def _slot_key(channel):
+    return f"notification_delivery_slots_{channel}"
+
+
+def _acquire_slot(channel):
+    """
+    Take a delivery slot of the channel.
+
+    Returns:
+    - str: The slot token to pass to _release_slot, or None when the channel is full.
+    """
+    token = uuid.uuid4().hex
+    now = time.time()
+    acquired = get_redis_client().eval(
+        ACQUIRE_SLOT_SCRIPT, 1, _slot_key(channel),
+        now, now + SLOT_TIMEOUT, CHANNEL_CONCURRENCY.get(channel, 1), token, SLOT_TIMEOUT,
+    )
+    return token if acquired else None
+
+
+def _release_slot(channel, token):
+    get_redis_client().zrem(_slot_key(channel), token)
+
+
+def _defer_busy(func, *args):
+    """
+    Enqueue the running RQ job again after CHANNEL_BUSY_DELAY seconds.
+
+    A full channel is not a delivery failure, so the new job keeps the
+    failure retries the current one has left.
+
+    Returns:
+    - bool: False when not running inside an RQ job.
+    """
+    job = get_current_job()
+    if job is None:
+        return False
+    retries_left = DELIVERY_MAX_RETRIES if job.retries_left is None else job.retries_left
+    retry = Retry(max=retries_left, interval=DELIVERY_RETRY_INTERVALS) if retries_left else None
+    django_rq.get_queue(job.origin).enqueue_in(timedelta(seconds=CHANNEL_BUSY_DELAY), func, *args, retry=retry)
+    return True
+
+
+def _send(channel, payload):
+    token = _acquire_slot(channel)
+    if token is None:
+        raise ChannelBusy(f"No free {channel} delivery slot")
+    try:
+        get_transport().send(channel, payload)
+        increment_notification_deliveries(channel, 'sent')
+    except Exception as e:
+        increment_notification_deliveries(channel, 'failed')
+        logger.warning(f"Failed to deliver {channel} notification {payload}: {e}")
+        raise
+    finally:
+        _release_slot(channel, token)
+
+
+def deliver(channel, payload):
+    """
+    Deliver one notification on one channel. Runs as an RQ job.
+
+    At most NOTIFICATION_CHANNEL_CONCURRENCY[channel] deliveries run at the same
+    time across all workers. A job that finds the channel full is enqueued
+    again after NOTIFICATION_CHANNEL_BUSY_DELAY seconds without using up one of
+    its retries, which are kept for failed deliveries.
+
+    Args:
+    - channel (str): The delivery channel.
+    - payload (dict): Channel-specific data, e.g. the notification ID.
+    """
+    try:
+        _send(channel, payload)
+    except ChannelBusy:
+        if not _defer_busy(deliver, channel, payload):
+            raise
+        increment_notification_deliveries(channel, 'deferred')
+
+
+def deliver_pending_emails():
+    """
+    Drain the pending email list in batches, one SMTP connection per batch. Runs as an RQ job.
+
+    A failed batch is put back at the front of the list before the job is
+    retried, so messages of a partially sent batch may be sent twice. When the
+    email channel is full, the batch is put back and the drain runs again later.
+
+    Returns:
+    - int: Number of notifications emailed.
+    """
+    # Cleared first, so IDs pushed while draining schedule a new job if this one misses them.
+    PendingEmailQueue.clear_scheduled()
+    sent = 0
+    while True:
+        batch = PendingEmailQueue.pop_batch()
+        if not batch:
+            break
+        try:
+            _send(CHANNEL_EMAIL, {'notification_ids': batch})
+        except ChannelBusy:
+            PendingEmailQueue.requeue(batch)
+            if not _defer_busy(deliver_pending_emails):
+                raise
+            increment_notification_deliveries(CHANNEL_EMAIL, 'deferred')
+            break
+        except Exception:
+            PendingEmailQueue.requeue(batch)
+            raise
+        sent += len(batch)
+    return sent
+
+
+class NotificationDeliveryDispatcher:
+    """
+    Moves notification delivery out of the request path.
+
+    Each channel is delivered by its own RQ job on the queue configured in
+    NOTIFICATION_CHANNEL_QUEUES; emails are collected in a pending list and
+    sent in batches by deliver_pending_emails. Jobs are enqueued once the surrounding
+    transaction commits and are retried with NOTIFICATION_DELIVERY_RETRY_INTERVALS
+    backoff when they fail; jobs that find their channel full are run again later
+    (workers must run with ``--with-scheduler`` for delayed retries and reruns).
+    """
+
+    @staticmethod
+    def enqueue(channel, payload):
+        """
+        Enqueue a delivery job for a channel.
+
+        Args:
+        - channel (str): The delivery channel.
+        - payload (dict): Channel-specific data, e.g. the notification ID.
+        """
+        if DELIVERY_EAGER:
+            transaction.on_commit(lambda: deliver(channel, payload))
+            return
+        queue = django_rq.get_queue(CHANNEL_QUEUES.get(channel, 'default'))
+        retry = Retry(max=DELIVERY_MAX_RETRIES, interval=DELIVERY_RETRY_INTERVALS)
+        if channel == CHANNEL_EMAIL and EMAIL_BATCHING:
+            transaction.on_commit(lambda: NotificationDeliveryDispatcher.enqueue_email(queue, retry, payload))
+            return
+        transaction.on_commit(lambda: queue.enqueue(deliver, channel, payload, retry=retry))
+
+    @staticmethod
+    def enqueue_email(queue, retry, payload):
+        """
+        Add an email to the pending list, enqueueing a drain job if none is scheduled.
+        """
+        if PendingEmailQueue.push(payload['notification_id']):
+            queue.enqueue(deliver_pending_emails, retry=retry)
+
+    @staticmethod
+    def dispatch(notification, data):
+        """
+        Enqueue every delivery a newly created notification needs.
+
+        Email, SMS and push deliveries follow the recipient's policy: nothing
+        is sent for disabled types or channels, and notifications for snoozed
+        or daily/weekly users are flagged for their digest instead, on the row
+        and on the instance.
+
+        Args:
+        - notification (Notification): The created notification.
+        - data (dict): The send request, holding delivery_method and the
+          optional CRM and alert-system fields.
+
+        Returns:
+        - bool: False if the recipient disabled the type or the notification is
+          held for a digest, so it must not be pushed to them now either.
+        """
+        delivery_method = data.get('delivery_method', CHANNEL_PUSH)
+        deliver_now = True
+        if delivery_method in (CHANNEL_EMAIL, CHANNEL_SMS, CHANNEL_PUSH):
+            policy = RecipientPolicyResolver.resolve_one(notification.recipient_id)
+            notification_type_id = notification.notification_type_id
+            if not policy.allows(notification_type_id):
+                deliver_now = False
+            elif policy.wants_digest or policy.is_snoozed():
+                # Held back for the recipient's next digest.
+                Notification.objects.filter(id=notification.id).update(pending_digest=True)
+                notification.pending_digest = True
+                deliver_now = False
+            elif policy.allows_channel(delivery_method, notification_type_id):
+                NotificationDeliveryDispatcher.enqueue(delivery_method, {'notification_id': notification.id})
+        if data.get('notify_crm'):
+            NotificationDeliveryDispatcher.enqueue(CHANNEL_CRM, {
+                'user_id': notification.recipient_id,
+                'event_type': data['event_type'],
+                'event_data': data['event_data'],
+            })
+        if data.get('notify_alert_system'):
+            NotificationDeliveryDispatcher.enqueue(CHANNEL_ALERT, {
+                'user_id': notification.recipient_id,
+                'alert_type': data['alert_type'],
+                'message': data['message'],
+            })
+        return deliver_now
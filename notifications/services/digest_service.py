@@ -0,0 +1,237 @@
+# notifications/services/digest_service.py
+import logging
+from collections import defaultdict
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+from notifications.models import Notification, NotificationDigest
+from .email_service import EMAIL_BATCH_SIZE, EMAIL_FROM
+from .policy_service import RecipientPolicyResolver
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_INSTANT = 'instant'
+FREQUENCY_DAILY = 'daily'
+FREQUENCY_WEEKLY = 'weekly'
+
+DIGEST_FREQUENCIES = (FREQUENCY_DAILY, FREQUENCY_WEEKLY)
+
+# Notification IDs per IN clause when claiming, kept below SQLite's variable limit.
+CLAIM_BATCH_SIZE = 500
+
+
+class NotificationDigestService:
+    """
+    Collapses the notifications of daily/weekly users into one digest per period.
+
+    Notifications for users whose UserNotificationPreference.notification_frequency
+    is not 'instant' are stored as usual but flagged ``pending_digest`` instead
+    of being delivered. A scheduled job aggregates the flagged rows per user
+    with grouped queries, stores one digest each and clears the flags in the
+    same transaction, then emails the digests that have not been sent yet.
+    """
+
+    @staticmethod
+    def get_digest_recipient_ids(user_ids):
+        """
+        Find which of the given users receive digests instead of instant deliveries.
+
+        Args:
+        - user_ids (iterable): IDs of the users.
+
+        Returns:
+        - set: IDs of the users with a daily or weekly notification frequency.
+        """
+        policies = RecipientPolicyResolver.resolve(user_ids)
+        return {user_id for user_id, policy in policies.items() if policy.wants_digest}
+
+    @staticmethod
+    def is_digest_recipient(user_id):
+        """
+        Check whether a user receives digests instead of instant deliveries.
+        """
+        return user_id in NotificationDigestService.get_digest_recipient_ids([user_id])
+
+    @staticmethod
+    def get_pending_notifications(frequency):
+        """
+        Select the notifications waiting for a digest of the given frequency.
+
+        The daily digest also picks up rows of users who have since switched
+        back to instant delivery, so no flagged row is left behind.
+
+        Args:
+        - frequency (str): 'daily' or 'weekly'.
+
+        Returns:
+        - QuerySet: The pending notifications.
+        """
+        pending = Notification.objects.filter(pending_digest=True)
+        weekly = {'recipient__usernotificationpreference__notification_frequency': FREQUENCY_WEEKLY}
+        if frequency == FREQUENCY_WEEKLY:
+            return pending.filter(**weekly)
+        return pending.exclude(**weekly)
+
+    @staticmethod
+    def build_digests(frequency, notification_ids):
+        """
+        Aggregate the given notifications into one unsaved digest per user.
+
+        Args:
+        - frequency (str): 'daily' or 'weekly'.
+        - notification_ids (list): IDs of the notifications to include.
+
+        Returns:
+        - list: (NotificationDigest, recipient email) tuples.
+        """
+        digests = {}
+        summaries = defaultdict(lambda: defaultdict(int))
+        for start in range(0, len(notification_ids), CLAIM_BATCH_SIZE):
+            rows = (
+                Notification.objects
+                .filter(id__in=notification_ids[start:start + CLAIM_BATCH_SIZE])
+                .values('recipient_id', 'recipient__email', 'notification_type__type_name')
+                .annotate(count=Count('id'), first=Min('timestamp'), last=Max('timestamp'))
+                .order_by('recipient_id')
+            )
+            for row in rows:
+                user_id = row['recipient_id']
+                summaries[user_id][row['notification_type__type_name']] += row['count']
+                digest = digests.get(user_id)
+                if digest is None:
+                    digests[user_id] = (
+                        NotificationDigest(
+                            user_id=user_id,
+                            frequency=frequency,
+                            period_start=row['first'],
+                            period_end=row['last'],
+                            notification_count=row['count'],
+                        ),
+                        row['recipient__email'],
+                    )
+                else:
+                    digest = digest[0]
+                    digest.period_start = min(digest.period_start, row['first'])
+                    digest.period_end = max(digest.period_end, row['last'])
+                    digest.notification_count += row['count']
+        for user_id, (digest, _) in digests.items():
+            digest.summary = dict(summaries[user_id])
+        return list(digests.values())
+
+    @staticmethod
+    def build_message(digest, email):
+        """
+        Build the digest email for a user.
+        """
+        lines = [f"- {type_name}: {count}" for type_name, count in sorted(digest.summary.items())]
+        body = f"You have {digest.notification_count} new notifications:\n\n" + "\n".join(lines)
+        return EmailMultiAlternatives(
+            f"Your {digest.frequency} notification digest",
+            body,
+            EMAIL_FROM,
+            [email],
+        )
+
+    @staticmethod
+    def claim_digests(frequency):
+        """
+        Store the digests of one frequency and clear the pending flags they cover, atomically.
+
+        A run that fails after this point cannot build the same digests twice;
+        the stored digests are sent by send_unsent_digests.
+
+        Args:
+        - frequency (str): 'daily' or 'weekly'.
+
+        Returns:
+        - dict: Number of digests created and notifications they cover.
+        """
+        with transaction.atomic():
+            # The pending rows are read once and locked; digests are built and
+            # flags cleared by exactly this list, so a row flagged meanwhile by
+            # dispatch is left for the next period instead of being cleared unsent.
+            notification_ids = list(
+                NotificationDigestService.get_pending_notifications(frequency)
+                .select_for_update(of=('self',))
+                .order_by('id')
+                .values_list('id', flat=True)
+            )
+            if not notification_ids:
+                return {'digests': 0, 'notifications': 0}
+            digests = NotificationDigestService.build_digests(frequency, notification_ids)
+            NotificationDigest.objects.bulk_create([digest for digest, _ in digests])
+            cleared = 0
+            now = timezone.now()
+            for start in range(0, len(notification_ids), CLAIM_BATCH_SIZE):
+                cleared += Notification.objects.filter(
+                    id__in=notification_ids[start:start + CLAIM_BATCH_SIZE]
+                ).update(pending_digest=False, updated_at=now)
+        return {'digests': len(digests), 'notifications': cleared}
+
+    @staticmethod
+    def send_unsent_digests(frequency, batch_size=None):
+        """
+        Email the stored digests of one frequency that have not been sent yet.
+
+        Messages go out one by one over a single connection, and each batch's
+        digests are marked sent as soon as the batch is done. A recipient whose
+        email fails stays unsent and is retried by the next run; a worker killed
+        mid-batch re-sends at most that batch.
+
+        Args:
+        - frequency (str): 'daily' or 'weekly'.
+        - batch_size (int, optional): Digests marked sent per update.
+
+        Returns:
+        - dict: Number of digests sent and failed.
+        """
+        batch_size = batch_size or EMAIL_BATCH_SIZE
+        unsent = (
+            NotificationDigest.objects
+            .filter(frequency=frequency, sent_at__isnull=True)
+            .exclude(user__email='')
+            .select_related('user')
+            .order_by('id')
+        )
+        sent = failed = 0
+        last_id = 0
+        with get_connection(fail_silently=False) as connection:
+            while True:
+                batch = list(unsent.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                sent_ids = []
+                for digest in batch:
+                    message = NotificationDigestService.build_message(digest, digest.user.email)
+                    try:
+                        connection.send_messages([message])
+                        sent_ids.append(digest.id)
+                    except Exception as e:
+                        failed += 1
+                        logger.warning(f"Failed to email digest {digest.id}: {e}")
+                NotificationDigest.objects.filter(id__in=sent_ids).update(sent_at=timezone.now())
+                sent += len(sent_ids)
+        return {'sent': sent, 'failed': failed}
+
+    @staticmethod
+    def send_digests(frequency):
+        """
+        Claim the pending notifications of one frequency into digests, then email every unsent digest.
+
+        Args:
+        - frequency (str): 'daily' or 'weekly'.
+
+        Returns:
+        - dict: Number of digests created, notifications they cover, and digests sent and failed.
+        """
+        if frequency not in DIGEST_FREQUENCIES:
+            raise ValueError(f"Unknown digest frequency: {frequency}")
+        claimed = NotificationDigestService.claim_digests(frequency)
+        delivery = NotificationDigestService.send_unsent_digests(frequency)
+        logger.info(
+            f"Created {claimed['digests']} {frequency} digests covering {claimed['notifications']} notifications; "
+            f"sent {delivery['sent']}, {delivery['failed']} failed"
+        )
+        return {**claimed, **delivery}
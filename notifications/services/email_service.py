@@ -0,0 +1,156 @@
+# notifications/services/email_service.py
+import logging
+from itertools import islice
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from notifications.models import Notification
+from .pubsub_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+EMAIL_BATCH_SIZE = getattr(settings, 'NOTIFICATION_EMAIL_BATCH_SIZE', 100)
+EMAIL_FROM = getattr(settings, 'NOTIFICATION_EMAIL_FROM', 'no-reply@myapp.com')
+EMAIL_SUBJECT = 'New Notification'
+
+PENDING_EMAILS_KEY = 'notification_emails_pending'
+
+
+class NotificationEmailSender:
+    """
+    Sends notification emails in batches over a single SMTP connection.
+
+    Each message is plain text from ``content`` with ``html_content`` attached
+    as an HTML alternative when present.
+    """
+
+    @staticmethod
+    def build_message(notification, connection=None):
+        """
+        Build the email for a notification.
+
+        Args:
+        - notification (Notification): The notification, with its recipient loaded.
+        - connection (optional): The email backend connection to send through.
+
+        Returns:
+        - EmailMultiAlternatives: The message.
+        """
+        message = EmailMultiAlternatives(
+            EMAIL_SUBJECT,
+            notification.content,
+            EMAIL_FROM,
+            [notification.recipient.email],
+            connection=connection,
+        )
+        if notification.html_content:
+            message.attach_alternative(notification.html_content, 'text/html')
+        return message
+
+    @staticmethod
+    def send_messages(messages, batch_size=None, connection=None):
+        """
+        Send email messages in batches, reusing one connection for all of them.
+
+        Args:
+        - messages (iterable): EmailMessage objects, consumed lazily.
+        - batch_size (int, optional): Messages handed to the backend per call.
+        - connection (optional): An open backend connection; one is opened if omitted.
+
+        Returns:
+        - int: Number of messages sent.
+        """
+        batch_size = batch_size or EMAIL_BATCH_SIZE
+        connection = connection or get_connection(fail_silently=False)
+        messages = iter(messages)
+        sent = 0
+        # The connection stays open across batches and is closed once at the end.
+        with connection:
+            while True:
+                batch = list(islice(messages, batch_size))
+                if not batch:
+                    break
+                sent += connection.send_messages(batch) or 0
+        return sent
+
+    @staticmethod
+    def send_notifications(notifications, batch_size=None, connection=None):
+        """
+        Email many notifications over one connection.
+
+        Args:
+        - notifications (iterable): Notifications with their recipients loaded.
+        - batch_size (int, optional): Messages handed to the backend per call.
+        - connection (optional): An open backend connection; one is opened if omitted.
+
+        Returns:
+        - int: Number of messages sent.
+        """
+        messages = (
+            NotificationEmailSender.build_message(notification)
+            for notification in notifications
+            if notification.recipient.email
+        )
+        return NotificationEmailSender.send_messages(messages, batch_size, connection)
+
+    @staticmethod
+    def send(notification_ids, batch_size=None):
+        """
+        Email the notifications with the given IDs.
+
+        Args:
+        - notification_ids (list): IDs of the notifications to email.
+        - batch_size (int, optional): Messages handed to the backend per call.
+
+        Returns:
+        - int: Number of messages sent.
+        """
+        notifications = (
+            Notification.objects.filter(id__in=notification_ids)
+            .select_related('recipient')
+            .order_by('id')
+        )
+        return NotificationEmailSender.send_notifications(notifications.iterator(), batch_size)
+
+
+class PendingEmailQueue:
+    """
+    Redis list of notification IDs waiting to be emailed.
+
+    Producers push IDs and only enqueue a drain job when none is pending, so a
+    burst of email notifications is sent by a few jobs in large batches.
+    """
+
+    @staticmethod
+    def push(notification_id):
+        """
+        Add a notification to the pending list.
+
+        Returns:
+        - bool: True if no drain job was scheduled and the caller should enqueue one.
+        """
+        client = get_redis_client()
+        pipeline = client.pipeline(transaction=False)
+        pipeline.rpush(PENDING_EMAILS_KEY, notification_id)
+        pipeline.set(f'{PENDING_EMAILS_KEY}_scheduled', 1, nx=True, ex=60 * 5)
+        _, scheduled = pipeline.execute()
+        return bool(scheduled)
+
+    @staticmethod
+    def pop_batch(batch_size=None):
+        """
+        Take up to ``batch_size`` notification IDs off the pending list.
+        """
+        ids = get_redis_client().lpop(PENDING_EMAILS_KEY, batch_size or EMAIL_BATCH_SIZE)
+        return [int(notification_id) for notification_id in ids or []]
+
+    @staticmethod
+    def requeue(notification_ids):
+        """
+        Put notification IDs back at the front of the pending list after a failure.
+        """
+        if notification_ids:
+            get_redis_client().lpush(PENDING_EMAILS_KEY, *reversed(notification_ids))
+
+    @staticmethod
+    def clear_scheduled():
+        get_redis_client().delete(f'{PENDING_EMAILS_KEY}_scheduled')
@@ -0,0 +1,242 @@
+# notifications/services/engagement_service.py
+import logging
+import uuid
+from datetime import datetime, timezone as dt_timezone
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import Notification, NotificationEngagement
+from notifications.metrics import (
+    increment_engagement_events,
+    increment_engagement_events_lost,
+    observe_engagement_flush,
+)
+from .ab_test_service import NotificationABTestService
+from .pubsub_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+ENGAGEMENT_MAX_PENDING = getattr(settings, 'NOTIFICATION_ENGAGEMENT_MAX_PENDING', 100000)
+ENGAGEMENT_FLUSH_BATCH_SIZE = getattr(settings, 'NOTIFICATION_ENGAGEMENT_FLUSH_BATCH_SIZE', 1000)
+
+VIEW = 'view'
+CLICK = 'click'
+ACTIONS = (VIEW, CLICK)
+
+# One hash per action; the field is "<user_id>:<notification_id>" and the value
+# the time of the first event, so repeated impressions collapse into one entry.
+PENDING_KEYS = {
+    VIEW: 'notification_engagements_pending_view',
+    CLICK: 'notification_engagements_pending_click',
+}
+FLUSH_LOCK_KEY = 'notification_engagements_flush_lock'
+FLUSH_LOCK_TIMEOUT = 60 * 5
+
+# Delete the flush lock only if it still holds our token, so a flush that
+# outlived FLUSH_LOCK_TIMEOUT cannot release the lock of the next one.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _processing_key(action):
+    return f"{PENDING_KEYS[action]}_processing"
+
+
+class EngagementBuffer:
+    """
+    Buffers notification view/click events in Redis and writes them in bulk.
+
+    Events are deduplicated per (user, notification) as they arrive, so a feed
+    that reports the same impression many times costs one hash field. Once the
+    buffer holds ENGAGEMENT_MAX_PENDING entries new events are refused rather
+    than letting Redis grow without bound; refused and unwritable events are
+    counted by the loss metric.
+    """
+
+    @staticmethod
+    def add(user_id, events):
+        """
+        Buffer engagement events of one user.
+
+        Args:
+        - user_id (int): ID of the user who saw or clicked the notifications.
+        - events (iterable): (notification_id, action) pairs; action is 'view' or 'click'.
+
+        Returns:
+        - dict: Number of events accepted, collapsed as duplicates and dropped.
+
+        Raises:
+        - ValueError: If an action is unknown or a notification ID is not an integer.
+        """
+        events = [(int(notification_id), action) for notification_id, action in events]
+        for _, action in events:
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown engagement action: {action}")
+        result = {'accepted': 0, 'duplicates': 0, 'dropped': 0}
+        if not events:
+            return result
+
+        now = timezone.now().timestamp()
+        try:
+            client = get_redis_client()
+            pipeline = client.pipeline(transaction=False)
+            for key in PENDING_KEYS.values():
+                pipeline.hlen(key)
+            if sum(pipeline.execute()) >= ENGAGEMENT_MAX_PENDING:
+                increment_engagement_events_lost('backpressure', len(events))
+                result['dropped'] = len(events)
+                return result
+
+            pipeline = client.pipeline(transaction=False)
+            for notification_id, action in events:
+                pipeline.hsetnx(PENDING_KEYS[action], f"{user_id}:{notification_id}", now)
+            added = pipeline.execute()
+        except redis.RedisError:
+            logger.exception("Could not buffer engagement events")
+            increment_engagement_events_lost('unavailable', len(events))
+            result['dropped'] = len(events)
+            return result
+
+        for (_, action), is_new in zip(events, added):
+            status = 'accepted' if is_new else 'duplicate'
+            increment_engagement_events(action, status)
+            result['accepted' if is_new else 'duplicates'] += 1
+        return result
+
+    @staticmethod
+    def flush(batch_size=None):
+        """
+        Write all buffered events to NotificationEngagement.
+
+        Each pending hash is renamed to a processing key before it is read, so
+        events that arrive during the flush go to a fresh hash. The processing
+        keys are deleted only after every batch is written; a failed flush
+        leaves them to be retried by the next one, which is safe because rows
+        are merged with the ones already stored.
+
+        Args:
+        - batch_size (int, optional): (user, notification) pairs per transaction.
+
+        Returns:
+        - dict: Number of rows created and updated, or None if another flush is running.
+        """
+        batch_size = batch_size or ENGAGEMENT_FLUSH_BATCH_SIZE
+        client = get_redis_client()
+        token = uuid.uuid4().hex
+        if not client.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TIMEOUT):
+            return None
+        try:
+            pending = {}
+            for action in ACTIONS:
+                processing_key = _processing_key(action)
+                if not client.exists(processing_key):
+                    try:
+                        client.rename(PENDING_KEYS[action], processing_key)
+                    except redis.ResponseError:
+                        # Nothing buffered for this action.
+                        continue
+                for field, value in client.hgetall(processing_key).items():
+                    user_id, notification_id = (int(part) for part in field.decode().split(':'))
+                    at = datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+                    pending.setdefault((user_id, notification_id), {})[action] = at
+
+            keys = list(pending)
+            result = {'created': 0, 'updated': 0}
+            for start in range(0, len(keys), batch_size):
+                created, updated = EngagementBuffer.write_batch(
+                    {key: pending[key] for key in keys[start:start + batch_size]}
+                )
+                result['created'] += created
+                result['updated'] += updated
+            client.delete(*(_processing_key(action) for action in ACTIONS))
+        finally:
+            client.eval(RELEASE_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+
+        observe_engagement_flush(len(keys))
+        return result
+
+    @staticmethod
+    def write_batch(events):
+        """
+        Merge a batch of deduplicated events into NotificationEngagement.
+
+        Events for notifications that no longer exist or were not sent to the
+        user are discarded and counted as lost. Existing rows keep their
+        first view and click times. Newly recorded views and clicks of
+        notifications sent as an A/B test variant are added to its counters.
+
+        Args:
+        - events (dict): {'view': datetime, 'click': datetime} per (user_id, notification_id).
+
+        Returns:
+        - tuple: Number of rows created and updated.
+        """
+        notification_ids = {notification_id for _, notification_id in events}
+        ab_tests = {
+            (recipient_id, notification_id): ab_test_id
+            for recipient_id, notification_id, ab_test_id in (
+                Notification.objects.filter(id__in=notification_ids)
+                .values_list('recipient_id', 'id', 'ab_test_id')
+            )
+        }
+        valid = set(ab_tests)
+        invalid = [key for key in events if key not in valid]
+        if invalid:
+            increment_engagement_events_lost('invalid', len(invalid))
+            for key in invalid:
+                del events[key]
+        if not events:
+            return 0, 0
+
+        existing = {}
+        rows = NotificationEngagement.objects.filter(
+            notification_id__in={notification_id for _, notification_id in events},
+            user_id__in={user_id for user_id, _ in events},
+        ).only('id', 'notification_id', 'user_id', 'viewed_at', 'clicked_at')
+        for row in rows:
+            existing.setdefault((row.user_id, row.notification_id), row)
+
+        to_create = []
+        to_update = []
+        viewed = []
+        clicked = []
+        for key, times in events.items():
+            user_id, notification_id = key
+            row = existing.get(key)
+            if row is None:
+                to_create.append((NotificationEngagement(
+                    notification_id=notification_id, user_id=user_id, clicked_at=times.get(CLICK),
+                ), times.get(VIEW) or times[CLICK]))
+                viewed.append(ab_tests[key])
+                if CLICK in times:
+                    clicked.append(ab_tests[key])
+                continue
+            changed = False
+            if row.viewed_at is None and VIEW in times:
+                row.viewed_at = times[VIEW]
+                viewed.append(ab_tests[key])
+                changed = True
+            if row.clicked_at is None and CLICK in times:
+                row.clicked_at = times[CLICK]
+                clicked.append(ab_tests[key])
+                changed = True
+            if changed:
+                to_update.append(row)
+
+        created, updated = len(to_create), len(to_update)
+        with transaction.atomic():
+            NotificationEngagement.objects.bulk_create([row for row, _ in to_create])
+            # viewed_at is auto_now_add, so bulk_create stamps new rows with the
+            # flush time; the buffered time of the first event is written back here.
+            for row, viewed_at in to_create:
+                row.viewed_at = viewed_at
+                to_update.append(row)
+            NotificationEngagement.objects.bulk_update(to_update, ['viewed_at', 'clicked_at'])
+            NotificationABTestService.record_outcomes('viewed', viewed)
+            NotificationABTestService.record_outcomes('clicked', clicked)
+        return created, updated
@@ -0,0 +1,211 @@
+# notifications/services/fanout_service.py
+import logging
+import time
+from itertools import islice
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from courses.models import CourseEnrollment
+from followers.models import Follower
+from notifications.models import Notification, NotificationSearchToken
+from notifications.metrics import increment_notifications_sent
+from notifications.utils.search_index import build_search_tokens, SEARCH_INDEX_BATCH_SIZE
+from notifications.utils.type_registry import notification_types
+from notifications.utils.unread_counter import invalidate_unread_counts
+from .policy_service import RecipientPolicyResolver
+from .realtime_service import NotificationPushService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = getattr(settings, 'NOTIFICATION_FANOUT_BATCH_SIZE', 1000)
+
+AUDIENCE_ALL_USERS = 'all_users'
+AUDIENCE_FOLLOWERS = 'followers'
+AUDIENCE_COURSE_STUDENTS = 'course_students'
+
+
+class NotificationFanoutService:
+    """
+    Bulk fan-out of a single notification to a large set of recipients.
+
+    Recipient IDs are streamed in chunks, turned into unsaved Notification
+    rows in memory and written with ``bulk_create``, one transaction per
+    chunk, together with their search index rows. Per-row serializer
+    validation and post_save signals are skipped.
+    Recipient policies are resolved once per chunk: recipients who disabled
+    the notification type are skipped, and snoozed or digest recipients get
+    their rows flagged for the next digest. The rest are pushed to connected
+    recipients' websockets as each chunk commits.
+    """
+
+    @staticmethod
+    def get_follower_ids(user_id):
+        """
+        Stream the IDs of the users following a user.
+
+        Args:
+        - user_id (int): ID of the followed user.
+
+        Returns:
+        - iterator: Follower user IDs.
+        """
+        return (
+            Follower.get_followers(user_id)
+            .order_by('follower_id')
+            .values_list('follower_id', flat=True)
+            .iterator(chunk_size=DEFAULT_BATCH_SIZE)
+        )
+
+    @staticmethod
+    def get_all_user_ids():
+        """
+        Stream the IDs of all users.
+
+        Returns:
+        - iterator: User IDs.
+        """
+        return (
+            get_user_model().objects
+            .order_by('id')
+            .values_list('id', flat=True)
+            .iterator(chunk_size=DEFAULT_BATCH_SIZE)
+        )
+
+    @staticmethod
+    def get_course_student_ids(course_id):
+        """
+        Stream the IDs of the students enrolled in a course.
+
+        Args:
+        - course_id (int): ID of the course.
+
+        Returns:
+        - iterator: Student user IDs.
+        """
+        return (
+            CourseEnrollment.objects
+            .filter(course_id=course_id)
+            .order_by('student_id')
+            .values_list('student_id', flat=True)
+            .iterator(chunk_size=DEFAULT_BATCH_SIZE)
+        )
+
+    @staticmethod
+    def resolve_audience(audience, user_id=None, course_id=None):
+        """
+        Resolve an audience name to a stream of recipient IDs.
+
+        Args:
+        - audience (str): AUDIENCE_ALL_USERS, AUDIENCE_FOLLOWERS or AUDIENCE_COURSE_STUDENTS.
+        - user_id (int, optional): The followed user, required for AUDIENCE_FOLLOWERS.
+        - course_id (int, optional): The course, required for AUDIENCE_COURSE_STUDENTS.
+
+        Returns:
+        - iterator: Recipient user IDs.
+        """
+        if audience == AUDIENCE_ALL_USERS:
+            return NotificationFanoutService.get_all_user_ids()
+        if audience == AUDIENCE_FOLLOWERS:
+            if user_id is None:
+                raise ValueError("A user_id is required to notify followers.")
+            return NotificationFanoutService.get_follower_ids(user_id)
+        if audience == AUDIENCE_COURSE_STUDENTS:
+            if course_id is None:
+                raise ValueError("A course_id is required to notify course students.")
+            return NotificationFanoutService.get_course_student_ids(course_id)
+        raise ValueError(f"Unknown audience: {audience}")
+
+    @staticmethod
+    def fan_out(recipient_ids, notification_type, content='', url='', content_object=None,
+                content_type_id=None, object_id=None, priority=1, batch_size=None,
+                return_ids=False, progress_callback=None):
+        """
+        Create one notification per recipient using batched bulk inserts.
+
+        Args:
+        - recipient_ids (iterable): Recipient user IDs, consumed lazily.
+        - notification_type (NotificationType or int): The notification type or its ID.
+        - content (str): The notification content.
+        - url (str): The URL related to the notification.
+        - content_object (Model, optional): The object related to the notification.
+        - content_type_id (int, optional): Content type of the related object, when
+          no content_object instance is at hand (e.g. from a Celery task).
+        - object_id (int, optional): ID of the related object.
+        - priority (int): Notification priority.
+        - batch_size (int, optional): Rows per bulk insert and transaction.
+        - return_ids (bool): Whether to collect the IDs of the created rows.
+        - progress_callback (callable, optional): Called as ``callback(created, batches)``
+          after each committed batch.
+
+        Returns:
+        - dict: Number of rows created, batches written, elapsed seconds and,
+          when requested, the created notification IDs.
+        """
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+        notification_type_id = getattr(notification_type, 'id', notification_type)
+
+        if content_object is not None:
+            content_type_id = ContentType.objects.get_for_model(content_object).id
+            object_id = content_object.pk
+        # Without a related object each notification points at its recipient.
+        point_at_recipient = content_type_id is None
+        if point_at_recipient:
+            content_type_id = ContentType.objects.get_for_model(get_user_model()).id
+
+        type_name = notification_types.get_by_id(notification_type_id).type_name
+        created = 0
+        batches = 0
+        notification_ids = []
+        started = time.monotonic()
+        recipient_ids = iter(recipient_ids)
+
+        while True:
+            chunk = list(islice(recipient_ids, batch_size))
+            if not chunk:
+                break
+            policies = RecipientPolicyResolver.resolve(chunk)
+            rows = [
+                Notification(
+                    recipient_id=recipient_id,
+                    notification_type_id=notification_type_id,
+                    content_type_id=content_type_id,
+                    object_id=recipient_id if point_at_recipient else object_id,
+                    content=content,
+                    url=url,
+                    priority=priority,
+                    is_read=False,
+                    pending_digest=policies[recipient_id].wants_digest or policies[recipient_id].is_snoozed(),
+                )
+                for recipient_id in chunk
+                if policies[recipient_id].allows(notification_type_id)
+            ]
+            with transaction.atomic():
+                rows = Notification.objects.bulk_create(rows)
+                NotificationSearchToken.objects.bulk_create(
+                    build_search_tokens(((row.id, row.recipient_id) for row in rows), content),
+                    batch_size=SEARCH_INDEX_BATCH_SIZE,
+                )
+            # bulk_create skips post_save, so drop the cached unread counts instead.
+            invalidate_unread_counts(chunk)
+            # Rows held for a digest are not pushed; the digest delivers them.
+            NotificationPushService.push_on_commit([row for row in rows if not row.pending_digest], type_name)
+            created += len(rows)
+            batches += 1
+            if return_ids:
+                notification_ids.extend(row.id for row in rows)
+            increment_notifications_sent(len(rows))
+            if progress_callback:
+                progress_callback(created, batches)
+
+        elapsed = time.monotonic() - started
+        logger.info(f"Fanned out {created} notifications in {batches} batches ({elapsed:.2f}s)")
+
+        result = {
+            'created': created,
+            'batches': batches,
+            'elapsed': elapsed,
+        }
+        if return_ids:
+            result['notification_ids'] = notification_ids
+        return result
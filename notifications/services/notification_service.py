@@ -1,8 +1,12 @@
 # notifications/services/notification_service.py
 import logging
-import random
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import TruncDate
 from django.utils import timezone
-from django.core.mail import send_mail
+from django.contrib.contenttypes.models import ContentType
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
 from notifications.models import (
     Notification, NotificationType, NotificationTemplate, NotificationSettings, 
     NotificationReadStatus, NotificationLog, NotificationEngagement, NotificationSnooze,
@@ -13,15 +17,31 @@ from notifications.reports.notification_report import (
     generate_user_notification_report,
     generate_notification_summary
 )
+from notifications.reports.rollups import schedule_rollup_refresh
+from notifications.services.engagement_service import EngagementBuffer
 from notifications.querying.notification_query import (
     get_notifications_by_user,
-    search_notifications
+    get_notifications_page,
+    get_notifications_for_bulk_action,
+    search_notifications,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    ENCRYPTED_FIELDS,
 )
 from notifications.utils import (
     format_notification_content,
     validate_notification_data,
     process_notification_data
 )
+from notifications.utils.unread_counter import get_unread_count, decrement_unread_count
+from notifications.utils.dedup import build_dedup_key, unseen_dedup_keys, record_dedup_keys
+from notifications.utils.type_registry import notification_types
+from notifications.utils.template_cache import (
+    get_template_metadata,
+    render_notification_template,
+    render_notification_templates,
+    render_template_by_id,
+)
 from notifications.helpers.notification_helpers import (
     process_notification_data,
     validate_notification_permissions,
@@ -32,23 +52,37 @@ from notifications.helpers.notification_helpers import (
 #     update_notification_settings
 # )
 from notifications.serializers import (
-    NotificationSerializer, NotificationTypeSerializer,
+    NotificationSerializer, NotificationMetadataSerializer, NotificationTypeSerializer,
     NotificationTemplateSerializer, NotificationSettingsSerializer,
     NotificationReadStatusSerializer, UserNotificationPreferenceSerializer,
     NotificationSnoozeSerializer, NotificationEngagementSerializer,
     NotificationABTestSerializer
 )
 from django.utils.translation import activate, gettext as _
-from django.core.exceptions import PermissionDenied
-from notifications.tasks import send_bulk_notifications
+from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+from notifications.tasks import send_bulk_notifications, fan_out_notifications
 from django.core.cache import cache
 from notifications.metrics import increment_notifications_sent, increment_notifications_failed
 from .pubsub_service import PubSubService
-from .crm_integration import send_crm_alert
-from .alert_system_integration import send_external_alert
+from .fanout_service import (
+    NotificationFanoutService, AUDIENCE_ALL_USERS, AUDIENCE_FOLLOWERS, AUDIENCE_COURSE_STUDENTS,
+)
+from .delivery_service import NotificationDeliveryDispatcher
+from .email_service import NotificationEmailSender
+from .policy_service import RecipientPolicyResolver
+from .ab_test_service import NotificationABTestService
+from .realtime_service import NotificationPushService
+from .defaults_service import NotificationDefaultsService
 
 logger = logging.getLogger(__name__)
 
+BULK_ACTION_BATCH_SIZE = getattr(settings, 'NOTIFICATION_BULK_ACTION_BATCH_SIZE', 1000)
+FAN_OUT_OWNER_TIMEOUT = getattr(settings, 'NOTIFICATION_FAN_OUT_OWNER_TIMEOUT', 60 * 60 * 24)
+
+
+def fan_out_owner_cache_key(task_id):
+    return f"notification_fan_out_owner_{task_id}"
+
 
 class NotificationService:
     """
@@ -107,17 +141,11 @@ class NotificationService:
             serializer = NotificationSerializer(data=data)
             if serializer.is_valid():
                 notification = serializer.save()
-                delivery_method = data.get('delivery_method', 'push')
-                if data.get('notify_crm'):
-                    send_crm_alert(user.id, data['event_type'], data['event_data'])
-                if data.get('notify_alert_system'):
-                    send_external_alert(user.id, data['alert_type'], data['message'])
-                if delivery_method == 'email':
-                    NotificationService.send_email_notification(notification)
-                elif delivery_method == 'sms':
-                    NotificationService.send_sms_notification(notification)
-                elif delivery_method == 'push':
-                    NotificationService.send_push_notification(notification)
+                if notification.ab_test_id:
+                    NotificationABTestService.record_outcomes('sent', [notification.ab_test_id])
+                # Email, SMS, push, CRM and alert deliveries run as background jobs.
+                if NotificationDeliveryDispatcher.dispatch(notification, data):
+                    NotificationPushService.push_on_commit([notification])
 
                 PubSubService.publish_notification('notifications', notification.content)
                 increment_notifications_sent()
@@ -131,6 +159,66 @@ class NotificationService:
             raise
 
 
+    @staticmethod
+    def create_notification(recipient, content, notification_type_name=None, notification_type=None,
+                            content_object=None, url='', priority=1, delivery_method='push', dedup_window=None):
+        """
+        Create and deliver a notification at most once per source event.
+
+        The idempotency key (recipient, type, source object, time window) is
+        enforced by the unique index on dedup_key. Keys of committed rows are
+        also kept in Redis, which drops most repeats without a query; a key is
+        only recorded once its row commits, so an attempt rolled back by an
+        outer transaction can be retried. Deliveries are only dispatched for
+        the row that was actually created.
+
+        Args:
+        - recipient (User or UserProfile): The recipient.
+        - content (str): The notification content.
+        - notification_type_name (str, optional): Name of the notification type.
+        - notification_type (NotificationType, optional): The type, instead of its name.
+        - content_object (Model, optional): The object the notification is about.
+        - url (str): The URL related to the notification.
+        - priority (int): Notification priority.
+        - delivery_method (str): 'push', 'email' or 'sms'.
+        - dedup_window (int, optional): Seconds during which repeats are dropped.
+
+        Returns:
+        - Notification: The created notification, or None for a duplicate.
+        """
+        user = recipient.user if isinstance(recipient, UserProfile) else recipient
+        if notification_type is None:
+            notification_type = notification_types.get(notification_type_name)
+        source = content_object if content_object is not None else user
+        content_type = ContentType.objects.get_for_model(source)
+
+        dedup_key = build_dedup_key(user.id, notification_type.id, content_type.id, source.pk, dedup_window)
+        if not unseen_dedup_keys([dedup_key]):
+            return None
+        try:
+            with transaction.atomic():
+                notification = Notification.objects.create(
+                    recipient=user,
+                    notification_type=notification_type,
+                    content_type=content_type,
+                    object_id=source.pk,
+                    content=content,
+                    url=url,
+                    priority=priority,
+                    delivery_method=delivery_method,
+                    dedup_key=dedup_key,
+                )
+        except IntegrityError:
+            # Created by a concurrent attempt, or by an earlier one whose Redis key has expired.
+            return None
+        transaction.on_commit(lambda: record_dedup_keys([dedup_key], dedup_window))
+
+        # Disabled types and rows held for a digest are not pushed, as in fan-out.
+        if NotificationDeliveryDispatcher.dispatch(notification, {'delivery_method': delivery_method}):
+            NotificationPushService.push_on_commit([notification], notification_type.type_name)
+        increment_notifications_sent()
+        return notification
+
     @staticmethod
     def send_email_notification(notification):
         """
@@ -139,14 +227,7 @@ class NotificationService:
         Args:
         - notification (Notification): The notification object containing email details.
         """
-        user_email = notification.recipient.email
-        send_mail(
-            notification.title,
-            notification.content,
-            'no-reply@myapp.com',
-            [user_email],
-            fail_silently=False,
-        )
+        NotificationEmailSender.send_notifications([notification])
 
     @staticmethod
     def send_sms_notification(notification):
@@ -209,9 +290,11 @@ class NotificationService:
         - notification_id (int): ID of the notification to mark as read.
         """
         notification = Notification.objects.get(id=notification_id)
+        if notification.is_read:
+            return
         notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
+        notification.save(update_fields=['is_read', 'updated_at'])
+        decrement_unread_count(notification.recipient_id)
 
     @staticmethod
     def delete_notification(notification_id):
@@ -221,8 +304,120 @@ class NotificationService:
         Args:
         - notification_id (int): ID of the notification to delete.
         """
-        Notification.objects.filter(id=notification_id).delete()
+        notification = (
+            Notification.objects.filter(id=notification_id)
+            .values('recipient_id', 'is_read', 'timestamp')
+            .first()
+        )
+        deleted, _ = Notification.objects.filter(id=notification_id).delete()
+        if not deleted:
+            return
+        if not notification['is_read']:
+            decrement_unread_count(notification['recipient_id'])
+        schedule_rollup_refresh(
+            [notification['recipient_id']], [timezone.localtime(notification['timestamp']).date()]
+        )
         
+    @staticmethod
+    def bulk_mark_notifications_as_read(user, notification_ids=None, notification_type=None, before=None):
+        """
+        Mark a selection of a user's notifications as read in one statement.
+
+        Args:
+        - user (User): The recipient of the notifications.
+        - notification_ids (list, optional): Explicit notification IDs.
+        - notification_type (str, optional): Only notifications of this type.
+        - before (str, optional): Cursor; the notification at the cursor and all older ones.
+
+        Returns:
+        - dict: Number of notifications marked as read and the new unread count.
+        """
+        now = timezone.now()
+        selection = get_notifications_for_bulk_action(user.id, notification_ids, notification_type, before)
+        unread = selection.filter(is_read=False)
+
+        with transaction.atomic():
+            # Read statuses are written first, while the unread selection still matches.
+            NotificationReadStatus.objects.filter(
+                user=user, notification__in=unread
+            ).update(is_read=True, read_at=now)
+            missing_ids = unread.exclude(notificationreadstatus__user=user).values_list('id', flat=True)
+            NotificationReadStatus.objects.bulk_create(
+                [
+                    NotificationReadStatus(user=user, notification_id=notification_id, is_read=True, read_at=now)
+                    for notification_id in missing_ids.iterator()
+                ],
+                batch_size=BULK_ACTION_BATCH_SIZE,
+            )
+            updated = unread.update(is_read=True, updated_at=now)
+
+        if updated:
+            decrement_unread_count(user.id, updated)
+        result = {'updated': updated, 'unread_count': get_unread_count(user.id)}
+        NotificationService.send_bulk_update_event(user, 'read', result)
+        return result
+
+    @staticmethod
+    def bulk_delete_notifications(user, notification_ids=None, notification_type=None, before=None):
+        """
+        Delete a selection of a user's notifications.
+
+        At least one selector is required so that a malformed request cannot
+        wipe a user's whole feed.
+
+        Args:
+        - user (User): The recipient of the notifications.
+        - notification_ids (list, optional): Explicit notification IDs.
+        - notification_type (str, optional): Only notifications of this type.
+        - before (str, optional): Cursor; the notification at the cursor and all older ones.
+
+        Returns:
+        - dict: Number of notifications deleted and the new unread count.
+        """
+        if notification_ids is None and not notification_type and not before:
+            raise ValueError("Provide notification_ids, notification_type or before.")
+        selection = get_notifications_for_bulk_action(user.id, notification_ids, notification_type, before)
+
+        with transaction.atomic():
+            unread = selection.filter(is_read=False).count()
+            days = selection.annotate(day=TruncDate('timestamp')).values_list('day', flat=True).distinct()
+            schedule_rollup_refresh([user.id], list(days))
+            # Only the primary key is loaded for the cascade; content is never decrypted.
+            _, deleted_per_model = selection.only('id').delete()
+        deleted = deleted_per_model.get(Notification._meta.label, 0)
+
+        if unread:
+            decrement_unread_count(user.id, unread)
+        result = {'deleted': deleted, 'unread_count': get_unread_count(user.id)}
+        NotificationService.send_bulk_update_event(user, 'deleted', result)
+        return result
+
+    @staticmethod
+    def send_bulk_update_event(user, action, result):
+        """
+        Send a single websocket event summarising a bulk action to the user.
+
+        Args:
+        - user (User): The user whose notifications changed.
+        - action (str): 'read' or 'deleted'.
+        - result (dict): Counts returned by the bulk action.
+        """
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f"notifications_{user.username}",
+                {
+                    'type': 'notifications_bulk_update',
+                    'action': action,
+                    **result,
+                }
+            )
+        except Exception as e:
+            # The change is committed; clients resync from the unread count endpoint.
+            logger.warning(f"Failed to send bulk {action} event to user {user.id}: {e}")
+
     @staticmethod
     def get_notification(notification_id):
         """
@@ -259,19 +454,64 @@ class NotificationService:
             raise ValueError(serializer.errors)
 
     @staticmethod
-    def get_user_notifications(user_id):
+    def get_user_notifications(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE, read_status=None, include_content=True):
         """
-        Get all notifications for a specific user.
+        Get one page of notifications for a specific user.
 
         Args:
         - user_id (int): ID of the user to retrieve notifications for.
+        - cursor (str, optional): Cursor returned with the previous page.
+        - limit (int, optional): Number of notifications per page.
+        - read_status (bool, optional): Filter by read/unread status.
+        - include_content (bool, optional): Decrypt and include the content. When
+          False only metadata is returned; fetch content with get_notification_contents.
 
         Returns:
-        - QuerySet: A queryset of notifications for the user.
+        - dict: Serialized notifications of the page and the cursor of the next page.
+
+        Raises:
+        - ValueError: If the cursor is invalid.
         """
-        notifications = get_notifications_by_user(user_id)
-        serializer = NotificationSerializer(notifications, many=True)
-        return serializer.data
+        notifications, next_cursor = get_notifications_page(user_id, cursor, limit, read_status, include_content)
+        serializer_class = NotificationSerializer if include_content else NotificationMetadataSerializer
+        serializer = serializer_class(notifications, many=True)
+        return {'results': serializer.data, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def get_notification_contents(user_id, notification_ids):
+        """
+        Decrypt the content of selected notifications of a user.
+
+        Args:
+        - user_id (int): ID of the user.
+        - notification_ids (list): IDs of the notifications to decrypt.
+
+        Returns:
+        - dict: Content per notification ID.
+        """
+        contents = Notification.objects.filter(
+            recipient_id=user_id, id__in=notification_ids[:MAX_PAGE_SIZE]
+        ).values_list('id', 'content')
+        return {notification_id: content for notification_id, content in contents}
+
+    @staticmethod
+    def search_notifications(user_id, query, include_content=True):
+        """
+        Search a user's notifications by the words in their content.
+
+        Args:
+        - user_id (int): ID of the user.
+        - query (str): Words to search for; all must match.
+        - include_content (bool, optional): Decrypt and include the content of matches.
+
+        Returns:
+        - list: Serialized matching notifications, newest first, at most MAX_PAGE_SIZE.
+        """
+        notifications = search_notifications(user_id, query)
+        if not include_content:
+            notifications = notifications.defer(*ENCRYPTED_FIELDS)
+        serializer_class = NotificationSerializer if include_content else NotificationMetadataSerializer
+        return serializer_class(notifications[:MAX_PAGE_SIZE], many=True).data
 
     @staticmethod
     def generate_user_report(user_id):
@@ -347,7 +587,7 @@ class NotificationService:
         Returns:
         - dict: A dictionary containing the count of unread notifications.
         """
-        count = Notification.objects.filter(recipient=user, is_read=False).count()
+        count = get_unread_count(user.id)
         return {'unread_count': count}
         
     @staticmethod
@@ -403,12 +643,46 @@ class NotificationService:
         Returns:
         - dict: Serialized data of the notification template, or None if not found.
         """
-        try:
-            template = NotificationTemplate.objects.get(notification_type=notification_type)
-            serializer = NotificationTemplateSerializer(template)
-            return serializer.data
-        except NotificationTemplate.DoesNotExist:
+        notification_type_id = getattr(notification_type, 'id', notification_type)
+        metadata = get_template_metadata(notification_type_id)
+        if metadata is None:
             return None
+        return {
+            'id': metadata['id'],
+            'notification_type': notification_type_id,
+            'template': metadata['template'],
+        }
+
+    @staticmethod
+    def render_notification_template(notification_type, context):
+        """
+        Render the template of a notification type.
+
+        Args:
+        - notification_type (NotificationType or int): The notification type or its ID.
+        - context (dict): Values available to the template.
+
+        Returns:
+        - str: The rendered content.
+        """
+        return render_notification_template(notification_type, context)
+
+    @staticmethod
+    def render_notification_templates(notification_type, contexts):
+        """
+        Render the template of a notification type against many contexts at once.
+
+        Used by fan-out sends, where the template is compiled once and rendered
+        for every recipient.
+
+        Args:
+        - notification_type (NotificationType or int): The notification type or its ID.
+        - contexts (iterable): Context dicts, one per notification.
+
+        Returns:
+        - list: Rendered content in the order of ``contexts``.
+        """
+        return render_notification_templates(notification_type, contexts)
             
     @staticmethod
     def get_notification_types():
@@ -476,6 +750,16 @@ class NotificationService:
         """
         NotificationType.objects.filter(id=notification_type_id).delete()
 
+    @staticmethod
+    def create_default_notification_settings(user):
+        """
+        Create a new user's default notification rows with a single insert.
+
+        Args:
+        - user (User): The new user.
+        """
+        NotificationDefaultsService.create_defaults([user.id])
+
     @staticmethod
     def subscribe_to_notifications(user, notification_types):
         """
@@ -513,7 +797,8 @@ class NotificationService:
         return serialized_settings
         
     @staticmethod
-    def notify_followers(user_profile, notification_type, content_object=None, content='', url=''):
+    def notify_followers(user_profile, notification_type, content_object=None, content='', url='', run_async=False,
+                         requested_by=None):
         """
         Notifies followers of a user profile about an action.
     
@@ -523,31 +808,21 @@ class NotificationService:
         - content_object (Model): The content object related to the notification.
         - content (str): The notification content.
         - url (str): The URL related to the notification.
+        - run_async (bool): Queue the fan-out as a Celery task instead of running it inline.
+        - requested_by (int, optional): ID of the user allowed to look up the queued fan-out's status.
     
         Returns:
-        - list: A list of serialized Notification objects.
-        """
-        followers = user_profile.followers.all()
-        notifications = []
-        for follower in followers:
-            notification_data = {
-                'recipient': follower.id,
-                'notification_type': notification_type.id,
-                'content_object': content_object.id if content_object else None,
-                'content': content,
-                'url': url,
-                'is_read': False
-            }
-            serializer = NotificationSerializer(data=notification_data)
-            if serializer.is_valid():
-                notification = serializer.save()
-                notifications.append(serializer.data)
-            else:
-                raise ValueError(serializer.errors)
-        return notifications
+        - dict: The fan-out result (created count, batches), or the task ID when queued.
+        """
+        user_id = getattr(user_profile, 'user_id', user_profile)
+        return NotificationService._fan_out(
+            AUDIENCE_FOLLOWERS, notification_type, content_object, content, url, run_async, user_id=user_id,
+            requested_by=requested_by,
+        )
         
     @staticmethod
-    def notify_all_users(notification_type, content_object=None, content='', url=''):
+    def notify_all_users(notification_type, content_object=None, content='', url='', run_async=False,
+                         requested_by=None):
         """
         Notifies all users about an action.
     
@@ -556,28 +831,152 @@ class NotificationService:
         - content_object (Model): The content object related to the notification.
         - content (str): The notification content.
         - url (str): The URL related to the notification.
+        - run_async (bool): Queue the fan-out as a Celery task instead of running it inline.
+        - requested_by (int, optional): ID of the user allowed to look up the queued fan-out's status.
     
         Returns:
-        - list: A list of serialized Notification objects.
-        """
-        all_users = UserProfile.objects.all()
-        notifications = []
-        for user in all_users:
-            notification_data = {
-                'recipient': user.id,
-                'notification_type': notification_type.id,
-                'content_object': content_object.id if content_object else None,
-                'content': content,
-                'url': url,
-                'is_read': False
-            }
-            serializer = NotificationSerializer(data=notification_data)
-            if serializer.is_valid():
-                notification = serializer.save()
-                notifications.append(serializer.data)
-            else:
-                raise ValueError(serializer.errors)
-        return notifications
+        - dict: The fan-out result (created count, batches), or the task ID when queued.
+        """
+        return NotificationService._fan_out(
+            AUDIENCE_ALL_USERS, notification_type, content_object, content, url, run_async, requested_by=requested_by
+        )
+
+    @staticmethod
+    def notify_users(user_ids, notification_type, content_object=None, content='', url='', run_async=False,
+                     requested_by=None):
+        """
+        Notifies a given list of users about an action, with a single bulk fan-out.
+
+        Args:
+        - user_ids (list): IDs of the users to notify.
+        - notification_type (NotificationType): The type of notification to create.
+        - content_object (Model): The content object related to the notification.
+        - content (str): The notification content.
+        - url (str): The URL related to the notification.
+        - run_async (bool): Queue the fan-out as a Celery task instead of running it inline.
+        - requested_by (int, optional): ID of the user allowed to look up the queued fan-out's status.
+
+        Returns:
+        - dict: The fan-out result (created count, batches), or the task ID when queued.
+        """
+        return NotificationService._fan_out(
+            None, notification_type, content_object, content, url, run_async, recipient_ids=list(user_ids),
+            requested_by=requested_by,
+        )
+
+    @staticmethod
+    def notify_course_students(course_id, notification_type, content_object=None, content='', url='', run_async=False,
+                               requested_by=None):
+        """
+        Notifies the students enrolled in a course about an action.
+
+        Args:
+        - course_id (int): ID of the course.
+        - notification_type (NotificationType): The type of notification to create.
+        - content_object (Model): The content object related to the notification.
+        - content (str): The notification content.
+        - url (str): The URL related to the notification.
+        - run_async (bool): Queue the fan-out as a Celery task instead of running it inline.
+        - requested_by (int, optional): ID of the user allowed to look up the queued fan-out's status.
+
+        Returns:
+        - dict: The fan-out result (created count, batches), or the task ID when queued.
+        """
+        return NotificationService._fan_out(
+            AUDIENCE_COURSE_STUDENTS, notification_type, content_object, content, url, run_async, course_id=course_id,
+            requested_by=requested_by,
+        )
+
+    @staticmethod
+    def get_fan_out_status(task_id, user_id):
+        """
+        Get the progress of a fan-out queued with run_async, for the user who requested it.
+
+        Args:
+        - task_id (str): ID of the fan_out_notifications task.
+        - user_id (int): ID of the user asking.
+
+        Returns:
+        - dict: The task state ('PENDING', 'PROGRESS', 'SUCCESS' or 'FAILURE')
+          and the rows created and batches written so far, or None if the task
+          is unknown or was requested by someone else.
+        """
+        if user_id is None or cache.get(fan_out_owner_cache_key(task_id)) != user_id:
+            return None
+        result = fan_out_notifications.AsyncResult(task_id)
+        fan_out_status = {'task_id': task_id, 'state': result.state, 'created': 0, 'batches': 0}
+        if result.state == 'FAILURE':
+            # The exception text stays in the logs; it can hold internal details.
+            logger.warning(f"Fan-out {task_id} failed: {result.result}")
+        elif isinstance(result.info, dict):
+            fan_out_status['created'] = result.info.get('created', 0)
+            fan_out_status['batches'] = result.info.get('batches', 0)
+        return fan_out_status
+
+    @staticmethod
+    def resolve_fan_out_target(notification_type_id, content_type=None, object_id=None):
+        """
+        Validate the notification type and related object of a fan-out request.
+
+        Args:
+        - notification_type_id (int): ID of an existing notification type.
+        - content_type (str, optional): Model of the related object, as 'app_label.model'.
+        - object_id (int, optional): ID of the related object, required with content_type.
+
+        Returns:
+        - tuple: (NotificationType, the related object or None).
+
+        Raises:
+        - ValueError: If the type or the related object does not exist.
+        """
+        try:
+            notification_type = notification_types.get_by_id(int(notification_type_id))
+        except (TypeError, ValueError, NotificationType.DoesNotExist):
+            raise ValueError("A valid notification_type ID is required.")
+
+        if content_type is None and object_id is None:
+            return notification_type, None
+        try:
+            app_label, model = str(content_type).lower().split('.')
+            content_object = ContentType.objects.get_by_natural_key(app_label, model).get_object_for_this_type(
+                pk=int(object_id)
+            )
+        except (TypeError, ValueError, ObjectDoesNotExist):
+            raise ValueError("content_type ('app_label.model') and object_id must name an existing object.")
+        return notification_type, content_object
+
+    @staticmethod
+    def _fan_out(audience, notification_type, content_object, content, url, run_async, user_id=None,
+                 recipient_ids=None, course_id=None, requested_by=None):
+        """
+        Run a bulk fan-out inline or hand it to the fan_out_notifications task.
+        """
+        notification_type_id = getattr(notification_type, 'id', notification_type)
+        if run_async:
+            content_type_id = object_id = None
+            if content_object is not None:
+                content_type_id = ContentType.objects.get_for_model(content_object).id
+                object_id = content_object.pk
+            task = fan_out_notifications.delay(
+                audience,
+                notification_type_id,
+                content=content,
+                url=url,
+                user_id=user_id,
+                recipient_ids=recipient_ids,
+                content_type_id=content_type_id,
+                object_id=object_id,
+                course_id=course_id,
+            )
+            if requested_by is not None:
+                cache.set(fan_out_owner_cache_key(task.id), requested_by, timeout=FAN_OUT_OWNER_TIMEOUT)
+            return {'task_id': task.id}
+
+        if recipient_ids is None:
+            recipient_ids = NotificationFanoutService.resolve_audience(audience, user_id, course_id)
+        return NotificationFanoutService.fan_out(
+            recipient_ids, notification_type_id, content=content, url=url, content_object=content_object
+        )
         
     @staticmethod
     def get_user_preferences(user):
@@ -616,8 +1015,7 @@ class NotificationService:
     
     @staticmethod
     def is_user_snoozed(user):
-        snooze = NotificationSnooze.objects.filter(user=user, start_time__lte=timezone.now(), end_time__gte=timezone.now()).first()
-        return snooze is not None
+        return RecipientPolicyResolver.resolve_one(user.id).is_snoozed()
                 
     @staticmethod
     def get_snoozed_notifications(user):
@@ -661,15 +1059,26 @@ class NotificationService:
 
     @staticmethod
     def record_engagement(notification_id, user_id, action):
-        engagement, created = NotificationEngagement.objects.get_or_create(
-            notification_id=notification_id,
-            user_id=user_id
-        )
-        if action == 'view':
-            engagement.viewed_at = timezone.now()
-        elif action == 'click':
-            engagement.clicked_at = timezone.now()
-        engagement.save()
+        # Buffered and written in bulk by the flush_notification_engagements task.
+        return EngagementBuffer.add(user_id, [(notification_id, action)])
+
+    @staticmethod
+    def record_engagements(user_id, events):
+        """
+        Record a batch of view/click events of one user.
+
+        Args:
+        - user_id (int): ID of the user.
+        - events (list): Dicts with 'notification_id' and 'action' ('view' or 'click').
+
+        Returns:
+        - dict: Number of events accepted, collapsed as duplicates and dropped.
+        """
+        try:
+            pairs = [(event['notification_id'], event['action']) for event in events]
+        except (KeyError, TypeError):
+            raise ValueError("Each event needs a notification_id and an action.")
+        return EngagementBuffer.add(user_id, pairs)
         
     @staticmethod
     def log_notification_event(notification_id, event_type, event_details):
@@ -693,26 +1102,53 @@ class NotificationService:
         return log
         
     @staticmethod
-    def assign_user_to_test(user):
-        return 'variant_a' if random.choice([True, False]) else 'variant_b'
+    def assign_user_to_test(user, test_name):
+        """
+        Get the variant of a running A/B test a user is assigned to.
+
+        Args:
+        - user (User): The user.
+        - test_name (str): Name of the test.
+
+        Returns:
+        - str: The variant name, or None if the test is not running.
+        """
+        variant = NotificationABTestService.assign_variant(user.id, test_name)
+        return variant['variant'] if variant else None
 
     @staticmethod
     def analyze_ab_test_results(test_name):
-        # Implement analysis logic
-        pass
-            
+        """
+        Summarize an A/B test from its pre-aggregated outcome counters.
+
+        Args:
+        - test_name (str): Name of the test.
+
+        Returns:
+        - list: Per variant, sent/viewed/clicked counts and view and click rates.
+        """
+        return NotificationABTestService.get_results(test_name)
+
     @staticmethod
     def send_test_notification(data):
-        test_group = assign_user_to_test(data['recipient'])
-        template = get_template_for_test_group(test_group)
-        send_rich_notification({
-            'recipient': data['recipient'],
-            'content': template.content,
-            'html_content': template.html_content,
-            'media_url': template.media_url,
-            'delivery_method': data['delivery_method']
-        })
-        
+        """
+        Send a notification rendered from the recipient's A/B test variant template.
+
+        Args:
+        - data (dict): Notification data plus 'test_name' and an optional template 'context'.
+
+        Returns:
+        - Notification: The created Notification object.
+
+        Raises:
+        - ValueError: If the test is not running.
+        """
+        variant = NotificationABTestService.assign_variant(data['recipient'], data['test_name'])
+        if variant is None:
+            raise ValueError(f"A/B test {data['test_name']} is not running.")
+        content = render_template_by_id(variant['notification_template_id'], data.get('context', {}))
+        return NotificationService.send_notification({**data, 'content': content, 'ab_test': variant['id']})
+
     @staticmethod
     def send_test_multi_notification(data):
         user = UserProfile.objects.get(id=data['recipient'])
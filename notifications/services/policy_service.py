@@ -0,0 +1,155 @@
+# notifications/services/policy_service.py
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from notifications.models import NotificationSettings, NotificationSnooze, UserNotificationPreference
+
+POLICY_CACHE_TIMEOUT = getattr(settings, 'NOTIFICATION_POLICY_CACHE_TIMEOUT', 60 * 15)
+
+DEFAULT_FREQUENCY = 'instant'
+
+
+def policy_cache_key(user_id):
+    return f"notification_policy_{user_id}"
+
+
+class RecipientPolicy:
+    """
+    Everything the send path needs to know about a recipient: snooze windows,
+    disabled notification types, enabled channels and digest frequency.
+
+    Snooze windows are stored as timestamps and evaluated when asked, so a
+    cached policy stays correct as windows open and close.
+    """
+
+    def __init__(self, snoozes=(), disabled_types=(), channels=None, channel_preferences=None,
+                 frequency=DEFAULT_FREQUENCY):
+        self.snoozes = [tuple(window) for window in snoozes]
+        self.disabled_types = set(disabled_types)
+        self.channels = channels or {'email': True, 'sms': True, 'push': True}
+        self.channel_preferences = channel_preferences or {}
+        self.frequency = frequency
+
+    def is_snoozed(self, at=None):
+        at = (at or timezone.now()).timestamp()
+        return any(start <= at <= end for start, end in self.snoozes)
+
+    def allows(self, notification_type_id):
+        return notification_type_id not in self.disabled_types
+
+    def allows_channel(self, channel, notification_type_id=None):
+        # A per-type channel preference in NotificationSettings overrides the global one.
+        preference = self.channel_preferences.get(notification_type_id, {})
+        return preference.get(channel, self.channels.get(channel, True))
+
+    @property
+    def wants_digest(self):
+        return self.frequency != DEFAULT_FREQUENCY
+
+    def to_dict(self):
+        return {
+            'snoozes': self.snoozes,
+            'disabled_types': sorted(self.disabled_types),
+            'channels': self.channels,
+            'channel_preferences': self.channel_preferences,
+            'frequency': self.frequency,
+        }
+
+
+class RecipientPolicyResolver:
+    """
+    Resolves recipient policies for a batch of users with a few queries.
+
+    Resolved policies are cached per user and dropped by the signal receivers
+    in notifications/signals.py whenever a snooze, setting or preference changes.
+    """
+
+    @staticmethod
+    def resolve(user_ids):
+        """
+        Resolve the policies of many users.
+
+        Cached policies are read in one round trip; the rest are loaded with
+        one query each for snoozes, settings and preferences, then cached.
+
+        Args:
+        - user_ids (iterable): IDs of the users.
+
+        Returns:
+        - dict: RecipientPolicy per user ID.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        cached = cache.get_many([policy_cache_key(user_id) for user_id in user_ids])
+        policies = {}
+        missing = []
+        for user_id in user_ids:
+            data = cached.get(policy_cache_key(user_id))
+            if data is None:
+                missing.append(user_id)
+            else:
+                policies[user_id] = RecipientPolicy(**data)
+        if missing:
+            loaded = RecipientPolicyResolver.load(missing)
+            cache.set_many(
+                {policy_cache_key(user_id): policy.to_dict() for user_id, policy in loaded.items()},
+                timeout=POLICY_CACHE_TIMEOUT,
+            )
+            policies.update(loaded)
+        return policies
+
+    @staticmethod
+    def resolve_one(user_id):
+        """
+        Resolve the policy of a single user.
+        """
+        return RecipientPolicyResolver.resolve([user_id])[user_id]
+
+    @staticmethod
+    def load(user_ids):
+        """
+        Load the policies of many users from the database, bypassing the cache.
+
+        Args:
+        - user_ids (list): IDs of the users.
+
+        Returns:
+        - dict: RecipientPolicy per user ID.
+        """
+        data = {
+            user_id: {'snoozes': [], 'disabled_types': [], 'channel_preferences': {}}
+            for user_id in user_ids
+        }
+        snoozes = (
+            NotificationSnooze.objects.filter(user_id__in=user_ids, end_time__gte=timezone.now())
+            .values_list('user_id', 'start_time', 'end_time')
+        )
+        for user_id, start_time, end_time in snoozes:
+            data[user_id]['snoozes'].append((start_time.timestamp(), end_time.timestamp()))
+
+        notification_settings = (
+            NotificationSettings.objects.filter(user_id__in=user_ids)
+            .values_list('user_id', 'notification_type_id', 'is_enabled', 'channel_preferences')
+        )
+        for user_id, notification_type_id, is_enabled, channel_preferences in notification_settings:
+            if not is_enabled:
+                data[user_id]['disabled_types'].append(notification_type_id)
+            if channel_preferences:
+                data[user_id]['channel_preferences'][notification_type_id] = channel_preferences
+
+        preferences = (
+            UserNotificationPreference.objects.filter(user_id__in=user_ids)
+            .values_list('user_id', 'email_notifications', 'sms_notifications', 'push_notifications',
+                         'notification_frequency')
+        )
+        for user_id, email, sms, push, frequency in preferences:
+            data[user_id]['channels'] = {'email': email, 'sms': sms, 'push': push}
+            data[user_id]['frequency'] = frequency
+
+        return {user_id: RecipientPolicy(**values) for user_id, values in data.items()}
+
+    @staticmethod
+    def invalidate(user_id):
+        """
+        Drop a user's cached policy.
+        """
+        cache.delete(policy_cache_key(user_id))
@@ -1,7 +1,160 @@
+import atexit
+import logging
+import threading
+import time
 import redis
+from django.conf import settings
+from notifications.metrics import observe_pubsub_publish, observe_pubsub_publish_batch
+
+logger = logging.getLogger(__name__)
+
+PUBSUB_URL = getattr(settings, 'NOTIFICATION_PUBSUB_URL', 'redis://localhost:6379/0')
+PUBSUB_MAX_CONNECTIONS = getattr(settings, 'NOTIFICATION_PUBSUB_MAX_CONNECTIONS', 50)
+PUBSUB_BUFFERED = getattr(settings, 'NOTIFICATION_PUBSUB_BUFFERED', False)
+PUBSUB_BATCH_SIZE = getattr(settings, 'NOTIFICATION_PUBSUB_BATCH_SIZE', 100)
+PUBSUB_FLUSH_INTERVAL = getattr(settings, 'NOTIFICATION_PUBSUB_FLUSH_INTERVAL', 0.05)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """
+    Return the process-wide Redis connection pool used for pub/sub.
+
+    redis-py resets the pool's connections in a forked child, so the pool is
+    safe to create before Celery or Gunicorn fork their workers.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = redis.ConnectionPool.from_url(PUBSUB_URL, max_connections=PUBSUB_MAX_CONNECTIONS)
+    return _pool
+
+
+def get_redis_client():
+    """
+    Return a Redis client backed by the shared connection pool.
+    """
+    return redis.Redis(connection_pool=get_connection_pool())
+
+
+class BufferedPublisher:
+    """
+    Buffers published messages and sends them to Redis in pipelined batches.
+
+    A batch is flushed when it reaches ``max_batch_size`` messages or when the
+    oldest buffered message is ``flush_interval`` seconds old, whichever comes
+    first. A daemon thread takes care of the time-based flushes.
+    """
+
+    def __init__(self, max_batch_size=PUBSUB_BATCH_SIZE, flush_interval=PUBSUB_FLUSH_INTERVAL):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def publish(self, channel, message):
+        """
+        Add a message to the buffer, flushing if the batch is full.
+
+        Args:
+        - channel (str): The channel to publish to.
+        - message (str): The message to publish.
+        """
+        with self._lock:
+            self._buffer.append((channel, message))
+            full = len(self._buffer) >= self.max_batch_size
+            first = len(self._buffer) == 1
+        self._ensure_flusher()
+        if full:
+            self.flush()
+        elif first:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Send all buffered messages in a single pipeline.
+
+        Returns:
+        - int: Number of messages sent.
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        try:
+            PubSubService.publish_many(batch)
+        except redis.RedisError as e:
+            logger.error(f"Failed to publish {len(batch)} buffered messages: {e}")
+            return 0
+        return len(batch)
+
+    def _ensure_flusher(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='pubsub-flusher', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            # Sleep until a message arrives, then give the batch flush_interval to fill up.
+            self._wakeup.wait()
+            self._wakeup.clear()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+_buffered_publisher = None
+
+
+def get_buffered_publisher():
+    """
+    Return the process-wide buffered publisher.
+    """
+    global _buffered_publisher
+    if _buffered_publisher is None:
+        with _pool_lock:
+            if _buffered_publisher is None:
+                _buffered_publisher = BufferedPublisher()
+                atexit.register(_buffered_publisher.flush)
+    return _buffered_publisher
+
 
 class PubSubService:
     @staticmethod
-    def publish_notification(channel, message):
-        r = redis.Redis()
-        r.publish(channel, message)
\ No newline at end of file
+    def publish_notification(channel, message, buffered=None):
+        """
+        Publish a message to a Redis channel.
+
+        Args:
+        - channel (str): The channel to publish to.
+        - message (str): The message to publish.
+        - buffered (bool, optional): Batch the message through the buffered
+          publisher. Defaults to the NOTIFICATION_PUBSUB_BUFFERED setting.
+        """
+        if PUBSUB_BUFFERED if buffered is None else buffered:
+            get_buffered_publisher().publish(channel, message)
+            return
+        started = time.monotonic()
+        get_redis_client().publish(channel, message)
+        observe_pubsub_publish(time.monotonic() - started)
+
+    @staticmethod
+    def publish_many(messages):
+        """
+        Publish many messages in a single pipeline round trip.
+
+        Args:
+        - messages (list): (channel, message) tuples.
+        """
+        started = time.monotonic()
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for channel, message in messages:
+            pipeline.publish(channel, message)
+        pipeline.execute()
+        observe_pubsub_publish_batch(len(messages), time.monotonic() - started)
@@ -0,0 +1,176 @@
+# notifications/services/realtime_service.py
+import asyncio
+import logging
+from collections import defaultdict
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from notifications.metrics import increment_websocket_pushes
+
+logger = logging.getLogger(__name__)
+
+WEBSOCKET_PUSH = getattr(settings, 'NOTIFICATION_WEBSOCKET_PUSH', True)
+PRESENCE_TIMEOUT = getattr(settings, 'NOTIFICATION_PRESENCE_TIMEOUT', 60 * 60 * 24)
+
+
+def group_name(username):
+    return f"notifications_{username}"
+
+
+def presence_key(user_id):
+    return f"notification_ws_connections_{user_id}"
+
+
+def mark_online(user_id):
+    """
+    Count a new websocket connection of a user.
+    """
+    key = presence_key(user_id)
+    cache.add(key, 0, timeout=PRESENCE_TIMEOUT)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=PRESENCE_TIMEOUT)
+
+
+def mark_offline(user_id):
+    """
+    Count a closed websocket connection of a user.
+    """
+    key = presence_key(user_id)
+    try:
+        if cache.decr(key) <= 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+
+
+def build_payload(notification, type_name=None):
+    """
+    Build the websocket payload of a notification.
+
+    Args:
+    - notification (Notification): The notification.
+    - type_name (str, optional): Its type name, when known, to avoid loading the type.
+
+    Returns:
+    - dict: The payload sent to the client.
+    """
+    return {
+        'id': notification.id,
+        'type': type_name or notification.notification_type.type_name,
+        'content': notification.content,
+        'url': notification.url,
+        'timestamp': str(notification.timestamp),
+    }
+
+
+async def group_send_many(channel_layer, payloads_by_group):
+    """
+    Send one event per group carrying all of the group's payloads, concurrently.
+
+    Args:
+    - channel_layer: The channel layer.
+    - payloads_by_group (dict): List of payloads per group name.
+
+    Returns:
+    - int: Number of groups the send failed for.
+    """
+    results = await asyncio.gather(
+        *(
+            channel_layer.group_send(name, {'type': 'notifications_batch', 'notifications': payloads})
+            for name, payloads in payloads_by_group.items()
+        ),
+        return_exceptions=True,
+    )
+    failed = [result for result in results if isinstance(result, Exception)]
+    for error in failed[:1]:
+        logger.warning(f"Failed to push notifications to {len(failed)} groups: {error}")
+    return len(failed)
+
+
+class NotificationPushService:
+    """
+    Pushes new notifications to their recipients' websocket groups.
+
+    All notifications of a call are grouped per recipient and sent as one
+    event per connected user, with every group_send awaited concurrently in a
+    single event loop entry. Recipients without an open connection are
+    skipped: their notifications are stored and fetched with the feed.
+    """
+
+    @staticmethod
+    def get_online_groups(user_ids):
+        """
+        Map the connected users among ``user_ids`` to their group names.
+
+        Args:
+        - user_ids (iterable): IDs of the users.
+
+        Returns:
+        - dict: Group name per connected user ID.
+        """
+        user_ids = set(user_ids)
+        online = cache.get_many([presence_key(user_id) for user_id in user_ids])
+        online_ids = [user_id for user_id in user_ids if online.get(presence_key(user_id))]
+        if not online_ids:
+            return {}
+        usernames = get_user_model().objects.filter(id__in=online_ids).values_list('id', 'username')
+        return {user_id: group_name(username) for user_id, username in usernames}
+
+    @staticmethod
+    def push(payloads):
+        """
+        Push payloads to the websocket groups of their recipients.
+
+        Args:
+        - payloads (iterable): (recipient ID, payload) pairs.
+
+        Returns:
+        - dict: Number of payloads pushed and left stored-only for offline users.
+        """
+        by_user = defaultdict(list)
+        for recipient_id, payload in payloads:
+            by_user[recipient_id].append(payload)
+        result = {'pushed': 0, 'offline': 0}
+        if not by_user:
+            return result
+
+        channel_layer = get_channel_layer()
+        groups = NotificationPushService.get_online_groups(by_user) if channel_layer else {}
+        by_group = {}
+        for user_id, user_payloads in by_user.items():
+            if user_id in groups:
+                by_group[groups[user_id]] = user_payloads
+                result['pushed'] += len(user_payloads)
+            else:
+                result['offline'] += len(user_payloads)
+
+        if by_group:
+            failed = async_to_sync(group_send_many)(channel_layer, by_group)
+            if failed:
+                increment_websocket_pushes('failed', failed)
+        increment_websocket_pushes('pushed', result['pushed'])
+        increment_websocket_pushes('offline', result['offline'])
+        return result
+
+    @staticmethod
+    def push_on_commit(notifications, type_name=None):
+        """
+        Push notifications once the transaction that created them has committed.
+
+        Args:
+        - notifications (iterable): Saved notifications.
+        - type_name (str, optional): Their shared type name, to avoid loading each type.
+        """
+        if not WEBSOCKET_PUSH:
+            return
+        payloads = [
+            (notification.recipient_id, build_payload(notification, type_name))
+            for notification in notifications
+        ]
+        if payloads:
+            transaction.on_commit(lambda: NotificationPushService.push(payloads))
@@ -0,0 +1,148 @@
+# notifications/services/retention_service.py
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import (
+    Notification, NotificationLog, NotificationEngagement, NotificationReadStatus, NotificationSearchToken,
+)
+from notifications.reports.rollups import schedule_rollup_refresh
+from notifications.utils.unread_counter import invalidate_unread_counts
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 365)
+RETENTION_BATCH_SIZE = getattr(settings, 'NOTIFICATION_RETENTION_BATCH_SIZE', 1000)
+RETENTION_BATCH_SLEEP = getattr(settings, 'NOTIFICATION_RETENTION_BATCH_SLEEP', 0.1)
+ARCHIVE_DIR = getattr(settings, 'NOTIFICATION_ARCHIVE_DIR', None)
+
+# Child rows archived with their notification, by key in the archived record.
+ARCHIVED_CHILDREN = {
+    'logs': NotificationLog,
+    'engagements': NotificationEngagement,
+    'read_statuses': NotificationReadStatus,
+}
+
+
+class NotificationRetentionService:
+    """
+    Deletes, and optionally archives, notifications past the retention period.
+
+    Expired rows are taken oldest first through the (timestamp, id) index in
+    small batches, each deleted in its own short transaction together with its
+    child rows, with a pause between batches so the job never holds long locks
+    or saturates the database.
+    """
+
+    @staticmethod
+    def purge(older_than_days=None, batch_size=None, sleep=None, archive_dir=None, max_batches=None):
+        """
+        Delete notifications older than the retention period.
+
+        Args:
+        - older_than_days (int, optional): Retention period; defaults to NOTIFICATION_RETENTION_DAYS.
+        - batch_size (int, optional): Notifications per batch.
+        - sleep (float, optional): Seconds to pause between batches.
+        - archive_dir (str, optional): Directory for a gzip-compressed JSONL archive of
+          the deleted rows. Archived content is decrypted, so the directory must be
+          protected like the database itself.
+        - max_batches (int, optional): Stop after this many batches.
+
+        Returns:
+        - dict: Number of notifications deleted, batches run and the archive path.
+        """
+        older_than_days = older_than_days or RETENTION_DAYS
+        batch_size = batch_size or RETENTION_BATCH_SIZE
+        sleep = RETENTION_BATCH_SLEEP if sleep is None else sleep
+        archive_dir = archive_dir or ARCHIVE_DIR
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+
+        archive_path = None
+        archive = None
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+            archive_path = os.path.join(
+                archive_dir, f"notifications-before-{cutoff:%Y%m%d}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz"
+            )
+            archive = gzip.open(archive_path, 'wt', encoding='utf-8')
+
+        deleted = batches = 0
+        user_ids = set()
+        days = set()
+        try:
+            while max_batches is None or batches < max_batches:
+                batch = list(
+                    Notification.objects.filter(timestamp__lt=cutoff)
+                    .order_by('timestamp', 'id')
+                    .values_list('id', 'recipient_id', 'timestamp')[:batch_size]
+                )
+                if not batch:
+                    break
+                notification_ids = [notification_id for notification_id, _, _ in batch]
+                if archive:
+                    NotificationRetentionService.archive_batch(notification_ids, archive)
+                deleted += NotificationRetentionService.delete_batch(notification_ids)
+                invalidate_unread_counts({recipient_id for _, recipient_id, _ in batch})
+                user_ids.update(recipient_id for _, recipient_id, _ in batch)
+                days.update(timezone.localtime(timestamp).date() for _, _, timestamp in batch)
+                batches += 1
+                if sleep:
+                    time.sleep(sleep)
+        finally:
+            if archive:
+                archive.close()
+            # One refresh for the whole run rather than one per batch.
+            schedule_rollup_refresh(user_ids, days)
+
+        logger.info(f"Retention removed {deleted} notifications older than {cutoff} in {batches} batches")
+        return {'deleted': deleted, 'batches': batches, 'archive': archive_path}
+
+    @staticmethod
+    def delete_batch(notification_ids):
+        """
+        Delete notifications and all their child rows in one transaction.
+
+        Every child table is cleared with a single DELETE; the notifications are
+        then deleted loading only their primary keys, so nothing is decrypted.
+
+        Args:
+        - notification_ids (list): IDs of the notifications to delete.
+
+        Returns:
+        - int: Number of notifications deleted.
+        """
+        with transaction.atomic():
+            for model in (*ARCHIVED_CHILDREN.values(), NotificationSearchToken):
+                model.objects.filter(notification_id__in=notification_ids).delete()
+            Notification.shares.through.objects.filter(notification_id__in=notification_ids).delete()
+            _, deleted = Notification.objects.filter(id__in=notification_ids).only('id').delete()
+        return deleted.get(Notification._meta.label, 0)
+
+    @staticmethod
+    def archive_batch(notification_ids, archive):
+        """
+        Write one JSON line per notification, with its child rows, to an open archive.
+
+        Args:
+        - notification_ids (list): IDs of the notifications to archive.
+        - archive (file): A text file opened for writing.
+        """
+        records = {
+            row['id']: row
+            for row in Notification.objects.filter(id__in=notification_ids).values()
+        }
+        for record in records.values():
+            for key in ARCHIVED_CHILDREN:
+                record[key] = []
+        for key, model in ARCHIVED_CHILDREN.items():
+            for row in model.objects.filter(notification_id__in=notification_ids).values():
+                records[row['notification_id']][key].append(row)
+        for notification_id in notification_ids:
+            if notification_id in records:
+                archive.write(json.dumps(records[notification_id], cls=DjangoJSONEncoder) + '\n')
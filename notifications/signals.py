@@ -1,19 +1,68 @@
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import Notification
+from celery.signals import worker_process_init
+from .models import (
+    Notification, NotificationTemplate, NotificationSettings, NotificationSnooze, UserNotificationPreference,
+    NotificationABTest, NotificationType,
+)
 from profiles.models import UserProfile
-from django.contrib.auth import get_user_model
-from .services import NotificationService
+from .utils.unread_counter import increment_unread_count
+from .utils.template_cache import invalidate_notification_template
+from .utils.search_index import index_notification
+from .services.policy_service import RecipientPolicyResolver
+from .services.ab_test_service import NotificationABTestService
+from .utils.type_registry import notification_types
 
-User = get_user_model()
 
+@receiver(post_save, sender=Notification)
+def update_unread_count(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        increment_unread_count(instance.recipient_id)
 
 @receiver(post_save, sender=Notification)
-def send_notification(sender, instance, created, **kwargs):
-    if created:
-        NotificationService.send_notification(instance)
-
-@receiver(post_save, sender=User)
-def create_default_notification_settings(sender, instance, created, **kwargs):
-    if created:
-        NotificationService.create_default_notification_settings(instance)
\ No newline at end of file
+def update_search_index(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or 'content' in update_fields:
+        index_notification(instance)
+
+@receiver(pre_save, sender=NotificationTemplate)
+def bump_notification_template_version(sender, instance, **kwargs):
+    if instance.pk:
+        instance.version = F('version') + 1
+
+@receiver(post_save, sender=NotificationTemplate)
+def refresh_notification_template_version(sender, instance, **kwargs):
+    if not isinstance(instance.version, int):
+        instance.refresh_from_db(fields=['version'])
+    invalidate_notification_template(instance.notification_type_id)
+
+@receiver(post_delete, sender=NotificationTemplate)
+def invalidate_notification_template_cache(sender, instance, **kwargs):
+    invalidate_notification_template(instance.notification_type_id)
+
+@receiver(post_save, sender=NotificationSnooze)
+@receiver(post_delete, sender=NotificationSnooze)
+@receiver(post_save, sender=NotificationSettings)
+@receiver(post_delete, sender=NotificationSettings)
+@receiver(post_save, sender=UserNotificationPreference)
+@receiver(post_delete, sender=UserNotificationPreference)
+def invalidate_recipient_policy(sender, instance, **kwargs):
+    RecipientPolicyResolver.invalidate(instance.user_id)
+
+@receiver(post_save, sender=NotificationABTest)
+@receiver(post_delete, sender=NotificationABTest)
+def invalidate_active_ab_tests(sender, instance, **kwargs):
+    NotificationABTestService.invalidate()
+
+@receiver(post_save, sender=NotificationType)
+@receiver(post_delete, sender=NotificationType)
+def invalidate_notification_types(sender, instance, created=False, **kwargs):
+    # A new type is found by each process on its first miss (registry inserts
+    # are remembered locally), so only changes and deletes reload every process.
+    if not created:
+        notification_types.invalidate()
+
+@worker_process_init.connect
+def warm_notification_types(**kwargs):
+    # Load the types before the first task instead of during it.
+    notification_types.warm()
\ No newline at end of file
@@ -1,29 +1,212 @@
 # notifications/tasks.py
-from django.core.mail import send_mail
+import logging
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils import timezone
 from .models import Notification
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from celery import shared_task
-from .services.notification_service import send_notification
+from celery import shared_task, chord
+from .services.fanout_service import NotificationFanoutService
+from .utils.unread_counter import reconcile_unread_counts
+from .metrics import increment_bulk_notification_chunks, record_bulk_notification_run
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = getattr(settings, 'NOTIFICATION_BULK_CHUNK_SIZE', 500)
+BULK_CHECKPOINT_TIMEOUT = 60 * 60 * 24
 
 def send_email_notification(notification_id):
-    notification = Notification.objects.get(id=notification_id)
-    send_mail(
-        subject='New Notification',
-        message=notification.content,
-        from_email='noreply@example.com',
-        recipient_list=[notification.recipient.email],
-    )
+    from .services.email_service import NotificationEmailSender
+
+    NotificationEmailSender.send([notification_id])
+
+
+@shared_task
+def send_email_notifications(notification_ids, batch_size=None):
+    """
+    Email many notifications over a single SMTP connection.
+    """
+    from .services.email_service import NotificationEmailSender
+
+    return NotificationEmailSender.send(notification_ids, batch_size)
+
+
+def _chunk_checkpoint_key(pipeline_id, index):
+    return f"bulk_notifications_{pipeline_id}_chunk_{index}"
+
+
+def _chunk_progress_key(pipeline_id, index):
+    return f"bulk_notifications_{pipeline_id}_chunk_{index}_progress"
 
 
 @shared_task
-def send_bulk_notifications(notification_data_list):
-    for data in notification_data_list:
+def send_bulk_notifications(notification_data_list, chunk_size=None, pipeline_id=None):
+    """
+    Split a bulk send into fixed-size chunks and dispatch them as a chord.
+
+    Each chunk runs as its own task so the work spreads across workers.
+    Completed chunks are checkpointed in the cache under the pipeline ID, so
+    dispatching the same pipeline again only sends what has not been sent yet.
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    pipeline_id = pipeline_id or uuid.uuid4().hex
+    chunks = [
+        notification_data_list[start:start + chunk_size]
+        for start in range(0, len(notification_data_list), chunk_size)
+    ]
+    if not chunks:
+        return {'pipeline_id': pipeline_id, 'chunks': 0}
+
+    header = [send_notification_chunk.s(pipeline_id, index, chunk) for index, chunk in enumerate(chunks)]
+    chord(header)(finalize_bulk_notifications.s(pipeline_id, time.time()))
+    return {'pipeline_id': pipeline_id, 'chunks': len(chunks)}
+
+
+@shared_task(bind=True, acks_late=True, autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=5)
+def send_notification_chunk(self, pipeline_id, index, notification_data_list):
+    """
+    Send one chunk of a bulk notification pipeline.
+
+    The position inside the chunk is checkpointed after every item, together
+    with the sent and failed counts so far, so a retry or a redelivery after a
+    worker crash resumes at the first unsent item and still reports the whole
+    chunk.
+    """
+    from .services.notification_service import NotificationService
+
+    checkpoint_key = _chunk_checkpoint_key(pipeline_id, index)
+    completed = cache.get(checkpoint_key)
+    if completed is not None:
+        return completed
+
+    progress_key = _chunk_progress_key(pipeline_id, index)
+    progress = cache.get(progress_key) or {'offset': 0, 'sent': 0, 'failed': 0}
+    for position in range(progress['offset'], len(notification_data_list)):
         try:
-            send_notification(data)
+            NotificationService.send_notification(notification_data_list[position])
+            progress['sent'] += 1
+        except DatabaseError:
+            # Leave the checkpoint where it is; the retry resumes at this item.
+            raise
         except Exception as e:
+            progress['failed'] += 1
             logger.error(f"Failed to send bulk notification: {e}")
+        progress['offset'] = position + 1
+        cache.set(progress_key, progress, timeout=BULK_CHECKPOINT_TIMEOUT)
+
+    result = {'sent': progress['sent'], 'failed': progress['failed']}
+    cache.set(checkpoint_key, result, timeout=BULK_CHECKPOINT_TIMEOUT)
+    cache.delete(progress_key)
+    increment_bulk_notification_chunks()
+    return result
+
+
+@shared_task
+def finalize_bulk_notifications(chunk_results, pipeline_id, started_at):
+    """
+    Aggregate chunk results of a bulk notification pipeline and report throughput.
+    """
+    sent = sum(result['sent'] for result in chunk_results)
+    failed = sum(result['failed'] for result in chunk_results)
+    elapsed = time.time() - started_at
+    record_bulk_notification_run(sent, elapsed)
+    cache.delete_many([_chunk_checkpoint_key(pipeline_id, index) for index in range(len(chunk_results))])
+    logger.info(f"Bulk notification pipeline {pipeline_id}: {sent} sent, {failed} failed in {elapsed:.2f}s")
+    return {'pipeline_id': pipeline_id, 'sent': sent, 'failed': failed, 'elapsed': elapsed}
+
+
+@shared_task(bind=True)
+def fan_out_notifications(self, audience, notification_type_id, content='', url='', user_id=None,
+                          recipient_ids=None, content_type_id=None, object_id=None, batch_size=None,
+                          course_id=None):
+    """
+    Fan a notification out to an audience in the background, reporting
+    progress through the task state.
+    """
+    if recipient_ids is None:
+        recipient_ids = NotificationFanoutService.resolve_audience(audience, user_id, course_id)
 
+    def report_progress(created, batches):
+        self.update_state(state='PROGRESS', meta={'created': created, 'batches': batches})
+
+    return NotificationFanoutService.fan_out(
+        recipient_ids,
+        notification_type_id,
+        content=content,
+        url=url,
+        content_type_id=content_type_id,
+        object_id=object_id,
+        batch_size=batch_size,
+        progress_callback=report_progress,
+    )
+
+
+@shared_task
+def reconcile_unread_notification_counts(minutes=10):
+    """
+    Periodically resync the cached unread counts of recently notified users
+    with the database.
+    """
+    since = timezone.now() - timedelta(minutes=minutes)
+    user_ids = (
+        Notification.objects.filter(updated_at__gte=since)
+        .values_list('recipient_id', flat=True)
+        .distinct()
+    )
+    return reconcile_unread_counts(user_ids)
+
+
+
+@shared_task
+def send_notification_digests(frequency):
+    """
+    Email the daily or weekly notification digests.
+    """
+    from .services.digest_service import NotificationDigestService
+
+    return NotificationDigestService.send_digests(frequency)
+
+
+
+@shared_task
+def purge_old_notifications(older_than_days=None):
+    """
+    Delete (and archive, when NOTIFICATION_ARCHIVE_DIR is set) expired notifications.
+    """
+    from .services.retention_service import NotificationRetentionService
+
+    return NotificationRetentionService.purge(older_than_days=older_than_days)
+
+
+@shared_task
+def flush_notification_engagements():
+    """
+    Write the buffered view/click events to NotificationEngagement.
+    """
+    from .services.engagement_service import EngagementBuffer
+
+    return EngagementBuffer.flush()
+
+
+@shared_task
+def refresh_notification_rollups(user_ids=None, days=None):
+    """
+    Recompute the report rollups of the given users and days (ISO dates), or
+    of everything changed since the last run when neither is given.
+    """
+    from .reports.rollups import refresh_daily_rollups, refresh_recent_rollups, refresh_user_rollups
+
+    if user_ids is None and days is None:
+        return refresh_recent_rollups()
+    return {
+        'days': refresh_daily_rollups(days or []),
+        'users': refresh_user_rollups(user_ids or []),
+    }
 
 def send_push_notification(notification_id):
     notification = Notification.objects.get(id=notification_id)
@@ -41,4 +224,4 @@ def send_sms_notification(user, content):
 
 def send_in_app_notification(user, content):
     # Implement WebSocket or SSE for in-app notifications
-    pass
\ No newline at end of file
+    pass
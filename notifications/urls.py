@@ -7,7 +7,12 @@ urlpatterns = [
     path('notifications/<int:notification_id>/update/', views.update_notification, name='update_notification'),
     path('notifications/<int:notification_id>/delete/', views.delete_notification, name='delete_notification'),
     path('notifications/user/', views.get_user_notifications, name='get_user_notifications'),
+    path('notifications/user/contents/', views.get_notification_contents, name='get_notification_contents'),
+    path('notifications/search/', views.search_notifications, name='search_notifications'),
     path('notifications/<int:notification_id>/read/', views.mark_notification_as_read, name='mark_notification_as_read'),
+    path('notifications/bulk/read/', views.bulk_mark_notifications_as_read, name='bulk_mark_notifications_as_read'),
+    path('notifications/bulk/delete/', views.bulk_delete_notifications, name='bulk_delete_notifications'),
+    path('notifications/engagements/', views.record_engagements, name='record_engagements'),
     path('notifications/settings/', views.get_notification_settings, name='get_notification_settings'),
     path('notifications/settings/update/', views.update_notification_settings, name='update_notification_settings'),
     path('notifications/reports/user/<int:user_id>/', views.generate_user_report, name='generate_user_report'),
@@ -20,4 +25,5 @@ urlpatterns = [
     path('notifications/unsubscribe/', views.unsubscribe_from_notifications, name='unsubscribe_from_notifications'),
     path('notifications/notify-followers/', views.notify_followers, name='notify_followers'),
     path('notifications/notify-all/', views.notify_all_users, name='notify_all_users'),
+    path('notifications/fan-outs/<str:task_id>/', views.get_fan_out_status, name='get_fan_out_status'),
 ]
\ No newline at end of file
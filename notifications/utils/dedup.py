@@ -0,0 +1,84 @@
+import hashlib
+import redis
+from django.conf import settings
+from django.utils import timezone
+from notifications.services.pubsub_service import get_redis_client
+
+DEDUP_WINDOW = getattr(settings, 'NOTIFICATION_DEDUP_WINDOW', 60 * 5)
+
+_claim_prefix = 'notification_dedup_'
+
+
+def build_dedup_key(recipient_id, notification_type_id, content_type_id=None, object_id=None, window=None, at=None):
+    """
+    Idempotency key of a notification: recipient, type, source object and time window.
+
+    Events for the same (recipient, type, source) within one window share a
+    key, so only the first of them creates a row. Windows are fixed buckets of
+    ``window`` seconds.
+
+    Args:
+    - recipient_id (int): ID of the recipient.
+    - notification_type_id (int): ID of the notification type.
+    - content_type_id (int, optional): Content type of the source object.
+    - object_id (int, optional): ID of the source object.
+    - window (int, optional): Window length in seconds; defaults to NOTIFICATION_DEDUP_WINDOW.
+    - at (datetime, optional): Time of the event; defaults to now.
+
+    Returns:
+    - str: A 64 character hex key.
+    """
+    window = window or DEDUP_WINDOW
+    bucket = int((at or timezone.now()).timestamp() // window)
+    raw = f"{recipient_id}:{notification_type_id}:{content_type_id}:{object_id}:{window}:{bucket}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def unseen_dedup_keys(keys):
+    """
+    Filter out idempotency keys already recorded in the short-term Redis set, in one round trip.
+
+    This is only a fast pre-check that drops most repeats without touching
+    the database: the unique index on Notification.dedup_key is what enforces
+    idempotency. If Redis is unavailable every key is reported unseen.
+
+    Args:
+    - keys (list): Keys from build_dedup_key.
+
+    Returns:
+    - set: The keys not recorded yet.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return set()
+    try:
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for key in keys:
+            pipeline.exists(f"{_claim_prefix}{key}")
+        seen = pipeline.execute()
+    except redis.RedisError:
+        return set(keys)
+    return {key for key, is_seen in zip(keys, seen) if not is_seen}
+
+
+def record_dedup_keys(keys, window=None):
+    """
+    Record the keys of committed notifications in the short-term Redis set.
+
+    Call this once the rows are committed (e.g. from transaction.on_commit):
+    a key recorded for a row that was then rolled back would drop a
+    legitimate retry until it expires.
+
+    Args:
+    - keys (list): Keys from build_dedup_key.
+    - window (int, optional): Seconds a key is remembered.
+    """
+    if not keys:
+        return
+    try:
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for key in keys:
+            pipeline.set(f"{_claim_prefix}{key}", 1, ex=window or DEDUP_WINDOW)
+        pipeline.execute()
+    except redis.RedisError:
+        pass
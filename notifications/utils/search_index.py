@@ -0,0 +1,69 @@
+import hashlib
+import hmac
+import re
+from django.conf import settings
+from notifications.models import NotificationSearchToken
+
+SEARCH_INDEX_KEY = getattr(settings, 'NOTIFICATION_SEARCH_INDEX_KEY', settings.SECRET_KEY)
+SEARCH_TOKEN_MIN_LENGTH = 2
+SEARCH_INDEX_BATCH_SIZE = 5000
+
+_word_re = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Split text into the distinct lowercase words that are indexed.
+
+    Args:
+    - text (str): Plain text.
+
+    Returns:
+    - set: Words of at least SEARCH_TOKEN_MIN_LENGTH characters.
+    """
+    return {word for word in _word_re.findall((text or '').lower()) if len(word) >= SEARCH_TOKEN_MIN_LENGTH}
+
+
+def blind_token(word):
+    """
+    Keyed hash of a word. The index stores only these, never the words themselves.
+    """
+    digest = hmac.new(SEARCH_INDEX_KEY.encode(), word.encode(), hashlib.sha256).hexdigest()
+    return digest[:32]
+
+
+def blind_tokens(text):
+    return {blind_token(word) for word in tokenize(text)}
+
+
+def build_search_tokens(notification_ids_and_recipients, text):
+    """
+    Build unsaved index rows for notifications that share the same content.
+
+    Args:
+    - notification_ids_and_recipients (iterable): (notification ID, recipient ID) pairs.
+    - text (str): The shared plain-text content.
+
+    Returns:
+    - list: Unsaved NotificationSearchToken rows.
+    """
+    tokens = blind_tokens(text)
+    return [
+        NotificationSearchToken(notification_id=notification_id, recipient_id=recipient_id, token=token)
+        for notification_id, recipient_id in notification_ids_and_recipients
+        for token in tokens
+    ]
+
+
+def index_notification(notification):
+    """
+    (Re)build the search index rows of one notification.
+
+    Args:
+    - notification (Notification): A saved notification with its content loaded.
+    """
+    NotificationSearchToken.objects.filter(notification_id=notification.id).delete()
+    NotificationSearchToken.objects.bulk_create(
+        build_search_tokens([(notification.id, notification.recipient_id)], notification.content),
+        batch_size=SEARCH_INDEX_BATCH_SIZE,
+    )
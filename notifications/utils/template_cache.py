@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.template import Context, Engine
+from notifications.models import NotificationTemplate
+
+TEMPLATE_CACHE_SIZE = getattr(settings, 'NOTIFICATION_TEMPLATE_CACHE_SIZE', 256)
+TEMPLATE_CACHE_TIMEOUT = getattr(settings, 'NOTIFICATION_TEMPLATE_CACHE_TIMEOUT', 60 * 60)
+
+# Notification templates are plain strings stored in the database, so they are
+# compiled with a standalone engine that does not touch the filesystem loaders.
+_engine = Engine()
+
+
+def template_cache_key(notification_type_id):
+    return f"notification_template_{notification_type_id}"
+
+
+class CompiledTemplateCache:
+    """
+    In-process LRU of compiled templates keyed by (template id, version).
+
+    A new version of a template gets a new key, so stale entries are never
+    served; they simply fall out of the LRU.
+    """
+
+    def __init__(self, max_size=TEMPLATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_id, version, source):
+        key = (template_id, version)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                return template
+        template = _engine.from_string(source)
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+compiled_templates = CompiledTemplateCache()
+
+
+def get_template_metadata(notification_type_id):
+    """
+    Get the id, version and source of a notification type's template.
+
+    The metadata lives in the shared cache so that every process sees a new
+    version as soon as invalidate_notification_template has run.
+
+    Args:
+    - notification_type_id (int): ID of the notification type.
+
+    Returns:
+    - dict: The template's id, version and source, or None if the type has no template.
+    """
+    key = template_cache_key(notification_type_id)
+    metadata = cache.get(key)
+    if metadata is None:
+        metadata = (
+            NotificationTemplate.objects.filter(notification_type_id=notification_type_id)
+            .values('id', 'version', 'template')
+            .first()
+        )
+        if metadata is None:
+            return None
+        cache.set(key, metadata, timeout=TEMPLATE_CACHE_TIMEOUT)
+    return metadata
+
+
+def get_compiled_template(notification_type):
+    """
+    Get the compiled template of a notification type.
+
+    Args:
+    - notification_type (NotificationType or int): The notification type or its ID.
+
+    Returns:
+    - Template: The compiled template, or None if the type has no template.
+    """
+    metadata = get_template_metadata(getattr(notification_type, 'id', notification_type))
+    if metadata is None:
+        return None
+    return compiled_templates.get(metadata['id'], metadata['version'], metadata['template'])
+
+
+def render_notification_templates(notification_type, contexts):
+    """
+    Render a notification type's template once per context dict.
+
+    The template is looked up and compiled once, and a single Context is
+    reused with push/pop for every render.
+
+    Args:
+    - notification_type (NotificationType or int): The notification type or its ID.
+    - contexts (iterable): Context dicts, one per rendered notification.
+
+    Returns:
+    - list: Rendered strings in the order of ``contexts``.
+
+    Raises:
+    - NotificationTemplate.DoesNotExist: If the type has no template.
+    """
+    template = get_compiled_template(notification_type)
+    if template is None:
+        raise NotificationTemplate.DoesNotExist(f"No template for notification type {notification_type}")
+    context = Context()
+    rendered = []
+    for values in contexts:
+        with context.push(values):
+            rendered.append(template.render(context))
+    return rendered
+
+
+def render_notification_template(notification_type, context):
+    """
+    Render a notification type's template with a single context dict.
+    """
+    return render_notification_templates(notification_type, [context])[0]
+
+
+def render_template_by_id(template_id, context):
+    """
+    Render a specific template, such as an A/B test variant's, with one context dict.
+
+    Args:
+    - template_id (int): ID of the NotificationTemplate.
+    - context (dict): Template context.
+
+    Returns:
+    - str: The rendered template.
+    """
+    metadata = NotificationTemplate.objects.values('id', 'version', 'template').get(id=template_id)
+    template = compiled_templates.get(metadata['id'], metadata['version'], metadata['template'])
+    return template.render(Context(context))
+
+
+def invalidate_notification_template(notification_type_id):
+    """
+    Drop the shared template metadata so every process picks up the new version.
+    """
+    cache.delete(template_cache_key(notification_type_id))
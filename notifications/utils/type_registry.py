@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from notifications.models import NotificationType
+from .versioned_cache import VersionedLocalCache
+
+TYPE_REGISTRY_REFRESH_INTERVAL = getattr(settings, 'NOTIFICATION_TYPE_REGISTRY_REFRESH_INTERVAL', 30)
+TYPE_REGISTRY_VERSION_KEY = 'notification_types_version'
+
+
+class NotificationTypeRegistry:
+    """
+    In-process map of notification types by name and by ID.
+
+    The whole table is loaded with one query the first time a process needs a
+    type; after that a lookup is a dict access. A name that is not known yet
+    is inserted on the spot and added to this process's map only; other
+    processes pick it up on their own first miss. The map is reloaded when the
+    shared version key, bumped by the signal receivers in
+    notifications/signals.py whenever a type is changed or deleted, has
+    changed; the key is read at most every TYPE_REGISTRY_REFRESH_INTERVAL
+    seconds.
+
+    Returned instances are shared between callers and must not be modified.
+    """
+
+    def __init__(self, refresh_interval=TYPE_REGISTRY_REFRESH_INTERVAL):
+        # Holds a (by name, by ID) tuple, swapped as one so readers never see half of a reset.
+        self._cache = VersionedLocalCache(TYPE_REGISTRY_VERSION_KEY, self.load, refresh_interval)
+
+    def _types(self):
+        return self._cache.get()
+
+    @staticmethod
+    def load():
+        by_name = {}
+        by_id = {}
+        for notification_type in NotificationType.objects.all():
+            by_name[notification_type.type_name] = notification_type
+            by_id[notification_type.id] = notification_type
+        return by_name, by_id
+
+    def warm(self):
+        """
+        Load the types now instead of on the first lookup.
+        """
+        self._types()
+
+    def get(self, type_name):
+        """
+        Get a notification type by name, creating it if it does not exist.
+
+        Args:
+        - type_name (str): Name of the type.
+
+        Returns:
+        - NotificationType: The type.
+        """
+        by_name, _ = self._types()
+        notification_type = by_name.get(type_name)
+        if notification_type is None:
+            try:
+                with transaction.atomic():
+                    notification_type, _ = NotificationType.objects.get_or_create(type_name=type_name)
+            except IntegrityError:
+                # Created concurrently by another process.
+                notification_type = NotificationType.objects.get(type_name=type_name)
+            # Remember the type only once its row is committed, never one that gets rolled back.
+            transaction.on_commit(lambda: self._remember(notification_type))
+        return notification_type
+
+    def get_by_id(self, notification_type_id):
+        """
+        Get a notification type by ID.
+
+        Args:
+        - notification_type_id (int): ID of the type.
+
+        Returns:
+        - NotificationType: The type.
+
+        Raises:
+        - NotificationType.DoesNotExist: If there is no such type.
+        """
+        _, by_id = self._types()
+        notification_type = by_id.get(notification_type_id)
+        if notification_type is None:
+            notification_type = NotificationType.objects.get(id=notification_type_id)
+            self._remember(notification_type)
+        return notification_type
+
+    def _remember(self, notification_type):
+        def add(maps):
+            by_name, by_id = maps
+            by_name[notification_type.type_name] = notification_type
+            by_id[notification_type.id] = notification_type
+        self._cache.update(add)
+
+    def invalidate(self):
+        """
+        Make every process reload the types on its next check, and this one right away.
+        """
+        self._cache.invalidate()
+
+
+notification_types = NotificationTypeRegistry()
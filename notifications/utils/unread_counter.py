@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from notifications.models import Notification
+
+UNREAD_COUNT_TIMEOUT = getattr(settings, 'NOTIFICATION_UNREAD_COUNT_TIMEOUT', 60 * 60)
+
+
+def unread_count_key(user_id):
+    return f"notification_unread_count_{user_id}"
+
+
+def get_unread_count(user_id):
+    """
+    Get the unread notification count of a user from the cache.
+
+    Falls back to counting in the database when the counter is missing or
+    has expired, and caches the result.
+
+    Args:
+    - user_id (int): ID of the user.
+
+    Returns:
+    - int: Number of unread notifications.
+    """
+    count = cache.get(unread_count_key(user_id))
+    if count is None:
+        count = reconcile_unread_count(user_id)
+    return count
+
+
+def reconcile_unread_count(user_id):
+    """
+    Recount a user's unread notifications in the database and store the result.
+
+    Args:
+    - user_id (int): ID of the user.
+
+    Returns:
+    - int: Number of unread notifications.
+    """
+    count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+    cache.set(unread_count_key(user_id), count, timeout=UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def reconcile_unread_counts(user_ids):
+    """
+    Recount the unread notifications of many users with a single grouped query.
+
+    Args:
+    - user_ids (iterable): IDs of the users.
+
+    Returns:
+    - int: Number of counters written.
+    """
+    user_ids = list(user_ids)
+    counts = dict.fromkeys(user_ids, 0)
+    rows = (
+        Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+        .values('recipient_id')
+        .annotate(count=Count('id'))
+    )
+    for row in rows:
+        counts[row['recipient_id']] = row['count']
+    cache.set_many(
+        {unread_count_key(user_id): count for user_id, count in counts.items()},
+        timeout=UNREAD_COUNT_TIMEOUT,
+    )
+    return len(counts)
+
+
+def increment_unread_count(user_id, amount=1):
+    """
+    Increment a user's cached unread count.
+
+    Missing counters are left alone; the next read counts from the database.
+    """
+    try:
+        cache.incr(unread_count_key(user_id), amount)
+    except ValueError:
+        pass
+
+
+def decrement_unread_count(user_id, amount=1):
+    """
+    Decrement a user's cached unread count, recounting if it drifts below zero.
+    """
+    try:
+        if cache.decr(unread_count_key(user_id), amount) < 0:
+            reconcile_unread_count(user_id)
+    except ValueError:
+        pass
+
+
+def invalidate_unread_counts(user_ids):
+    """
+    Drop the cached unread counts of many users in one round trip.
+    """
+    cache.delete_many([unread_count_key(user_id) for user_id in user_ids])
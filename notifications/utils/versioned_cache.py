@@ -0,0 +1,67 @@
+import threading
+import time
+from django.core.cache import cache
+
+
+class VersionedLocalCache:
+    """
+    In-process copy of data that every process reloads when a shared version changes.
+
+    ``loader`` is called with no arguments to build the data. The version is a
+    value in the shared cache under ``version_key``; it is read at most every
+    ``refresh_interval`` seconds, and the data is reloaded when it differs
+    from the one seen at the last load. invalidate() bumps the version so
+    that every process reloads, and drops this process's copy right away.
+
+    The returned data is shared between callers and must not be modified
+    other than through update().
+    """
+
+    def __init__(self, version_key, loader, refresh_interval):
+        self.version_key = version_key
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._data = None
+        self._version = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the data, loading it if it is missing or its version has changed.
+        """
+        now = time.monotonic()
+        # Read once: clear() may reset the attribute from another thread at any time.
+        data = self._data
+        if data is not None and now - self._checked_at < self.refresh_interval:
+            return data
+        with self._lock:
+            data = self._data
+            version = cache.get(self.version_key)
+            if data is None or version != self._version:
+                data = self._data = self.loader()
+                self._version = version
+            self._checked_at = now
+            return data
+
+    def update(self, func):
+        """
+        Apply ``func`` to the loaded data in place; nothing is done if it is not loaded.
+        """
+        with self._lock:
+            if self._data is not None:
+                func(self._data)
+
+    def clear(self):
+        """
+        Drop this process's copy; the next get() loads it again.
+        """
+        with self._lock:
+            self._data = None
+
+    def invalidate(self):
+        """
+        Make every process reload the data on its next check, and this one right away.
+        """
+        cache.set(self.version_key, time.time(), timeout=None)
+        self.clear()
@@ -1,10 +1,12 @@
+from django.core.exceptions import PermissionDenied
 from django.shortcuts import render
 from django_ratelimit.decorators import ratelimit
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from notifications.models import Notification, NotificationSettings
 from notifications.controllers.notification_controller import NotificationController
+from notifications.querying.notification_query import DEFAULT_PAGE_SIZE
 
 notification_controller = NotificationController()
 
@@ -59,10 +61,53 @@ def delete_notification(request, notification_id):
 @api_view(['GET'])
 def get_user_notifications(request):
     """
-    Retrieve all notifications for the authenticated user.
+    Retrieve the authenticated user's notifications, one page at a time.
+
+    Query parameters:
+    - cursor: the ``next_cursor`` returned with the previous page.
+    - limit: page size (default 20, max 100).
+    - is_read: ``true``/``false`` to only return read or unread notifications.
+    - include_content: ``false`` to return metadata only, without decrypting content.
     """
     user = request.user  # Assuming authenticated user
-    notifications = notification_controller.get_user_notifications(user.id)
+    cursor = request.query_params.get('cursor')
+    limit = request.query_params.get('limit', DEFAULT_PAGE_SIZE)
+    is_read = request.query_params.get('is_read')
+    read_status = None if is_read is None else is_read.lower() == 'true'
+    include_content = request.query_params.get('include_content', 'true').lower() != 'false'
+    try:
+        notifications = notification_controller.get_user_notifications(user.id, cursor, limit, read_status, include_content)
+        return Response(notifications, status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET'])
+def get_notification_contents(request):
+    """
+    Decrypt the content of selected notifications of the authenticated user.
+
+    Query parameters:
+    - ids: comma-separated notification IDs (at most 100).
+    """
+    try:
+        notification_ids = [int(i) for i in request.query_params.get('ids', '').split(',') if i]
+    except ValueError:
+        return Response({"error": "ids must be comma-separated integers"}, status=status.HTTP_400_BAD_REQUEST)
+    contents = notification_controller.get_notification_contents(request.user.id, notification_ids)
+    return Response(contents, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def search_notifications(request):
+    """
+    Search the authenticated user's notifications.
+
+    Query parameters:
+    - q: words to search for; every word must appear in the notification.
+    - include_content: ``false`` to return metadata only.
+    """
+    query = request.query_params.get('q', '')
+    include_content = request.query_params.get('include_content', 'true').lower() != 'false'
+    notifications = notification_controller.search_notifications(request.user.id, query, include_content)
     return Response(notifications, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
@@ -76,6 +121,68 @@ def mark_notification_as_read(request, notification_id):
     except Notification.DoesNotExist:
         return Response({"error": "Notification not found"}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['POST'])
+def bulk_mark_notifications_as_read(request):
+    """
+    Mark the authenticated user's notifications as read in bulk.
+
+    Body (all optional, combined with AND; empty marks everything read):
+    - notification_ids: list of notification IDs.
+    - notification_type: notification type name.
+    - before: a pagination cursor; that notification and all older ones.
+    """
+    try:
+        result = notification_controller.bulk_mark_notifications_as_read(
+            request.user,
+            request.data.get('notification_ids'),
+            request.data.get('notification_type'),
+            request.data.get('before'),
+        )
+        return Response(result, status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['POST'])
+def bulk_delete_notifications(request):
+    """
+    Delete the authenticated user's notifications in bulk.
+
+    Takes the same selectors as bulk_mark_notifications_as_read, at least one
+    of which is required.
+    """
+    try:
+        result = notification_controller.bulk_delete_notifications(
+            request.user,
+            request.data.get('notification_ids'),
+            request.data.get('notification_type'),
+            request.data.get('before'),
+        )
+        return Response(result, status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['POST'])
+def record_engagements(request):
+    """
+    Record view/click events of the authenticated user.
+
+    Body:
+    - events: list of {"notification_id": int, "action": "view" | "click"}.
+
+    Events are buffered and written in bulk; 429 means the buffer is full and
+    the events were dropped, so the client may retry later.
+    """
+    events = request.data.get('events')
+    if not isinstance(events, list):
+        return Response({"error": "events must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        result = notification_controller.record_engagements(request.user.id, events)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if result['dropped']:
+        return Response(result, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    return Response(result, status=status.HTTP_202_ACCEPTED)
+
 @api_view(['POST'])
 def update_notification_settings(request):
     """
@@ -128,10 +235,13 @@ def generate_summary_report(request):
 def get_unread_notifications_count(request):
     """
     Retrieve the count of unread notifications for the authenticated user.
+
+    Served from the cached per-user counter; the database is only counted
+    when the counter is missing.
     """
     user = request.user
     count = notification_controller.get_unread_notifications_count(user)
-    return Response({'unread_count': count}, status=status.HTTP_200_OK)
+    return Response(count, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 def create_notification_template(request):
@@ -194,33 +304,71 @@ def unsubscribe_from_notifications(request):
 @api_view(['POST'])
 def notify_followers(request):
     """
-    Notify followers of a user profile about an action.
+    Notify the authenticated user's followers about an action.
+
+    Body: notification_type (type ID), and optionally user_profile (must be the
+    authenticated user), content_type ('app_label.model') with object_id,
+    content, url, run_async.
     """
     user_profile = request.data.get('user_profile')
     notification_type = request.data.get('notification_type')
-    content_object = request.data.get('content_object', None)
+    content_type = request.data.get('content_type')
+    object_id = request.data.get('object_id')
     content = request.data.get('content', '')
     url = request.data.get('url', '')
     try:
-        notification_controller.notify_followers(user_profile, notification_type, content_object, content, url)
-        return Response({'message': 'Followers notified successfully'}, status=status.HTTP_200_OK)
+        run_async = serializers.BooleanField().to_internal_value(request.data.get('run_async', False))
+        result = notification_controller.notify_followers(
+            request.user, notification_type, user_profile, content_type, object_id, content, url, run_async
+        )
+        if run_async:
+            return Response({'message': 'Follower notification queued', **result}, status=status.HTTP_202_ACCEPTED)
+        return Response({'message': 'Followers notified successfully', **result}, status=status.HTTP_200_OK)
+    except serializers.ValidationError as e:
+        return Response({"error": {'run_async': e.detail}}, status=status.HTTP_400_BAD_REQUEST)
     except ValueError as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except PermissionDenied as e:
+        return Response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
 
 @api_view(['POST'])
 def notify_all_users(request):
     """
-    Notify all users about an action.
+    Notify all users about an action. Requires staff or the
+    can_manage_notifications permission.
+
+    Body: notification_type (type ID), and optionally content_type
+    ('app_label.model') with object_id, content, url, run_async.
     """
     notification_type = request.data.get('notification_type')
-    content_object = request.data.get('content_object', None)
+    content_type = request.data.get('content_type')
+    object_id = request.data.get('object_id')
     content = request.data.get('content', '')
     url = request.data.get('url', '')
     try:
-        notification_controller.notify_all_users(notification_type, content_object, content, url)
-        return Response({'message': 'All users notified successfully'}, status=status.HTTP_200_OK)
+        run_async = serializers.BooleanField().to_internal_value(request.data.get('run_async', False))
+        result = notification_controller.notify_all_users(
+            request.user, notification_type, content_type, object_id, content, url, run_async
+        )
+        if run_async:
+            return Response({'message': 'Notification to all users queued', **result}, status=status.HTTP_202_ACCEPTED)
+        return Response({'message': 'All users notified successfully', **result}, status=status.HTTP_200_OK)
+    except serializers.ValidationError as e:
+        return Response({"error": {'run_async': e.detail}}, status=status.HTTP_400_BAD_REQUEST)
     except ValueError as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except PermissionDenied as e:
+        return Response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+@api_view(['GET'])
+def get_fan_out_status(request, task_id):
+    """
+    Get the progress of a fan-out queued with run_async by the authenticated user.
+    """
+    fan_out_status = notification_controller.get_fan_out_status(task_id, request.user)
+    if fan_out_status is None:
+        return Response({"error": "Fan-out not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(fan_out_status, status=status.HTTP_200_OK)
 
 @ratelimit(key='user', rate='5/m', method='POST', block=True)
 def send_notification_view(request):
@@ -3,16 +3,13 @@ from django.dispatch import receiver
 from django.db.models import F # F is used to reference a field in the database
 from .models import User, UserProfile, Skill, Experience, Education, Endorsement
 from notifications.services import NotificationService
-from notifications.models import Notification, NotificationType
 from connections.models import Connection
-from django.contrib.contenttypes.models import ContentType
 
 # Signal to create a UserProfile when a new User is created
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
-        NotificationService.create_default_notification_settings(instance)
 
 @receiver(post_save, sender=UserProfile)
 def create_default_notification_settings(sender, instance, created, **kwargs):
@@ -20,19 +17,7 @@ def create_default_notification_settings(sender, instance, created, **kwargs):
     Signal handler to create default notification settings for a new UserProfile.
     """
     if created:
-        user = instance.user
-        default_settings = NotificationType.PREDEFINED_TYPES
-        
-        for type_name in default_settings:
-            notification_type, _ = NotificationType.objects.get_or_create(type_name=type_name)
-            content_type = ContentType.objects.get_for_model(User)
-            
-            Notification.objects.get_or_create(
-                recipient=user,
-                notification_type=notification_type,
-                content_type=content_type,
-                object_id=user.id
-            )
+        NotificationService.create_default_notification_settings(instance.user)
 
 # Signal to update the endorsement count when an Endorsement is created
 @receiver(post_save, sender=Endorsement)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 import os
 from pathlib import Path
+from celery.schedules import crontab
 from app_logs.logger import CustomisedJSONFormatter
 
 
@@ -194,6 +195,89 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Notifications
+NOTIFICATION_FANOUT_BATCH_SIZE = 1000  # Rows per bulk insert/transaction when fanning out notifications
+NOTIFICATION_FAN_OUT_OWNER_TIMEOUT = 60 * 60 * 24  # Seconds the requester of a background fan-out can look up its status
+NOTIFICATION_BULK_CHUNK_SIZE = 500  # Notifications per Celery chunk in send_bulk_notifications
+NOTIFICATION_UNREAD_COUNT_TIMEOUT = 60 * 60  # Seconds a cached unread count lives before it is recounted
+NOTIFICATION_BULK_ACTION_BATCH_SIZE = 1000  # Read-status rows per insert when bulk marking notifications as read
+NOTIFICATION_PUBSUB_URL = 'redis://localhost:6379/0'
+NOTIFICATION_PUBSUB_MAX_CONNECTIONS = 50  # Size of the process-wide pub/sub connection pool
+NOTIFICATION_PUBSUB_BUFFERED = False  # Batch published notifications into Redis pipelines
+NOTIFICATION_PUBSUB_BATCH_SIZE = 100  # Messages per pipelined publish / subscriber batch
+NOTIFICATION_PUBSUB_FLUSH_INTERVAL = 0.05  # Seconds a message may wait in a publish or consume batch
+NOTIFICATION_TEMPLATE_CACHE_SIZE = 256  # Compiled notification templates kept per process
+NOTIFICATION_TEMPLATE_CACHE_TIMEOUT = 60 * 60  # Seconds template metadata lives in the shared cache
+NOTIFICATION_POLICY_CACHE_TIMEOUT = 60 * 15  # Seconds a resolved recipient policy (snoozes, settings, preferences) is cached
+NOTIFICATION_DEDUP_WINDOW = 60 * 5  # Seconds during which a repeated event for the same recipient, type and source is dropped
+NOTIFICATION_WEBSOCKET_PUSH = True  # Push new notifications to connected users' websocket groups
+NOTIFICATION_WEBSOCKET_COALESCE_WINDOW = 0.1  # Seconds notifications are collected into one websocket frame
+NOTIFICATION_WEBSOCKET_MAX_FRAME_SIZE = 100  # Notifications per websocket frame before it is sent early
+NOTIFICATION_PRESENCE_TIMEOUT = 60 * 60 * 24  # Seconds a websocket connection counter lives without updates
+NOTIFICATION_AB_TEST_REFRESH_INTERVAL = 30  # Seconds between checks for changed A/B tests in each process
+NOTIFICATION_TYPE_REGISTRY_REFRESH_INTERVAL = 30  # Seconds between checks for changed notification types in each process
+NOTIFICATION_ENGAGEMENT_MAX_PENDING = 100000  # Buffered view/click events before new ones are refused
+NOTIFICATION_ENGAGEMENT_FLUSH_BATCH_SIZE = 1000  # Buffered engagements written per transaction
+NOTIFICATION_ROLLUP_BATCH_SIZE = 1000  # Users recomputed per report rollup query
+NOTIFICATION_RETENTION_DAYS = 365  # Notifications older than this are purged
+NOTIFICATION_RETENTION_BATCH_SIZE = 1000  # Notifications deleted per transaction
+NOTIFICATION_RETENTION_BATCH_SLEEP = 0.1  # Seconds to pause between retention batches
+NOTIFICATION_ARCHIVE_DIR = None  # Directory for gzipped JSONL archives of purged notifications; None disables archiving
+NOTIFICATION_CHANNEL_QUEUES = {  # RQ queue per delivery channel
+    'push': 'high',
+    'sms': 'high',
+    'email': 'default',
+    'crm': 'low',
+    'alert': 'low',
+}
+NOTIFICATION_CHANNEL_CONCURRENCY = {  # Deliveries in flight per channel across all workers
+    'push': 50,
+    'sms': 10,
+    'email': 10,
+    'crm': 5,
+    'alert': 5,
+}
+NOTIFICATION_DELIVERY_MAX_RETRIES = 5
+NOTIFICATION_DELIVERY_RETRY_INTERVALS = [10, 30, 60, 120, 300]  # Seconds between delivery retries
+NOTIFICATION_CHANNEL_BUSY_DELAY = 5  # Seconds before a job that found its channel full runs again; not counted as a retry
+NOTIFICATION_DELIVERY_TRANSPORT = 'notifications.services.delivery_service.DefaultTransport'  # FakeTransport in tests
+NOTIFICATION_DELIVERY_EAGER = False  # Deliver inline after commit instead of enqueueing (tests)
+
+# Courses
+QUIZ_ANSWER_KEY_CACHE_TIMEOUT = 60 * 60  # Seconds a quiz's answer key is cached; changes to its questions drop it sooner
+QUIZ_GRADING_BATCH_SIZE = 1000  # Quiz progress rows per upsert when grading submissions in bulk
+COURSE_PROGRESS_RECONCILE_BATCH_SIZE = 1000  # Enrollments written per bulk update when reconciling course progress
+COURSE_ENROLLMENT_BATCH_SIZE = 1000  # Enrollments per insert when enrolling users in bulk
+
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-unread-notification-counts': {
+        'task': 'notifications.tasks.reconcile_unread_notification_counts',
+        'schedule': 60 * 5,
+    },
+    'send-daily-notification-digests': {
+        'task': 'notifications.tasks.send_notification_digests',
+        'schedule': crontab(hour=8, minute=0),
+        'args': ('daily',),
+    },
+    'send-weekly-notification-digests': {
+        'task': 'notifications.tasks.send_notification_digests',
+        'schedule': crontab(hour=8, minute=0, day_of_week='mon'),
+        'args': ('weekly',),
+    },
+    'purge-old-notifications': {
+        'task': 'notifications.tasks.purge_old_notifications',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'flush-notification-engagements': {
+        'task': 'notifications.tasks.flush_notification_engagements',
+        'schedule': 10,
+    },
+    'refresh-notification-rollups': {
+        'task': 'notifications.tasks.refresh_notification_rollups',
+        'schedule': 60 * 10,
+    },
+}
+
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
 